@@ -0,0 +1,176 @@
+"""Scaling benchmarks for the layout engine.
+
+Usage::
+
+    python -m benchmarks.layout                  # all shapes, assert scaling
+    python -m benchmarks.layout wide_col grow --max-exponent 1.3
+
+Synthetic Box trees of growing width, depth and ``grow`` usage are built for
+a series of doubling sizes.  Layout (``BoxInstance``) and writing are timed
+separately, and the scaling exponent between the smallest and the largest
+size is checked: a linear algorithm has an exponent of about 1, a quadratic
+one about 2.  The process exits with status 1 when a shape scales worse than
+``--max-exponent``, so regressions are caught even when end-to-end numbers
+are dominated by writing.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import math
+import sys
+import time
+from collections.abc import Callable
+
+from poi import Box, Cell, Col, Row, Table
+from poi.nodes import BoxInstance
+from poi.visitors.writer import writer_visitor
+from poi.writer import RecordingWriter
+
+Shape = Callable[[int], Box]
+SHAPES: dict[str, tuple[Shape, list[int]]] = {}
+
+
+def shape(sizes: list[int]) -> Callable[[Shape], Shape]:
+    """Register a tree shape with the sizes it is measured at."""
+
+    def decorator(fn: Shape) -> Shape:
+        SHAPES[fn.__name__] = (fn, sizes)
+        return fn
+
+    return decorator
+
+
+@shape(sizes=[1000, 2000, 4000, 8000])
+def wide_col(n: int) -> Box:
+    """A Col of many single-row Rows, the shape of hand-built tables."""
+    return Col(
+        children=[
+            Row(children=[Cell(i), Cell("name"), Cell(i * 1.5, colspan=2)])
+            for i in range(n)
+        ]
+    )
+
+
+@shape(sizes=[1000, 2000, 4000, 8000])
+def wide_row(n: int) -> Box:
+    """A single Row with many cells."""
+    return Row(children=[Cell(i) for i in range(n)])
+
+
+@shape(sizes=[50, 100, 200, 300])
+def deep(n: int) -> Box:
+    """Alternately nested Col and Row containers, each with a sibling cell."""
+    box: Box = Cell("leaf")
+    for i in range(n):
+        container = Col if i % 2 else Row
+        box = container(children=[Cell(i), box])
+    return box
+
+
+@shape(sizes=[500, 1000, 2000, 4000])
+def grow(n: int) -> Box:
+    """Rows whose last cell grows to the width of a wide sibling."""
+    return Col(
+        children=[
+            Cell("title", colspan=8),
+            *(Row(children=[Cell(i), Cell("fill", grow=True)]) for i in range(n)),
+        ]
+    )
+
+
+@shape(sizes=[250, 500, 1000, 2000])
+def sections(n: int) -> Box:
+    """One titled small Table per entity, the shape of per-customer reports."""
+    return Col(
+        children=[
+            Col(
+                children=[
+                    Row(children=[Cell(f"section {i}", grow=True)], colspan=3),
+                    Table(
+                        data=[{"a": j, "b": j, "c": j} for j in range(3)],
+                        columns=[("a", "A"), ("b", "B"), ("c", "C")],
+                    ),
+                ]
+            )
+            for i in range(n)
+        ]
+    )
+
+
+def _best_of(repeat: int, fn: Callable[[], float]) -> float:
+    return min(fn() for _ in range(repeat))
+
+
+def measure(build: Shape, n: int, repeat: int) -> tuple[float, float]:
+    """Return the best layout and write times for a tree of size ``n``."""
+
+    def layout() -> float:
+        root = build(n)
+        gc.collect()
+        start = time.perf_counter()
+        BoxInstance(root, 0, 0, None)
+        return time.perf_counter() - start
+
+    def write() -> float:
+        root = build(n)
+        BoxInstance(root, 0, 0, None)
+        gc.collect()
+        start = time.perf_counter()
+        root.accept(writer_visitor(RecordingWriter()))
+        return time.perf_counter() - start
+
+    return _best_of(repeat, layout), _best_of(repeat, write)
+
+
+def exponent(sizes: list[int], times: list[float]) -> float:
+    """Scaling exponent k in ``time ~ size ** k`` between both ends."""
+    if times[0] <= 0:
+        return 0.0
+    return math.log(times[-1] / times[0]) / math.log(sizes[-1] / sizes[0])
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("shapes", nargs="*", help=f"any of {list(SHAPES)}")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--max-exponent",
+        type=float,
+        default=1.35,
+        help="fail when layout scales worse than size ** k (default 1.35)",
+    )
+    args = parser.parse_args(argv)
+
+    names = args.shapes or list(SHAPES)
+    unknown = set(names) - set(SHAPES)
+    if unknown:
+        parser.error(f"unknown shapes {sorted(unknown)}")
+
+    sys.setrecursionlimit(max(sys.getrecursionlimit(), 10_000))
+    failures = []
+    print(f"{'shape':<10} {'size':>6} {'layout ms':>10} {'write ms':>10}")
+    for name in names:
+        build, sizes = SHAPES[name]
+        layout_times, write_times = [], []
+        for n in sizes:
+            layout_s, write_s = measure(build, n, args.repeat)
+            layout_times.append(layout_s)
+            write_times.append(write_s)
+            print(f"{name:<10} {n:>6} {layout_s * 1e3:>10.2f} {write_s * 1e3:>10.2f}")
+        layout_k = exponent(sizes, layout_times)
+        write_k = exponent(sizes, write_times)
+        status = "ok" if layout_k <= args.max_exponent else "FAIL"
+        print(f"{name:<10} layout ~ n^{layout_k:.2f}, write ~ n^{write_k:.2f} {status}")
+        if status != "ok":
+            failures.append(name)
+
+    if failures:
+        print(f"layout scales superlinearly for {failures}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
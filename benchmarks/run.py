@@ -0,0 +1,215 @@
+"""Throughput and memory benchmarks for poi.
+
+Usage::
+
+    python -m benchmarks.run                      # all scenarios at full size
+    python -m benchmarks.run --scale 0.1 large_table cjk_text
+    python -m benchmarks.run --output results.json --save-baseline
+    python -m benchmarks.run --baseline benchmarks/baseline.json --fail-on-regression
+
+Every scenario runs in a fresh process so peak RSS figures are not polluted by
+earlier scenarios.  Results are printed as a table and optionally written as
+JSON; with ``--baseline`` each scenario is compared against a stored run and
+throughput or memory changes beyond ``--threshold`` are reported.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+
+def _peak_rss() -> int | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _render(report: Any) -> bytes:
+    if callable(report):
+        return report()  # type: ignore[no-any-return]
+    return report.write_to_bytes_io().read()  # type: ignore[no-any-return]
+
+
+def _run_scenario(name: str, scale: float, trace_memory: bool) -> dict[str, Any]:
+    from .scenarios import SCENARIOS
+
+    fn, default_rows = SCENARIOS[name]
+    n = max(1, int(default_rows * scale))
+
+    start = time.perf_counter()
+    report, rows = fn(n)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    output = _render(report)
+    write = time.perf_counter() - start
+    del report
+
+    result: dict[str, Any] = {
+        "rows": rows,
+        "build_s": round(build, 4),
+        "write_s": round(write, 4),
+        "rows_per_s": round(rows / (build + write), 1),
+        "output_bytes": len(output),
+        "peak_rss_bytes": _peak_rss(),
+        "tracemalloc_peak_bytes": None,
+    }
+    del output
+
+    if trace_memory:
+        # A separate pass, tracemalloc slows allocation-heavy code down a lot.
+        tracemalloc.start()
+        report, _ = fn(n)
+        _render(report)
+        del report
+        result["tracemalloc_peak_bytes"] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def run(names: list[str], scale: float, trace_memory: bool) -> dict[str, Any]:
+    results = {}
+    ctx = multiprocessing.get_context("spawn")
+    for name in names:
+        with ctx.Pool(1) as pool:
+            results[name] = pool.apply(_run_scenario, (name, scale, trace_memory))
+        print(_format_row(name, results[name]), flush=True)
+    return results
+
+
+def _mb(value: int | None) -> str:
+    return "-" if value is None else f"{value / 2**20:.1f}"
+
+
+def _format_row(name: str, r: dict[str, Any]) -> str:
+    return (
+        f"{name:<20} {r['rows']:>10} {r['build_s']:>9.3f} {r['write_s']:>9.3f} "
+        f"{r['rows_per_s']:>12.0f} {_mb(r['peak_rss_bytes']):>9} "
+        f"{_mb(r['tracemalloc_peak_bytes']):>9} {_mb(r['output_bytes']):>9}"
+    )
+
+
+HEADER = (
+    f"{'scenario':<20} {'rows':>10} {'build s':>9} {'write s':>9} "
+    f"{'rows/s':>12} {'rss MB':>9} {'trace MB':>9} {'out MB':>9}"
+)
+
+
+def compare(
+    results: dict[str, Any], baseline: dict[str, Any], threshold: float
+) -> list[str]:
+    """Return a line per scenario that regressed beyond ``threshold``."""
+    regressions = []
+    # Changes are signed so that positive is worse for every metric.
+    print(f"\n{'scenario':<20} {'rows/s':>10} {'rss':>10} {'output':>10}")
+    for name, r in results.items():
+        b = baseline.get("results", {}).get(name)
+        if not b or b["rows"] != r["rows"]:
+            print(f"{name:<20} {'(no comparable baseline)':>32}")
+            continue
+        changes = {
+            "rows/s": 1 - r["rows_per_s"] / b["rows_per_s"],
+            "rss": _ratio(r["peak_rss_bytes"], b["peak_rss_bytes"]),
+            "output": _ratio(r["output_bytes"], b["output_bytes"]),
+        }
+        cells = [
+            "-" if change is None else f"{change:+.1%}" for change in changes.values()
+        ]
+        print(f"{name:<20} " + " ".join(f"{cell:>10}" for cell in cells))
+        for metric, change in changes.items():
+            if change is not None and change > threshold:
+                regressions.append(f"{name}: {metric} worse by {change:.1%}")
+    return regressions
+
+
+def _ratio(current: int | None, base: int | None) -> float | None:
+    if not current or not base:
+        return None
+    return current / base - 1
+
+
+def main(argv: list[str] | None = None) -> int:
+    from .scenarios import SCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("scenarios", nargs="*", help=f"any of {list(SCENARIOS)}")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="fraction of the default rows"
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="also measure the tracemalloc peak (runs each scenario twice)",
+    )
+    parser.add_argument("--output", type=Path, help="write results as JSON")
+    parser.add_argument(
+        "--baseline",
+        type=Path,
+        help=f"compare against a stored run (default {DEFAULT_BASELINE.name} "
+        "if present)",
+    )
+    parser.add_argument(
+        "--save-baseline", action="store_true", help="store this run as the baseline"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.1,
+        help="relative change reported as a regression (default 0.1)",
+    )
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+
+    names = args.scenarios or list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios {sorted(unknown)}")
+
+    from poi import __version__
+
+    print(HEADER)
+    report = {
+        "meta": {
+            "poi": __version__,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "scale": args.scale,
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": run(names, args.scale, args.trace_memory),
+    }
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    baseline_path = args.baseline or DEFAULT_BASELINE
+    regressions: list[str] = []
+    if baseline_path.exists() and not args.save_baseline:
+        baseline = json.loads(baseline_path.read_text())
+        regressions = compare(report["results"], baseline, args.threshold)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(report, indent=2))
+        print(f"baseline saved to {baseline_path}")
+
+    return 1 if regressions and args.fail_on_regression else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,155 @@
+"""Realistic export scenarios for the benchmark runner.
+
+Each scenario takes the number of data rows and returns ``(report, rows)``,
+where ``report`` is a ``Sheet``, a ``Book`` or a callable writing the output
+itself (for the streaming API) and returning its bytes.
+"""
+
+from __future__ import annotations
+
+import datetime
+import io
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any, NamedTuple
+
+from poi import Book, Sheet, Table
+
+IMAGE = str(Path(__file__).resolve().parent.parent / "assets" / "image.jpeg")
+
+Scenario = Callable[[int], tuple[Any, int]]
+SCENARIOS: dict[str, tuple[Scenario, int]] = {}
+
+
+def scenario(rows: int) -> Callable[[Scenario], Scenario]:
+    """Register a scenario with its default row count at scale 1.0."""
+
+    def decorator(fn: Scenario) -> Scenario:
+        SCENARIOS[fn.__name__] = (fn, rows)
+        return fn
+
+    return decorator
+
+
+class Order(NamedTuple):
+    id: int
+    customer: str
+    amount: float
+    quantity: int
+    created: datetime.datetime
+
+
+def _orders(n: int) -> list[Order]:
+    start = datetime.datetime(2026, 1, 1)
+    return [
+        Order(
+            id=i,
+            customer=f"customer {i % 1000}",
+            amount=i * 1.25,
+            quantity=i % 17,
+            created=start + datetime.timedelta(minutes=i),
+        )
+        for i in range(n)
+    ]
+
+
+ORDER_COLUMNS = [
+    ("id", "ID"),
+    ("customer", "Customer"),
+    {"attr": "amount", "title": "Amount", "format": {"num_format": "#,##0.00"}},
+    ("quantity", "Quantity"),
+    ("created", "Created"),
+]
+
+
+@scenario(rows=1_000_000)
+def large_table(n: int) -> tuple[Any, int]:
+    return Sheet(root=Table(data=_orders(n), columns=ORDER_COLUMNS)), n
+
+
+@scenario(rows=1_000_000)
+def streaming_table(n: int) -> tuple[Any, int]:
+    def write() -> bytes:
+        out = io.BytesIO()
+        with Sheet.stream(out, columns=ORDER_COLUMNS) as s:
+            s.extend(_orders(n))
+        return out.getvalue()
+
+    return write, n
+
+
+@scenario(rows=20_000)
+def wide_auto_width(n: int) -> tuple[Any, int]:
+    width = 60
+    data = [{f"c{j}": f"value {i * j}" for j in range(width)} for i in range(n)]
+    columns = [(f"c{j}", f"Column {j}") for j in range(width)]
+    return Sheet(root=Table(data=data, columns=columns, col_width="auto")), n
+
+
+@scenario(rows=200_000)
+def cjk_text(n: int) -> tuple[Any, int]:
+    data = [
+        {"name": f"客户{i}号", "city": "上海市浦东新区", "note": f"备注：第{i}条记录"}
+        for i in range(n)
+    ]
+    columns = [("name", "名称"), ("city", "城市"), ("note", "备注")]
+    return Sheet(root=Table(data=data, columns=columns, col_width="auto")), n
+
+
+@scenario(rows=200_000)
+def conditional_style(n: int) -> tuple[Any, int]:
+    table = Table(
+        data=_orders(n),
+        columns=ORDER_COLUMNS,
+        cell_style={
+            "bg_color: #FFC7CE; font_color: #9C0006": lambda r, c: (
+                c.attr == "amount" and r.amount > 1000
+            ),
+            "bold: true": lambda r: r.quantity == 0,
+        },
+    )
+    return Sheet(root=table), n
+
+
+@scenario(rows=2_000)
+def image_column(n: int) -> tuple[Any, int]:
+    data = [{"name": f"product {i}", "image": IMAGE} for i in range(n)]
+    columns = [
+        ("name", "Name"),
+        {
+            "attr": "image",
+            "title": "Image",
+            "type": "image",
+            "options": {"x_scale": 0.1, "y_scale": 0.1},
+        },
+    ]
+    return Sheet(root=Table(data=data, columns=columns, row_height=40)), n
+
+
+@scenario(rows=300_000)
+def nested_attr(n: int) -> tuple[Any, int]:
+    data = [
+        {
+            "order": {"customer": {"name": f"customer {i}"}, "total": i},
+            "shipment": {"carrier": "UPS"} if i % 2 else None,
+        }
+        for i in range(n)
+    ]
+    columns = [
+        ("order.customer.name", "Customer"),
+        ("order.total", "Total"),
+        ("shipment?.carrier", "Carrier"),
+    ]
+    return Sheet(root=Table(data=data, columns=columns)), n
+
+
+@scenario(rows=400_000)
+def multi_sheet_book(n: int) -> tuple[Any, int]:
+    sheets = 20
+    per_sheet = max(1, n // sheets)
+    book = Book()
+    for _ in range(sheets):
+        book.add_sheet(
+            Sheet(root=Table(data=_orders(per_sheet), columns=ORDER_COLUMNS))
+        )
+    return book, per_sheet * sheets
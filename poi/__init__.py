@@ -1,47 +1,137 @@
-import importlib.metadata
-
-from .book import Book
-from .nodes import (
-    Alignment,
-    BorderStyle,
-    Box,
-    Cell,
-    CellStyle,
-    CellValue,
-    Col,
-    Column,
-    ColumnConfig,
-    ColumnDict,
-    ColumnTuple,
-    CommentOptions,
-    Image,
-    ImageOptions,
-    Row,
-    Table,
-    TableStyle,
-    VerticalAlignment,
-)
-from .sheet import Sheet
-from .writer import BytesIOWorkBook
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .aggregate import Aggregate, AggregateFunction
+    from .batch import BatchJob, BatchResult, export_batch
+    from .book import Book
+    from .budget import Budget, BudgetExceededError
+    from .cache import OutputCache, content_key
+    from .images import ImagePipeline
+    from .instrument import Instrumentation
+    from .nodes import (
+        Alignment,
+        BorderStyle,
+        Box,
+        Cell,
+        CellStyle,
+        CellValue,
+        Col,
+        Column,
+        ColumnConfig,
+        ColumnDict,
+        ColumnTuple,
+        CommentOptions,
+        ExcelTableOptions,
+        Image,
+        ImageOptions,
+        Pivot,
+        PivotKey,
+        PivotValue,
+        Row,
+        Table,
+        TableStyle,
+        TotalFunction,
+        VerticalAlignment,
+    )
+    from .packager import CompressionProfile, ParallelZipWorkbook
+    from .progress import CancelToken, ExportCancelledError, Progress
+    from .sheet import Sheet
+    from .stream import SheetStream
+    from .visitors.estimator import Estimate
+    from .writer import BytesIOWorkBook
+
+# Modules of the public names, imported on first use so that ``import poi``,
+# and the command line, start fast.
+_EXPORTS = {
+    "Aggregate": "aggregate",
+    "AggregateFunction": "aggregate",
+    "BatchJob": "batch",
+    "BatchResult": "batch",
+    "export_batch": "batch",
+    "Book": "book",
+    "Budget": "budget",
+    "BudgetExceededError": "budget",
+    "OutputCache": "cache",
+    "content_key": "cache",
+    "ImagePipeline": "images",
+    "Instrumentation": "instrument",
+    "Alignment": "nodes",
+    "BorderStyle": "nodes",
+    "Box": "nodes",
+    "Cell": "nodes",
+    "CellStyle": "nodes",
+    "CellValue": "nodes",
+    "Col": "nodes",
+    "Column": "nodes",
+    "ColumnConfig": "nodes",
+    "ColumnDict": "nodes",
+    "ColumnTuple": "nodes",
+    "CommentOptions": "nodes",
+    "ExcelTableOptions": "nodes",
+    "Image": "nodes",
+    "ImageOptions": "nodes",
+    "Pivot": "nodes",
+    "PivotKey": "nodes",
+    "PivotValue": "nodes",
+    "Row": "nodes",
+    "Table": "nodes",
+    "TableStyle": "nodes",
+    "TotalFunction": "nodes",
+    "VerticalAlignment": "nodes",
+    "CompressionProfile": "packager",
+    "ParallelZipWorkbook": "packager",
+    "CancelToken": "progress",
+    "ExportCancelledError": "progress",
+    "Progress": "progress",
+    "Sheet": "sheet",
+    "SheetStream": "stream",
+    "Estimate": "visitors.estimator",
+    "BytesIOWorkBook": "writer",
+}
 
 # Main classes for public API
 __all__ = [
     # Core classes
     "Sheet",
+    "SheetStream",
     "Book",
     "Cell",
     "Box",
     "Col",
     "Row",
     "Table",
+    "Pivot",
     "Image",
+    "ImagePipeline",
     "BytesIOWorkBook",
+    "Instrumentation",
+    "ParallelZipWorkbook",
+    "Budget",
+    "BudgetExceededError",
+    "Estimate",
+    "Progress",
+    "CancelToken",
+    "ExportCancelledError",
+    "OutputCache",
+    "content_key",
+    # Batch export
+    "BatchJob",
+    "BatchResult",
+    "export_batch",
     # Type definitions for enhanced typing
     "CellValue",
     "CellStyle",
     "CommentOptions",
     "ImageOptions",
     "TableStyle",
+    "Aggregate",
+    "AggregateFunction",
+    "ExcelTableOptions",
+    "TotalFunction",
+    "PivotKey",
+    "PivotValue",
+    "CompressionProfile",
     # Column configuration types
     "Column",
     "ColumnDict",
@@ -53,4 +143,19 @@ __all__ = [
     "BorderStyle",
 ]
 
-__version__ = importlib.metadata.version("poi")
+
+def __getattr__(name: str) -> Any:
+    if name == "__version__":
+        from importlib.metadata import version
+
+        return version("poi")
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted({*globals(), *_EXPORTS})
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+import datetime
+import math
+from collections.abc import Callable
+from typing import Any, Literal
+
+from xlsxwriter.utility import _datetime_to_excel_datetime
+
+AggregateFunction = Literal[
+    "sum", "count", "count_nums", "mean", "average", "min", "max", "std_dev", "var"
+]
+# A custom aggregate: reduces the values of a column like functools.reduce,
+# called with the result so far and the next non-blank value.
+Reducer = Callable[[Any, Any], Any]
+Aggregate = AggregateFunction | Reducer
+
+# The function numbers of SUBTOTAL, which ignores rows hidden by filters.
+SUBTOTAL_CODES = {
+    "average": 101,
+    "mean": 101,
+    "count_nums": 102,
+    "count": 103,
+    "max": 104,
+    "min": 105,
+    "std_dev": 107,
+    "sum": 109,
+    "var": 110,
+}
+
+
+def check_aggregate(aggregate: object) -> None:
+    if not callable(aggregate) and aggregate not in SUBTOTAL_CODES:
+        raise ValueError(
+            f"aggregate must be one of {', '.join(SUBTOTAL_CODES)} or a "
+            f"function, got {aggregate!r}"
+        )
+
+
+class Accumulator:
+    """Aggregates the values of a column in one pass, as Excel would.
+
+    Blank values are skipped, ``count`` counts the others, and the numeric
+    functions only look at numbers, dates and times (which are numbers in
+    Excel).  Only running sums are kept, never the values, so memory does
+    not grow with the number of rows.  Other strings than the known function
+    names are formulas Excel evaluates; their value is 0.
+    """
+
+    __slots__ = ("function", "count", "n", "sum", "squares", "min", "max", "result")
+
+    def __init__(self, function: Aggregate | str) -> None:
+        self.function = function
+        self.reset()
+
+    def reset(self) -> None:
+        # Non-blank values, and numbers among them.
+        self.count = 0
+        self.n = 0
+        self.sum: float = 0
+        self.squares: float = 0
+        # (number, value) of the smallest and largest value.
+        self.min: tuple[float, Any] | None = None
+        self.max: tuple[float, Any] | None = None
+        self.result: Any = None
+
+    def add(self, value: Any) -> None:
+        if value is None or value == "":
+            return
+        self.count += 1
+        function = self.function
+        if callable(function):
+            result = self.result
+            self.result = value if self.count == 1 else function(result, value)
+            return
+        if isinstance(value, datetime.date | datetime.time):
+            number = _datetime_to_excel_datetime(value, False, True)
+        elif isinstance(value, bool) or not isinstance(value, int | float):
+            return
+        else:
+            number = value
+        self.n += 1
+        self.sum += number
+        self.squares += number * number
+        if self.min is None or number < self.min[0]:
+            self.min = (number, value)
+        if self.max is None or number > self.max[0]:
+            self.max = (number, value)
+
+    @property
+    def value(self) -> Any:
+        function, n = self.function, self.n
+        if callable(function):
+            return self.result
+        if function == "count":
+            return self.count
+        if function == "count_nums":
+            return n
+        if function == "sum":
+            return self.sum
+        if n == 0:
+            return 0
+        if function in ("average", "mean"):
+            return self.sum / n
+        if function == "min":
+            assert self.min is not None
+            return self.min[1]
+        if function == "max":
+            assert self.max is not None
+            return self.max[1]
+        if function in ("var", "std_dev") and n > 1:
+            var = max(self.squares - self.sum * self.sum / n, 0) / (n - 1)
+            return var if function == "var" else math.sqrt(var)
+        return 0
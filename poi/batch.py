@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import os
+import time
+import traceback
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from io import BytesIO
+from typing import Any, NamedTuple
+
+from .book import Book
+from .nodes import Box
+from .sheet import Sheet
+
+Report = Sheet | Book | Box | list[Box]
+Output = str | os.PathLike[str] | Callable[[bytes], Any] | None
+
+
+class BatchJob(NamedTuple):
+    """A picklable report spec.
+
+    ``build(data)`` is called in a worker process and must return a ``Sheet``,
+    ``Book`` or Box tree.  When ``build`` is omitted, ``data`` itself is the
+    report.  ``output`` is a file path the worker writes to, a callable sink
+    that receives the xlsx bytes in the parent process, or ``None`` to return
+    the bytes in ``BatchResult.content``.
+    """
+
+    build: Callable[[Any], Report] | None = None
+    data: Any = None
+    output: Output = None
+
+
+class BatchResult(NamedTuple):
+    """Outcome of a single ``BatchJob``."""
+
+    job_index: int
+    output: Output
+    content: bytes | None
+    elapsed: float
+    error: BaseException | None = None
+    traceback: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _render_report(report: Report) -> BytesIO:
+    if isinstance(report, Sheet | Book):
+        return report.write_to_bytes_io()
+    return Sheet(report).write_to_bytes_io()
+
+
+def _run_job(
+    index: int,
+    build: Callable[[Any], Report] | None,
+    data: Any,
+    path: str | None,
+) -> BatchResult:
+    start = time.perf_counter()
+    try:
+        report = build(data) if build is not None else data
+        content: bytes | None = _render_report(report).read()
+        if path is not None:
+            with open(path, "wb") as f:
+                f.write(content)  # type: ignore[arg-type]
+            content = None
+    except Exception as e:
+        return BatchResult(
+            index,
+            path,
+            None,
+            time.perf_counter() - start,
+            e,
+            traceback.format_exc(),
+        )
+    return BatchResult(index, path, content, time.perf_counter() - start)
+
+
+def _finish(result: BatchResult, job: BatchJob) -> BatchResult:
+    # Restore the caller's output object and feed callable sinks, which live in
+    # the parent process.
+    result = result._replace(output=job.output)
+    if result.ok and callable(job.output):
+        start = time.perf_counter()
+        try:
+            job.output(result.content)  # type: ignore[arg-type]
+        except Exception as e:
+            return result._replace(error=e, traceback=traceback.format_exc())
+        result = result._replace(
+            content=None, elapsed=result.elapsed + time.perf_counter() - start
+        )
+    return result
+
+
+def _job_args(index: int, job: BatchJob) -> tuple[Any, ...]:
+    path = None if job.output is None or callable(job.output) else job.output
+    return index, job.build, job.data, os.fspath(path) if path is not None else None
+
+
+def export_batch(
+    jobs: Iterable[BatchJob],
+    workers: int | None = None,
+    ordered: bool = True,
+    max_pending: int | None = None,
+) -> Iterator[BatchResult]:
+    """Render independent reports in a process pool.
+
+    Results are yielded in job order when ``ordered`` is true, otherwise as
+    soon as each job completes.  Failures never abort the batch; they are
+    reported through ``BatchResult.error``.  At most ``max_pending`` jobs
+    (default ``2 * workers``) are in flight or buffered at once, so ``jobs``
+    may be a lazy iterable of any length.  ``workers=1`` renders in the
+    current process without pickling.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for index, job in enumerate(jobs):
+            yield _finish(_run_job(*_job_args(index, job)), job)
+        return
+
+    max_pending = max_pending or workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: dict[Future[BatchResult], tuple[int, BatchJob]] = {}
+        done_results: dict[int, BatchResult] = {}
+        next_index = 0
+
+        def collect(block: bool) -> Iterator[BatchResult]:
+            nonlocal next_index
+            if not pending:
+                return
+            done, _ = wait(
+                pending, timeout=None if block else 0, return_when=FIRST_COMPLETED
+            )
+            for future in done:
+                index, job = pending.pop(future)
+                start = time.perf_counter()
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The job could not be shipped to or back from the worker,
+                    # e.g. an unpicklable build callable.
+                    result = BatchResult(
+                        index,
+                        job.output,
+                        None,
+                        time.perf_counter() - start,
+                        e,
+                        traceback.format_exc(),
+                    )
+                result = _finish(result, job)
+                if ordered:
+                    done_results[index] = result
+                else:
+                    yield result
+            while next_index in done_results:
+                yield done_results.pop(next_index)
+                next_index += 1
+
+        for index, job in enumerate(jobs):
+            while pending and len(pending) + len(done_results) >= max_pending:
+                yield from collect(block=True)
+            pending[executor.submit(_run_job, *_job_args(index, job))] = (index, job)
+            yield from collect(block=False)
+
+        while pending:
+            yield from collect(block=True)
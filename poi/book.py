@@ -1,32 +1,256 @@
 from __future__ import annotations
 
+import pickle
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ProcessPoolExecutor
 from io import BytesIO
+from typing import Any, TypeAlias
 
+from .budget import Budget, MemoryGuard
+from .images import ImagePipeline
+from .incremental import SheetReuse
+from .instrument import Instrumentation, make_writer
+from .packager import CompressionProfile, mirrors_upstream
+from .progress import CancelToken, Monitor, ProgressCallback
 from .sheet import Sheet
+from .sheet_xml import RenderedSheet, RenderedWorksheet, has_parts
+from .visitors.estimator import Estimate, estimate
 from .visitors.writer import writer_visitor
-from .writer import BytesIOWorkBook, Writer
+from .writer import BytesIOWorkBook, Op, RecordingWriter, replay
+
+# A sheet, or a function building it when the book is written.
+SheetSource: TypeAlias = Sheet | Callable[[], Sheet]
+
+
+def _build(source: SheetSource) -> Sheet:
+    return source if isinstance(source, Sheet) else source()
+
+
+def _record_sheet(source: SheetSource) -> list[Op]:
+    writer = RecordingWriter()
+    _build(source).root.accept(writer_visitor(writer))
+    return writer.ops
+
+
+def _render_pickled_sheet(data: bytes, selected: bool) -> RenderedSheet | list[Op]:
+    """The XML of a sheet, or its cell writes for the parent to replay when
+    it has parts of its own, such as images or Excel tables."""
+    ops = _record_sheet(pickle.loads(data))
+    workbook = BytesIOWorkBook()
+    worksheet = workbook.add_worksheet()
+    replay(ops, make_writer(workbook, worksheet, None, None))
+    if has_parts(worksheet):
+        return ops
+    return RenderedSheet.render(workbook.workbook, worksheet, selected)
 
 
 class Book:
-    def __init__(self) -> None:
-        self.sheets: list[Sheet] = []
+    """A workbook made of several sheets.
+
+    ``workers`` > 1 renders the sheets in that many worker processes, which
+    also generate the worksheet XML.  The parent adds the strings and styles
+    of each sheet to the workbook in sheet order and renumbers the XML to
+    match, so the output is identical to the serial path.  Sheets with parts
+    of their own (images, hyperlinks, Excel tables...) are sent back as cell
+    writes and replayed in the parent instead.  Sheets that cannot be pickled
+    (e.g. lambda render callbacks) are rendered in the parent; add them as
+    module-level functions building the sheet to render them in the workers.
+
+    ``compression`` selects a compression profile (``"fastest"``,
+    ``"balanced"`` or ``"smallest"``) or zlib level for the package, which is
+    then deflated in parallel threads on close.
+
+    ``instrumentation`` records timings and counters of the write; with
+    ``workers`` it only sees the sheets rendered in the parent process.
+
+    ``budget`` limits the size of the whole book, see ``Budget``; when it falls
+    back to constant memory mode the sheets are rendered serially.  Constant
+    memory mode applies to the whole workbook, so all sheets are measured
+    before the first one is written, building those added as functions twice.
 
-    def add_sheet(self, worksheet: Sheet) -> None:
+    ``add_sheet`` also takes a function returning the ``Sheet``, which is
+    called when the sheet is written, and the sheet is dropped right after,
+    so only one sheet's tree and data are held at a time.  With ``workers``
+    the function is called in the worker process if it can be pickled.
+
+    ``incremental`` keeps the compressed XML of every written sheet, and later
+    writes copy it for sheets whose content did not change instead of
+    rendering them again.  Sheets are compared by the pickled laid-out tree,
+    so sheets that cannot be pickled or are built by a function are always
+    rendered, as are sheets with
+    images, hyperlinks or other parts of their own.  The package is always
+    compressed by poi (with ``"balanced"`` unless ``compression`` is set).
+    """
+
+    def __init__(
+        self,
+        workers: int = 0,
+        compression: CompressionProfile | int | None = None,
+        instrumentation: Instrumentation | None = None,
+        budget: Budget | None = None,
+        properties: dict[str, Any] | None = None,
+        image_pipeline: ImagePipeline | None = None,
+        incremental: bool = False,
+    ) -> None:
+        self.sheets: list[SheetSource] = []
+        self.workers = workers
+        self.compression = compression
+        self.instrumentation = instrumentation
+        self.budget = budget
+        # Document properties, see xlsxwriter's Workbook.set_properties().
+        self.properties = properties
+        # Downscales images when the workbook is closed, see ImagePipeline.
+        self.image_pipeline = image_pipeline
+        self.reuse = SheetReuse() if incremental else None
+
+    def add_sheet(self, worksheet: SheetSource) -> None:
+        """Add a ``Sheet``, or a function building it when the book is written.
+
+        With a ``budget``, or for ``estimate()``, the function is called once
+        more beforehand to measure the sheet, so it should be cheap to call
+        again and return the same sheet.
+        """
         self.sheets.append(worksheet)
 
-    def write(self, filename: str) -> None:
-        data = self.write_to_bytes_io()
+    def iter_sheets(self) -> Iterator[Sheet]:
+        """Yield the sheets in order, building the lazy ones one at a time."""
+        for source in self.sheets:
+            yield _build(source)
+
+    def estimate(self) -> Estimate:
+        """Predict the cost of writing this book, see ``Sheet.estimate``.
+
+        Sheets added as functions are built for the estimate and dropped.
+        """
+        return estimate(sheet.root for sheet in self.iter_sheets())
+
+    def write(
+        self,
+        filename: str,
+        progress: ProgressCallback | None = None,
+        cancel: CancelToken | None = None,
+        progress_interval: int = 1000,
+    ) -> None:
+        data = self.write_to_bytes_io(progress, cancel, progress_interval)
         with open(filename, "wb") as f:
             f.write(data.read())
             data.close()
 
-    def write_to_bytes_io(self) -> BytesIO:
-        workbook = BytesIOWorkBook()
-        for sheet in self.sheets:
-            worksheet = workbook.add_worksheet()
-            writer = Writer(workbook, worksheet)
-            visitor = writer_visitor(writer)
-            sheet.root.accept(visitor)
+    def write_to_bytes_io(
+        self,
+        progress: ProgressCallback | None = None,
+        cancel: CancelToken | None = None,
+        progress_interval: int = 1000,
+    ) -> BytesIO:
+        """Write the book into an in-memory xlsx file.
+
+        ``progress`` and ``cancel`` work as for ``Sheet.write_to_bytes_io``;
+        with ``workers`` they are checked between sheets.
+        """
+        budget = self.budget
+        constant_memory = budget is not None and budget.plan(
+            sheet.root for sheet in self.iter_sheets()
+        )
+        guard = budget.guard() if budget is not None else None
+        monitor = None
+        if progress is not None or cancel is not None:
+            monitor = Monitor(progress, cancel)
+        reuse = None if constant_memory or not mirrors_upstream() else self.reuse
+        compression = self.compression
+        if reuse is not None and compression is None:
+            compression = "balanced"
+        workbook = BytesIOWorkBook(
+            compression,
+            constant_memory=constant_memory,
+            properties=self.properties,
+            image_pipeline=self.image_pipeline,
+        )
+        reused: set[int] = set()
+        if reuse is not None:
+            reused = reuse.prime(workbook.workbook, self.sheets)
+        if self.workers > 1 and len(self.sheets) > 1 and not constant_memory:
+            self._write_parallel(workbook, guard, monitor, reused)
+        else:
+            for i, source in enumerate(self.sheets):
+                worksheet = workbook.add_worksheet()
+                if i in reused:
+                    continue
+                sheet = _build(source)
+                writer = make_writer(workbook, worksheet, None, self.instrumentation)
+                if budget is not None:
+                    budget.attach(writer, guard)
+                if monitor is not None:
+                    monitor.begin_sheet(i, sheet.root.row)
+                    writer.add_checkpoint(monitor, progress_interval)
+                visitor = writer_visitor(writer)
+                sheet.root.accept(visitor)
+                if monitor is not None:
+                    monitor.end_sheet(worksheet)
+                # Free the tree and data before the next sheet is built.
+                del sheet, visitor
 
-        workbook.close()
+        if reuse is not None:
+            reuse.collect(workbook.workbook, reused)
+        if self.instrumentation is None:
+            workbook.close()
+        else:
+            with self.instrumentation.phase("close"):
+                workbook.close()
+            self.instrumentation.report()
+        if reuse is not None:
+            reuse.update(workbook.workbook, reused)
         return workbook.io
+
+    def _write_parallel(
+        self,
+        workbook: BytesIOWorkBook,
+        guard: MemoryGuard | None,
+        monitor: Monitor | None,
+        reused: set[int],
+    ) -> None:
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures: list[Future[RenderedSheet | list[Op]] | None] = []
+            for i, source in enumerate(self.sheets):
+                if i in reused:
+                    futures.append(None)
+                    continue
+                try:
+                    data = pickle.dumps(source)
+                except (pickle.PicklingError, AttributeError, TypeError):
+                    futures.append(None)
+                else:
+                    futures.append(executor.submit(_render_pickled_sheet, data, i == 0))
+
+            try:
+                for i, (source, future) in enumerate(
+                    zip(self.sheets, futures, strict=True)
+                ):
+                    result = future.result() if future else None
+                    if isinstance(result, RenderedSheet):
+                        worksheet = workbook.add_worksheet(
+                            worksheet_class=RenderedWorksheet
+                        )
+                        worksheet.attach(result, workbook.workbook)
+                    else:
+                        worksheet = workbook.add_worksheet()
+                        if i in reused:
+                            continue
+                        writer = make_writer(
+                            workbook, worksheet, None, self.instrumentation
+                        )
+                        if result is None:
+                            _build(source).root.accept(writer_visitor(writer))
+                        else:
+                            replay(result, writer)
+                    if guard is not None:
+                        guard()
+                    if monitor is not None and worksheet.dim_rowmax is not None:
+                        # The tree stays in the worker.
+                        monitor.begin_sheet(i, worksheet.dim_rowmin)
+                        monitor.end_sheet(worksheet)
+            except BaseException:
+                # Do not keep workers busy with sheets nobody will write.
+                for pending in futures:
+                    if pending is not None:
+                        pending.cancel()
+                raise
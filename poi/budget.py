@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from collections.abc import Iterable
+from typing import Literal
+
+from .nodes import Box
+from .visitors.estimator import Estimate, estimate
+from .writer import Writer
+
+logger = logging.getLogger(__name__)
+
+OnExceed = Literal["stream", "raise"]
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised when a workbook does not fit its ``Budget``."""
+
+
+def _rss() -> int | None:
+    """Resident memory of this process in bytes, if it can be measured."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # Only the peak is available here, which is a conservative stand-in.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class MemoryGuard:
+    """Raises ``BudgetExceededError`` once memory has grown by more than
+    ``limit`` bytes since the guard was created.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.baseline = _rss()
+
+    def __call__(self, row: int = 0) -> None:
+        if self.baseline is None:
+            return
+        current = _rss()
+        assert current is not None
+        used = current - self.baseline
+        if used > self.limit:
+            raise BudgetExceededError(
+                f"writing used {used} bytes, over the memory budget of "
+                f"{self.limit} bytes"
+            )
+
+
+class Budget:
+    """Limits on the size of a workbook, checked before and while writing.
+
+    Before writing, the number of cells and the memory the workbook will hold
+    are estimated from the laid-out tree.  When either is over ``max_cells`` or
+    ``max_memory`` (in bytes), ``on_exceed="stream"`` writes in xlsxwriter's
+    constant memory mode instead, which needs the cells to be written top to
+    bottom: Tables that are not native Excel tables, and Rows holding
+    single-row children, stacked in Cols.
+    Trees that cannot be streamed, or ``on_exceed="raise"``, raise
+    ``BudgetExceededError``.
+
+    While writing, memory growth is measured every ``check_interval`` rows and
+    the write is aborted with ``BudgetExceededError`` once it passes
+    ``max_memory``.  This is the only check for lazy children, whose size is
+    unknown in advance.
+
+    Constant memory mode is an option of the whole workbook, so a ``Book``
+    estimates all its sheets up front, and calls the functions passed to
+    ``Book.add_sheet`` once for the estimate and once more to write them.
+    """
+
+    def __init__(
+        self,
+        max_cells: int | None = None,
+        max_memory: int | None = None,
+        on_exceed: OnExceed = "stream",
+        check_interval: int = 1000,
+    ) -> None:
+        if on_exceed not in ("stream", "raise"):
+            raise ValueError(
+                f"on_exceed must be 'stream' or 'raise', got {on_exceed!r}"
+            )
+        if check_interval < 1:
+            raise ValueError(f"check_interval must be positive, got {check_interval}")
+        self.max_cells = max_cells
+        self.max_memory = max_memory
+        self.on_exceed = on_exceed
+        self.check_interval = check_interval
+
+    def _exceeded(self, cost: Estimate) -> str | None:
+        if self.max_cells is not None and cost.cells > self.max_cells:
+            return f"{cost.cells} cells exceed the budget of {self.max_cells}"
+        if self.max_memory is not None and cost.memory > self.max_memory:
+            return (
+                f"an estimated {cost.memory} bytes exceed the memory budget of "
+                f"{self.max_memory}"
+            )
+        return None
+
+    def plan(
+        self, roots: Iterable[Box], fast: bool = False, can_stream: bool = True
+    ) -> bool:
+        """Estimate ``roots`` and return whether they have to be written in
+        constant memory mode, raising ``BudgetExceededError`` if they do not
+        fit at all.
+        """
+        cost = estimate(roots, fast)
+        reason = self._exceeded(cost)
+        if reason is None:
+            return False
+        if self.on_exceed == "stream":
+            if not can_stream:
+                reason += " and the workbook is not in constant memory mode"
+            elif not cost.row_ordered:
+                reason += " and the layout cannot be written in constant memory mode"
+            else:
+                logger.info("%s, writing in constant memory mode", reason)
+                return True
+        raise BudgetExceededError(reason)
+
+    def guard(self) -> MemoryGuard | None:
+        """A checkpoint enforcing ``max_memory`` from now on."""
+        if self.max_memory is None:
+            return None
+        return MemoryGuard(self.max_memory)
+
+    def attach(self, writer: Writer, guard: MemoryGuard | None) -> None:
+        if guard is not None:
+            writer.add_checkpoint(guard, self.check_interval)
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+import copy
+import datetime
+import hashlib
+import importlib.metadata
+import os
+import tempfile
+from io import BytesIO
+from typing import Any
+
+from .book import Book
+from .sheet import Sheet
+from .visitors.writer import writer_visitor
+from .writer import Writer
+
+# Reports rendered through the cache are stamped with this creation date, so
+# rendering the same report twice gives byte-identical files.
+FIXED_CREATED = datetime.datetime(1980, 1, 1, tzinfo=datetime.UTC)
+
+
+def _encode(value: Any) -> bytes:
+    if isinstance(value, BytesIO):
+        return b"<bytes " + hashlib.blake2b(value.getbuffer()).digest() + b">"
+    if isinstance(value, bytes | bytearray | memoryview):
+        return b"<bytes " + hashlib.blake2b(value).digest() + b">"
+    if isinstance(value, dict):
+        items = sorted(value.items(), key=lambda item: str(item[0]))
+        return b"{" + b",".join(_encode(k) + b":" + _encode(v) for k, v in items) + b"}"
+    if isinstance(value, list | tuple):
+        return b"[" + b",".join(_encode(v) for v in value) + b"]"
+    return repr(value).encode()
+
+
+class _HashingWorksheet:
+    def __init__(self, digest: Any) -> None:
+        self._digest = digest
+
+    def __getattr__(self, name: str) -> Any:
+        def record(*args: Any) -> None:
+            self._digest.update(name.encode() + _encode(args))
+
+        return record
+
+
+class HashingWriter(Writer):
+    """A ``Writer`` that feeds every call into a hash instead of a workbook.
+
+    Running the writer visitor with it hashes exactly what would be written:
+    the rendered values, the resolved formats and the worksheet settings.
+    Images given by path are hashed by path and content.
+    """
+
+    def __init__(self, digest: Any) -> None:
+        self.digest = digest
+        self.file_digests: dict[str, bytes] = {}
+        self.worksheet = _HashingWorksheet(digest)
+        self.global_format = None
+        self.global_format_dict = {}
+        self.formats = {}
+
+    def write(self, *args: Any) -> None:
+        self.digest.update(b"w" + _encode(args))
+
+    def write_formula(self, *args: Any) -> None:
+        self.digest.update(b"f" + _encode(args))
+
+    def merge_range(self, *args: Any) -> None:
+        self.digest.update(b"m" + _encode(args))
+
+    def insert_image(self, row: int, col: int, source: Any, *args: Any) -> None:
+        if isinstance(source, str | os.PathLike):
+            path = os.fspath(source)
+            if path not in self.file_digests:
+                with open(path, "rb") as f:
+                    self.file_digests[path] = hashlib.file_digest(f, "blake2b").digest()
+            source = (path, self.file_digests[path])
+        self.digest.update(b"i" + _encode((row, col, source, *args)))
+
+    def add_table(self, *args: Any) -> None:
+        self.digest.update(b"t" + _encode(args))
+
+    def resolve_format(self, cell_format: dict[str, Any]) -> Any:
+        return cell_format
+
+
+def _properties(report: Sheet | Book) -> dict[str, Any]:
+    return {"created": FIXED_CREATED, **(report.properties or {})}
+
+
+def content_key(report: Sheet | Book) -> str:
+    """A stable hash of everything that determines the output of ``report``.
+
+    The tree is walked as if it was written, so ``render`` callbacks and
+    ``cell_style`` conditions run once; trees with lazy children or cursor
+    data cannot be walked twice and need an explicit key.
+    """
+    digest = hashlib.blake2b(digest_size=20)
+    digest.update(importlib.metadata.version("poi").encode())
+    sheets = report.iter_sheets() if isinstance(report, Book) else [report]
+    settings: dict[str, Any] = {
+        "type": type(report).__name__,
+        "compression": report.compression,
+        "properties": _properties(report),
+        "images": report.image_pipeline and report.image_pipeline.settings,
+    }
+    digest.update(_encode(settings))
+    for sheet in sheets:
+        if sheet.root.single_pass:
+            raise ValueError(
+                "reports with lazy children or cursor data cannot be hashed, "
+                "pass a cache key"
+            )
+        # Book writes every sheet with the defaults, see Book.write_to_bytes_io.
+        if isinstance(report, Sheet):
+            fast, global_format = sheet.fast, sheet.global_format
+        else:
+            fast, global_format = False, None
+        digest.update(b"sheet" + _encode((fast, global_format)))
+        sheet.root.accept(writer_visitor(HashingWriter(digest), fast=fast))
+    return digest.hexdigest()
+
+
+class OutputCache:
+    """A size-bounded cache of rendered workbooks on local disk.
+
+    Files are named after the content key of the report (or a hash of the key
+    passed to ``render``), and the least recently used files are removed once
+    the directory grows over ``max_bytes``.  Writes are atomic, so several
+    processes can share a directory.
+    """
+
+    def __init__(
+        self, directory: str | os.PathLike[str], max_bytes: int = 1 << 30
+    ) -> None:
+        self.directory = os.fspath(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.xlsx")
+
+    def get(self, key: str) -> bytes | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # The modification time orders the files for eviction.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".xlsx"):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def clear(self) -> None:
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".xlsx"):
+                os.unlink(entry.path)
+
+    def render(self, report: Sheet | Book, key: str | None = None) -> BytesIO:
+        """Return the output of ``report.write_to_bytes_io()``, rendering it
+        only when it is not cached yet.
+
+        Without ``key`` the report is identified by its ``content_key``.  The
+        creation date of the document is fixed unless set in ``properties``,
+        so outputs are reproducible.
+        """
+        if key is None:
+            key = content_key(report)
+        else:
+            key = hashlib.blake2b(key.encode(), digest_size=20).hexdigest()
+        data = self.get(key)
+        if data is None:
+            # The fixed date is for this write only, not the caller's report.
+            report = copy.copy(report)
+            report.properties = _properties(report)
+            data = report.write_to_bytes_io().getvalue()
+            self.put(key, data)
+        return BytesIO(data)
@@ -0,0 +1,261 @@
+"""Convert CSV, TSV and JSON lines files to styled xlsx from the command line::
+
+    poi sales.csv --spec sales.json -o sales.xlsx
+    zcat events.jsonl.gz | poi - --format jsonl -o events.xlsx
+
+Records are streamed into a ``SheetStream``, so memory stays flat however
+large the input.  Only the standard library is imported until records are
+written, which keeps startup fast for many short conversions.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import io
+import json
+import os
+import re
+import sys
+from collections.abc import Iterable, Iterator
+from itertools import chain, islice
+from pathlib import Path
+from typing import IO, Any
+
+FORMATS = {
+    ".csv": "csv",
+    ".tsv": "tsv",
+    ".tab": "tsv",
+    ".jsonl": "jsonl",
+    ".ndjson": "jsonl",
+}
+
+# Spec keys passed on to the table as they are, besides "columns" and "style".
+TABLE_OPTIONS = (
+    "col_width",
+    "cell_style",
+    "date_format",
+    "datetime_format",
+    "time_format",
+    "footer",
+    "footer_formulas",
+    "footer_label",
+    "global_format",
+)
+
+# The rows of an Excel worksheet.
+MAX_ROWS = 1_048_576
+
+_NUMBER = re.compile(r"-?(0|[1-9]\d*)(\.\d+)?([eE][-+]?\d+)?")
+
+
+def parse_value(value: str) -> Any:
+    """A CSV field as a number if it looks like one, None if it is empty.
+
+    Fields with leading zeros, such as zip codes, stay text.
+    """
+    if not value:
+        return None
+    match = _NUMBER.fullmatch(value)
+    if match is None:
+        return value
+    if match.group(2) or match.group(3):
+        return float(value)
+    return int(value)
+
+
+def read_csv(
+    stream: IO[str], delimiter: str = ",", infer: bool = True
+) -> tuple[list[str], Iterator[dict[str, Any]]]:
+    """The field names of the header row, and the records of the others."""
+    reader = csv.reader(stream, delimiter=delimiter)
+    fields = next(reader, [])
+
+    def records() -> Iterator[dict[str, Any]]:
+        for row in reader:
+            values: Iterable[Any] = map(parse_value, row) if infer else row
+            yield dict(zip(fields, values, strict=False))
+
+    return fields, records()
+
+
+def read_jsonl(stream: IO[str]) -> tuple[list[str], Iterator[dict[str, Any]]]:
+    """The keys of the first record, and all the records."""
+
+    def records() -> Iterator[dict[str, Any]]:
+        for n, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"line {n}: {e}") from None
+            if not isinstance(record, dict):
+                raise ValueError(f"line {n}: expected an object, got {line.strip()}")
+            yield record
+
+    items = records()
+    first = next(items, None)
+    if first is None:
+        return [], items
+    return list(first), chain((first,), items)
+
+
+def load_spec(path: str) -> dict[str, Any]:
+    """Read a JSON spec of ``columns``, table-wide ``style`` and table options.
+
+    Columns are attrs, ``[attr, title]`` pairs or column dicts, like::
+
+        {
+            "columns": ["name", ["amount", "Amount"], {"attr": "day", "width": 12}],
+            "style": {"border": 1, "font_size": 10},
+            "footer": {"Amount": "sum"}
+        }
+    """
+    with open(path, encoding="utf-8") as f:
+        spec = json.load(f)
+    if not isinstance(spec, dict):
+        raise ValueError("the spec must be a JSON object")
+    unknown = set(spec) - {"columns", "style", *TABLE_OPTIONS}
+    if unknown:
+        raise ValueError(f"unknown spec keys: {sorted(unknown)}")
+    if not isinstance(spec.get("cell_style", ""), str):
+        # Conditions are functions, which JSON cannot express.
+        raise ValueError("cell_style must be a style string")
+    return spec
+
+
+def column_config(column: Any) -> dict[str, Any]:
+    if isinstance(column, str):
+        return {"attr": column, "title": column}
+    if isinstance(column, list) and len(column) == 2:
+        return {"attr": column[0], "title": column[1]}
+    if isinstance(column, dict) and ("title" in column or "attr" in column):
+        return {"title": column.get("attr"), **column}
+    raise ValueError(f"columns must be attrs, [attr, title] or dicts, got {column!r}")
+
+
+def sample_widths(columns: list[dict[str, Any]], sample: list[Any]) -> None:
+    """Set the width of the columns without one to fit the ``sample`` records,
+    rather than measuring every written cell."""
+    from .utils import get_obj_attr
+    from .visitors.writer import fit_width, get_string_width
+
+    for column in columns:
+        if "width" in column or not column.get("attr"):
+            continue
+        num_format = (column.get("format") or {}).get("num_format")
+        width = get_string_width(column["title"])
+        for record in sample:
+            value = get_obj_attr(record, column["attr"])
+            width = max(width, get_string_width(value, num_format))
+        column["width"] = fit_width(width)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="poi", description="Stream a CSV, TSV or JSON lines file into xlsx."
+    )
+    parser.add_argument("input", help="input file, or - for stdin")
+    parser.add_argument(
+        "-o", "--output", help="xlsx file, the input with an .xlsx suffix by default"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(set(FORMATS.values())),
+        help="input format, from the input suffix by default",
+    )
+    parser.add_argument("-s", "--spec", help="JSON spec of columns and styles")
+    parser.add_argument("--encoding", default="utf-8-sig", help="input encoding")
+    parser.add_argument(
+        "--no-infer",
+        dest="infer",
+        action="store_false",
+        help="keep CSV fields as text instead of reading numbers",
+    )
+    parser.add_argument(
+        "--constant-memory",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="flush rows as they are written (default), or keep them until "
+        "the end for smaller files",
+    )
+    parser.add_argument(
+        "--auto-width",
+        type=int,
+        default=0,
+        metavar="N",
+        help="fit the width of columns to their first N records",
+    )
+    parser.add_argument(
+        "--max-rows",
+        type=int,
+        metavar="N",
+        help="records per sheet before starting a new one, as many as fit by default",
+    )
+    parser.add_argument("--fast", action="store_true", help="skip writing blank cells")
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    source = args.input
+    fmt = args.format or FORMATS.get(Path(source).suffix.lower())
+    if fmt is None:
+        parser.error("cannot tell the input format, use --format")
+    output = args.output
+    if output is None:
+        if source == "-":
+            parser.error("--output is required when reading stdin")
+        output = Path(source).with_suffix(".xlsx")
+
+    try:
+        spec = load_spec(args.spec) if args.spec else {}
+        if source == "-":
+            stream = io.TextIOWrapper(
+                sys.stdin.buffer, encoding=args.encoding, newline=""
+            )
+        else:
+            stream = open(source, encoding=args.encoding, newline="")
+        with stream:
+            if fmt == "jsonl":
+                fields, records = read_jsonl(stream)
+            else:
+                delimiter = "\t" if fmt == "tsv" else ","
+                fields, records = read_csv(stream, delimiter, args.infer)
+            columns = [column_config(c) for c in spec.get("columns", fields)]
+            if not columns:
+                parser.error("the input has no columns")
+            sample = list(islice(records, args.auto_width))
+            if sample:
+                sample_widths(columns, sample)
+            options = {key: spec[key] for key in TABLE_OPTIONS if key in spec}
+            max_rows = args.max_rows
+            if max_rows is None:
+                max_rows = MAX_ROWS - 1 - bool(spec.get("footer"))
+
+            from .stream import SheetStream
+
+            # Only replace the output once it is complete, rather than leave
+            # a truncated file when the input fails part way.
+            output = Path(output)
+            partial = output.with_name(f".{output.name}.{os.getpid()}.tmp")
+            try:
+                with SheetStream(
+                    partial,
+                    columns,  # type: ignore[arg-type]
+                    fast=args.fast,
+                    max_rows=max_rows,
+                    constant_memory=args.constant_memory,
+                    **options,
+                    **spec.get("style", {}),
+                ) as sheet:
+                    sheet.extend(chain(sample, records))
+                os.replace(partial, output)
+            finally:
+                partial.unlink(missing_ok=True)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    return 0
@@ -0,0 +1,234 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import importlib.util
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from typing import Any, Literal, NamedTuple
+
+from xlsxwriter.image import Image as XlsxImage
+from xlsxwriter.worksheet import Worksheet
+
+# What an Image node or an image column value can be: a path, or the image
+# itself as bytes or a buffer.
+ImageSource = str | os.PathLike[str] | bytes | bytearray | memoryview | BytesIO
+
+
+def _digest(data: Any) -> bytes:
+    return hashlib.blake2b(data, digest_size=20).digest()
+
+
+class ImageCache:
+    """Loads every distinct image of a workbook once.
+
+    Images are keyed by path, or by a hash of their content for bytes and
+    buffers, and loaded into memory with their dimensions parsed the first
+    time they are seen.  Later inserts get a copy of that image, so repeated
+    thumbnails are neither read from disk nor parsed again, and the workbook
+    stores a single copy of each in the package.
+    """
+
+    def __init__(self) -> None:
+        self._images: dict[Any, XlsxImage] = {}
+
+    def get(self, source: ImageSource, options: dict[str, Any] | None) -> XlsxImage:
+        data = (options or {}).get("image_data")
+        if data is not None:
+            # xlsxwriter's form of in-memory images, ``source`` is a name.
+            key: Any = ("data", _digest(data.getbuffer()))
+        elif isinstance(source, BytesIO):
+            key = ("data", _digest(source.getbuffer()))
+        elif isinstance(source, bytes | bytearray | memoryview):
+            key = ("data", _digest(source))
+        else:
+            key = ("path", os.fspath(source))
+        image = self._images.get(key)
+        if image is None:
+            image = self._images[key] = self._load(source, data)
+        return copy.copy(image)
+
+    @staticmethod
+    def _load(source: ImageSource, data: BytesIO | None) -> XlsxImage:
+        if data is not None:
+            image = XlsxImage(BytesIO(data.getvalue()))
+            image.image_name = source
+        elif isinstance(source, BytesIO):
+            image = XlsxImage(BytesIO(source.getvalue()))
+        elif isinstance(source, bytes | bytearray | memoryview):
+            image = XlsxImage(BytesIO(bytes(source)))
+        else:
+            path = os.fspath(source)
+            with open(path, "rb") as f:
+                image = XlsxImage(BytesIO(f.read()))
+            image.image_name = os.path.basename(path)
+        return image
+
+
+ImageFormat = Literal["PNG", "JPEG"]
+# (pixels, x scale, y scale): the re-encoded image, or None to keep the
+# original, and the scale that gives the size it is shown at.
+_Processed = tuple[bytes | None, float, float]
+
+
+def _process(
+    data: bytes,
+    box: tuple[int, int] | None,
+    scale: tuple[float, float],
+    max_size: tuple[int, int] | None,
+    density: float,
+    format: ImageFormat | None,
+    quality: int,
+) -> _Processed:
+    from PIL import Image as PILImage
+
+    with PILImage.open(BytesIO(data)) as original:
+        img: PILImage.Image = original
+        width, height = img.size
+        x_dpi, y_dpi = (d or 96 for d in img.info.get("dpi", (96, 96)))
+        # The size the image is shown at, in pixels, as xlsxwriter sizes it.
+        shown_w = width * scale[0] * 96 / x_dpi
+        shown_h = height * scale[1] * 96 / y_dpi
+        factor = 1.0
+        for bound_w, bound_h in filter(None, (box, max_size)):
+            factor = min(factor, bound_w / shown_w, bound_h / shown_h)
+        shown_w *= factor
+        shown_h *= factor
+        target = (max(1, round(shown_w * density)), max(1, round(shown_h * density)))
+        if format is None and target[0] >= width and target[1] >= height:
+            return None, shown_w * x_dpi / 96 / width, shown_h * y_dpi / 96 / height
+
+        out_format = format or ("JPEG" if original.format == "JPEG" else "PNG")
+        mode = "RGB" if out_format == "JPEG" else "RGBA"
+        if img.mode not in (mode, "RGB", "L"):
+            img = img.convert(mode)
+        elif out_format == "JPEG" and img.mode != "L":
+            img = img.convert("RGB")
+        if target[0] < width or target[1] < height:
+            img = img.resize(target, PILImage.Resampling.LANCZOS)
+        out = BytesIO()
+        if out_format == "JPEG":
+            img.save(out, "JPEG", quality=quality, dpi=(96, 96))
+        else:
+            img.save(out, "PNG", dpi=(96, 96))
+        return out.getvalue(), shown_w / img.size[0], shown_h / img.size[1]
+
+
+class DeferredImage(NamedTuple):
+    """An ``insert_image`` call held back for an ``ImagePipeline``."""
+
+    worksheet: Worksheet
+    row: int
+    col: int
+    source: ImageSource
+    options: dict[str, Any]
+    span: tuple[int, int]
+
+
+class ImagePipeline:
+    """Downscales and re-encodes images before they are stored in a workbook.
+
+    Full-size photos in small cells make large files that are slow to write.
+    With a pipeline, images are not inserted right away: when the workbook is
+    closed, and the final column widths and row heights are known, each image
+    is resized to the size it is shown at, in a pool of ``workers`` threads
+    (or processes with ``processes=True``), and the smaller copy is stored.
+
+    ``fit`` also shrinks images to the cells they are anchored in (the cell of
+    an image column, the span of an ``Image``), and ``max_size`` caps the
+    shown size in pixels.  ``density`` keeps that many image pixels per screen
+    pixel, e.g. 2 for high-DPI displays.  Images keep their format (JPEG, or
+    PNG for anything else) unless ``format`` is given.
+
+    Results are cached by source and size for the lifetime of the pipeline,
+    so a pipeline shared by several exports processes each image once.
+    Needs Pillow (``pip install poi[images]``).
+    """
+
+    def __init__(
+        self,
+        fit: bool = True,
+        max_size: tuple[int, int] | None = None,
+        density: float = 1.0,
+        format: ImageFormat | None = None,
+        quality: int = 85,
+        workers: int | None = None,
+        processes: bool = False,
+    ) -> None:
+        if importlib.util.find_spec("PIL") is None:
+            raise ImportError(
+                "ImagePipeline needs Pillow, install it with pip install poi[images]"
+            )
+        if format not in (None, "PNG", "JPEG"):
+            raise ValueError(f"format must be 'PNG' or 'JPEG', got {format!r}")
+        if density <= 0:
+            raise ValueError(f"density must be positive, got {density}")
+        self.fit = fit
+        self.max_size = max_size
+        self.density = density
+        self.format = format
+        self.quality = quality
+        self.workers = workers
+        self.processes = processes
+        self._results: dict[Any, _Processed] = {}
+
+    @property
+    def settings(self) -> tuple[Any, ...]:
+        """What determines the output of the pipeline, for cache keys."""
+        return (self.fit, self.max_size, self.density, self.format, self.quality)
+
+    def _box(self, item: DeferredImage) -> tuple[int, int] | None:
+        if not self.fit:
+            return None
+        ws, options = item.worksheet, item.options
+        rows, cols = item.span
+        width = sum(ws._size_col(c) for c in range(item.col, item.col + cols))
+        height = sum(ws._size_row(r) for r in range(item.row, item.row + rows))
+        width -= options.get("x_offset", 0)
+        height -= options.get("y_offset", 0)
+        return max(1, width), max(1, height)
+
+    def insert(self, pending: list[DeferredImage], cache: ImageCache) -> None:
+        """Process the deferred images and insert them into their worksheets."""
+        keys = []
+        jobs: dict[Any, tuple[Any, ...]] = {}
+        for item in pending:
+            original = cache.get(item.source, item.options)
+            scale = (
+                item.options.get("x_scale", 1.0),
+                item.options.get("y_scale", 1.0),
+            )
+            box = self._box(item)
+            key = (original._digest, box, scale, *self.settings)
+            keys.append((key, original))
+            if key not in self._results and key not in jobs:
+                data = original.image_data.getvalue()
+                jobs[key] = (
+                    data,
+                    box,
+                    scale,
+                    self.max_size,
+                    self.density,
+                    self.format,
+                    self.quality,
+                )
+
+        pool = ProcessPoolExecutor if self.processes else ThreadPoolExecutor
+        if jobs:
+            with pool(self.workers) as executor:
+                futures = {
+                    key: executor.submit(_process, *args) for key, args in jobs.items()
+                }
+                for key, future in futures.items():
+                    self._results[key] = future.result()
+
+        for item, (key, original) in zip(pending, keys, strict=True):
+            data, x_scale, y_scale = self._results[key]
+            options = {**item.options, "x_scale": x_scale, "y_scale": y_scale}
+            if data is None:
+                image = original
+            else:
+                options["image_data"] = BytesIO(data)
+                image = cache.get(original.image_name, options)
+            item.worksheet.insert_image(item.row, item.col, image, options)
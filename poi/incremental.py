@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import copy
+import hashlib
+import pickle
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+from xlsxwriter.worksheet import CellRichStringTuple, CellStringTuple, Worksheet
+
+from .packager import CompressedPart, ParallelZipWorkbook
+from .sheet import Sheet
+from .sheet_xml import RenderedWorksheet
+
+
+def fingerprint(sheet: object) -> bytes | None:
+    """A hash of the inputs of ``sheet``: its laid-out tree, styles and data.
+
+    Sheets that cannot be pickled (lambda callbacks, lazy children) and
+    functions building a sheet have no fingerprint and are always rendered.
+    """
+    if not isinstance(sheet, Sheet):
+        return None
+    try:
+        data = pickle.dumps(sheet)
+    except (pickle.PicklingError, AttributeError, TypeError):
+        return None
+    return hashlib.blake2b(data, digest_size=20).digest()
+
+
+def _part_name(index: int) -> str:
+    return f"xl/worksheets/sheet{index + 1}.xml"
+
+
+def _self_contained(worksheet: Worksheet) -> bool:
+    # Whether the worksheet XML is the only part, and the workbook only refers
+    # to it by name, so the XML can be reused as is.
+    return not (
+        worksheet.external_hyper_links
+        or worksheet.external_drawing_links
+        or worksheet.external_comment_links
+        or worksheet.external_vml_links
+        or worksheet.external_table_links
+        or worksheet.external_background_links
+        or worksheet.autofilter_area
+        or worksheet.print_area_range
+        or worksheet.repeat_row_range
+        or worksheet.repeat_col_range
+        or worksheet.cond_formats
+        or worksheet.has_dynamic_arrays
+    )
+
+
+def _string_indices(worksheet: Worksheet) -> tuple[frozenset[int], int]:
+    if isinstance(worksheet, RenderedWorksheet):
+        return frozenset(worksheet.string_indices), worksheet.rendered.string_refs
+    indices = []
+    for cells in worksheet.table.values():
+        for cell in cells.values():
+            if isinstance(cell, CellStringTuple | CellRichStringTuple):
+                indices.append(cell.string)
+    return frozenset(indices), len(indices)
+
+
+class _CachedSheet(NamedTuple):
+    part: CompressedPart
+    # Shared string indices the XML refers to, and the number of references.
+    strings: frozenset[int]
+    string_refs: int
+
+
+class SheetReuse:
+    """Reuses the compressed worksheet XML of unchanged sheets between writes
+    of a ``Book``.
+
+    Worksheet XML refers to the workbook's shared strings and cell formats by
+    index.  Before the sheets are written, the workbook is primed with the
+    strings and formats of the previous write in their original order, so the
+    indices in the cached XML stay valid, and changed sheets add theirs after
+    them.  Strings no longer used linger in the table until more than half
+    of it is stale, then everything is rendered afresh.
+    """
+
+    def __init__(self) -> None:
+        self.level: int | None = None
+        self.strings: list[str] = []
+        self.formats: list[Any] = []
+        self.sheets: dict[tuple[int, bytes], _CachedSheet] = {}
+        self.fingerprints: list[bytes | None] = []
+        self.string_refs: dict[int, tuple[frozenset[int], int]] = {}
+
+    def prime(
+        self, workbook: ParallelZipWorkbook, sheets: Sequence[object]
+    ) -> set[int]:
+        """Prepare ``workbook`` for writing ``sheets`` and return the indices
+        of the sheets whose cached XML is reused.
+        """
+        self.fingerprints = [fingerprint(sheet) for sheet in sheets]
+        self.string_refs = {}
+        workbook.keep_parts = {
+            _part_name(i) for i, fp in enumerate(self.fingerprints) if fp is not None
+        }
+        if workbook.compression_level != self.level:
+            return set()
+        cached = {
+            i: self.sheets[(i, fp)]
+            for i, fp in enumerate(self.fingerprints)
+            if fp is not None and (i, fp) in self.sheets
+        }
+        live = frozenset().union(*(c.strings for c in cached.values()))
+        if not cached or 2 * len(live) < len(self.strings):
+            return set()
+
+        # Index 0 is the workbook's default format.
+        added = len(workbook.formats)
+        known = set(workbook.xf_format_indices)
+        for index, old in enumerate(self.formats[1:], 1):
+            fmt = copy.copy(old)
+            fmt.xf_index = fmt.dxf_index = None
+            fmt.xf_format_indices = workbook.xf_format_indices
+            fmt.dxf_format_indices = workbook.dxf_format_indices
+            workbook.formats.append(fmt)
+            if fmt._get_xf_index() != index:
+                del workbook.formats[added:]
+                for key in workbook.xf_format_indices.keys() - known:
+                    del workbook.xf_format_indices[key]
+                return set()
+        str_table = workbook.str_table
+        for string in self.strings:
+            str_table._get_shared_string_index(string)
+        # Count the references of the reused sheets only.
+        str_table.count += sum(c.string_refs for c in cached.values()) - len(
+            self.strings
+        )
+        for i, sheet in cached.items():
+            workbook.reused_parts[_part_name(i)] = sheet.part
+        return set(cached)
+
+    def collect(self, workbook: ParallelZipWorkbook, reused: set[int]) -> None:
+        """Record the strings of the rendered sheets, before closing."""
+        for i, worksheet in enumerate(workbook.worksheets()):
+            if i not in reused and self.fingerprints[i] is not None:
+                self.string_refs[i] = _string_indices(worksheet)
+
+    def update(self, workbook: ParallelZipWorkbook, reused: set[int]) -> None:
+        """Cache the parts of the closed ``workbook`` for the next write."""
+        sheets = {}
+        for i, worksheet in enumerate(workbook.worksheets()):
+            fp = self.fingerprints[i]
+            if fp is None:
+                continue
+            if i in reused:
+                sheets[(i, fp)] = self.sheets[(i, fp)]
+                continue
+            part = workbook.kept_parts.get(_part_name(i))
+            if part is not None and _self_contained(worksheet):
+                strings, refs = self.string_refs[i]
+                sheets[(i, fp)] = _CachedSheet(part, strings, refs)
+        self.level = workbook.compression_level
+        self.strings = workbook.str_table.string_array
+        self.formats = workbook.xf_formats
+        self.sheets = sheets
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import time
+from collections import Counter, defaultdict
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from typing import Any
+
+from xlsxwriter.worksheet import Worksheet
+
+from .writer import WorkBook, Writer
+
+PHASES = ("layout", "values", "formats", "autofit", "cells", "images", "close")
+
+
+class Instrumentation:
+    """Opt-in timings and counters for writing a ``Sheet`` or ``Book``.
+
+    Wall time is recorded per phase:
+
+    - ``layout``: laying out the Box tree,
+    - ``values``: ``attr`` lookups and ``render`` callbacks of Table columns,
+    - ``formats``: ``cell_style`` conditions and format resolution,
+    - ``autofit``: measuring values for ``width="auto"`` columns,
+    - ``cells``: xlsxwriter cell writes and merges,
+    - ``images``: image insertion,
+    - ``close``: assembling and compressing the package,
+
+    and value extraction time per Table column (by title).  Counters include
+    ``cells``, ``rows``, ``merges``, ``images``, ``formats_created`` and
+    ``format_cache_hits``.  ``as_dict()`` exports a
+    snapshot; ``callback`` receives one after every write.
+    """
+
+    def __init__(self, callback: Callable[[dict[str, Any]], Any] | None = None) -> None:
+        self.callback = callback
+        self.phases: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        self.columns: defaultdict[str, float] = defaultdict(float)
+        self.counters: Counter[str] = Counter()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def timed(
+        self,
+        fn: Callable[..., Any],
+        phase: str,
+        column_of: Callable[[tuple[Any, ...]], str] | None = None,
+    ) -> Callable[..., Any]:
+        """Wrap ``fn`` so its calls are added to ``phase``, and to the column
+        that ``column_of`` derives from the call arguments.
+        """
+        phases = self.phases
+        columns = self.columns
+        perf_counter = time.perf_counter
+
+        def wrapper(*args: Any) -> Any:
+            start = perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                elapsed = perf_counter() - start
+                phases[phase] += elapsed
+                if column_of is not None:
+                    columns[column_of(args)] += elapsed
+
+        return wrapper
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "phases": dict(self.phases),
+            "columns": dict(self.columns),
+            "counters": dict(self.counters),
+        }
+
+    def report(self) -> None:
+        if self.callback is not None:
+            self.callback(self.as_dict())
+
+
+class InstrumentedWriter(Writer):
+    """A ``Writer`` that records its calls in an ``Instrumentation``."""
+
+    instrumentation: Instrumentation
+
+    def __init__(
+        self,
+        workbook: WorkBook,
+        worksheet: Worksheet,
+        global_format: dict[str, Any] | None = None,
+        instrumentation: Instrumentation | None = None,
+    ) -> None:
+        super().__init__(workbook, worksheet, global_format)
+        self.instrumentation = instrumentation or Instrumentation()
+
+    def _calc_format(self, cell_format: Any) -> Any:
+        instrumentation = self.instrumentation
+        created = len(self.formats)
+        start = time.perf_counter()
+        fmt = super()._calc_format(cell_format)
+        instrumentation.phases["formats"] += time.perf_counter() - start
+        if isinstance(cell_format, dict) and cell_format:
+            if len(self.formats) > created:
+                instrumentation.counters["formats_created"] += 1
+            else:
+                instrumentation.counters["format_cache_hits"] += 1
+        return fmt
+
+    def _timed_write(
+        self, method: Callable[..., None], counter: str, *args: Any
+    ) -> None:
+        instrumentation = self.instrumentation
+        phases = instrumentation.phases
+        # Format resolution happens inside the call, keep it out of "cells".
+        formats = phases["formats"]
+        start = time.perf_counter()
+        method(*args)
+        elapsed = time.perf_counter() - start - (phases["formats"] - formats)
+        phases["images" if counter == "images" else "cells"] += elapsed
+        instrumentation.counters[counter] += 1
+
+    def write(self, *args: Any) -> None:
+        self._timed_write(super().write, "cells", *args)
+
+    def write_formula(self, *args: Any) -> None:
+        self._timed_write(super().write_formula, "cells", *args)
+
+    def merge_range(self, *args: Any) -> None:
+        self._timed_write(super().merge_range, "merges", *args)
+
+    def insert_image(self, *args: Any) -> None:
+        self._timed_write(super().insert_image, "images", *args)
+
+
+def make_writer(
+    workbook: WorkBook,
+    worksheet: Worksheet,
+    global_format: dict[str, Any] | None = None,
+    instrumentation: Instrumentation | None = None,
+) -> Writer:
+    if instrumentation is None:
+        return Writer(workbook, worksheet, global_format)
+    return InstrumentedWriter(workbook, worksheet, global_format, instrumentation)
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
 import logging
+import re
 from collections import abc
-from collections.abc import Callable, Collection, Iterable
+from collections.abc import Callable, Collection, Iterable, Iterator
 from datetime import date, datetime, time
 from typing import (
     Any,
@@ -14,8 +15,15 @@ from typing import (
     TypedDict,
     TypeVar,
     Unpack,
+    runtime_checkable,
 )
 
+from xlsxwriter.utility import xl_col_to_name
+
+from .aggregate import SUBTOTAL_CODES, Accumulator, Aggregate, check_aggregate
+from .images import ImageSource
+from .utils import get_obj_attr
+
 logger = logging.getLogger("poi")
 logger.addHandler(logging.NullHandler())
 
@@ -105,6 +113,28 @@ class TableStyle(TypedDict):
     text_wrap: NotRequired[bool]
 
 
+# Functions of an Excel table's totals row; any other string is used as a
+# custom formula, e.g. "SUM([Price])*2".
+TotalFunction = Literal[
+    "sum", "average", "count", "count_nums", "max", "min", "std_dev", "var"
+]
+
+
+class ExcelTableOptions(TypedDict):
+    """Options for writing a Table as a native Excel table."""
+
+    style: NotRequired[str]
+    name: NotRequired[str]
+    autofilter: NotRequired[bool]
+    banded_rows: NotRequired[bool]
+    banded_columns: NotRequired[bool]
+    first_column: NotRequired[bool]
+    last_column: NotRequired[bool]
+    # Column title -> totals row function.
+    totals: NotRequired[dict[str, TotalFunction | str]]
+    total_label: NotRequired[str]
+
+
 # Protocol definitions for callbacks
 T_contra = TypeVar("T_contra", contravariant=True)
 
@@ -142,6 +172,7 @@ class ColumnDict(TypedDict):
     type: NotRequired[Literal["image", "text"]]
     options: NotRequired[ImageOptions]
     format: NotRequired[CellStyle]
+    formula: NotRequired[str]
     title_comment: NotRequired[str]
     title_comment_options: NotRequired[CommentOptions]
 
@@ -149,6 +180,10 @@ class ColumnDict(TypedDict):
 ColumnTuple = tuple[str, str]  # (attr, title)
 ColumnConfig = ColumnDict | ColumnTuple
 
+# Pivot keys and values: attr or (attr, title), and (attr, aggregate[, title]).
+PivotKey = str | tuple[str, str]
+PivotValue = tuple[str, Aggregate] | tuple[str, Aggregate, str]
+
 # Generic type variable with constraint
 T = TypeVar("T")
 TableRow = TypeVar("TableRow", bound=Any)
@@ -162,6 +197,7 @@ class BoxInstance:
         self.row = row
         self.col = col
         self.parent = parent
+        self._max_child_span: dict[str, Any] = {}
         box.instance = self
         self._setup_children()
 
@@ -177,16 +213,85 @@ class BoxInstance:
 
         current_row = self.row
         current_col = self.col
-        for child in children:
+        last = len(children) - 1
+        for i, child in enumerate(children):
+            if child.lazy_extent and i != last:
+                raise ValueError(
+                    f"the extent of {child} is only known once written, so it "
+                    "must be the last child of its parent"
+                )
             child.styles = {**child.styles, **self.box.styles}
-            self.box.add_child_span(
-                child, neighbours=[c for c in children if c is not child]
-            )
+            # Neighbours are only needed to size a growing child; building
+            # the list for every child would make layout quadratic.
+            neighbours = [c for c in children if c is not child] if child.grow else []
+            self.box.add_child_span(child, neighbours=neighbours)
             child_node, current_row, current_col = self.box.layout_child_element(
                 child, current_row, current_col
             )
             self.children.append(child_node)
 
+    def max_child_span(self, axis: Literal["rows", "cols"]) -> Any:
+        """Largest determinable span among the children of this box.
+
+        Used to size a container whose child grows.  Laying out the children
+        never changes this maximum, so it is computed once per box instead of
+        once per growing grandchild.
+        """
+        cache = self._max_child_span
+        if axis not in cache:
+            if axis == "cols":
+                spans = [
+                    n.calculate_column_span(raises=False) for n in self.box.children
+                ]
+            else:
+                spans = [n.calculate_row_span(raises=False) for n in self.box.children]
+            valid = [span for span in spans if span is not _NotDetermined]
+            cache[axis] = max(valid) if valid else _NotDetermined
+        return cache[axis]
+
+    def iter_lazy_children(self) -> Iterator[Box]:
+        """Lay out and yield the children of a lazy box one at a time.
+
+        Nothing keeps a reference to a child once the next one is requested,
+        so each subtree can be released as soon as it has been written.  The
+        children can only be traversed once.
+        """
+        box = self.box
+        children = box.lazy_children
+        if children is None:
+            raise ValueError(
+                f"{box} has lazy children, which were already traversed; "
+                "they can only be written once"
+            )
+        box.lazy_children = None
+        return self._layout_lazy_children(children)
+
+    def _layout_lazy_children(self, children: Iterator[Box]) -> Iterator[Box]:
+        box = self.box
+        current_row = self.row
+        current_col = self.col
+        for child in children:
+            if child.grow:
+                raise ValueError(
+                    f"{child} cannot grow, lazy children are laid out without "
+                    "looking at their siblings"
+                )
+            child.parent = box
+            child.styles = {**child.styles, **box.styles}
+            box.add_child_span(child, neighbours=[])
+            box.layout_child_element(child, current_row, current_col)
+            yield child
+            # The next child is placed once this one has been written, as
+            # children with a lazy extent are only sized then.
+            if isinstance(box, Row):
+                current_col += child.cols
+                box.lazy_cols = current_col - self.col
+                box.lazy_rows = max(box.lazy_rows, child.rows)
+            else:
+                current_row += child.rows
+                box.lazy_rows = current_row - self.row
+                box.lazy_cols = max(box.lazy_cols, child.cols)
+
 
 _NotDetermined = object()
 
@@ -198,6 +303,8 @@ class Box:
     instance: BoxInstance
     parent: Box | None
     styles: CellStyle
+    lazy_extent: bool
+    single_pass: bool
 
     def accept(self, visitor: Visitor) -> None:
         visitor(self)
@@ -239,6 +346,7 @@ class Box:
         colspan: int | None = None,
         offset: int = 0,
         grow: bool = False,
+        lazy: bool = False,
         **kwargs: Unpack[CellStyle],
     ) -> None:
         self.parent = None
@@ -246,6 +354,11 @@ class Box:
         self.colspan = colspan
         self.offset = offset
         self.grow = grow
+        self.lazy = lazy
+        # Extent of the laid-out children, computed on first access as it is
+        # final once they are all bound.
+        self._rows: int | None = None
+        self._cols: int | None = None
 
         def flatten(items: Any) -> Iterable[Any]:
             """Yield items from any nested iterable."""
@@ -257,17 +370,42 @@ class Box:
 
         if isinstance(children, Box):
             children = [children]
+        elif lazy:
+            # Consumed by BoxInstance.iter_lazy_children() while writing.
+            self.lazy_children: Iterator[Box] | None = (
+                child for child in flatten(children or []) if child is not None
+            )
+            self.lazy_rows = self.lazy_cols = 0
+            children = []
         else:
             children = [child for child in flatten(children or []) if child is not None]
         self.children = children  # type: ignore
         for child in self.children:
             child.parent = self
+        # Whether the extent of this box is only known after writing it.
+        self.lazy_extent = lazy or any(child.lazy_extent for child in self.children)
+        # Whether writing this box consumes its children or data, so it can
+        # only be walked once.
+        self.single_pass = lazy or any(child.single_pass for child in self.children)
         self.styles = kwargs
         self.instance = None  # type: ignore
 
     def add_child_span(self, child: Box, neighbours: list[Box]) -> None:
         pass
 
+    def clear_ancestor_extents(self) -> None:
+        """Forget the extents cached by the ancestors of this box, once its
+        own extent is only known after writing it."""
+        parent = self.parent
+        while parent is not None:
+            parent._rows = parent._cols = None
+            parent = parent.parent
+
+    def iter_children(self) -> Iterable[Box]:
+        if self.lazy:
+            return self.instance.iter_lazy_children()
+        return self.children
+
     @property
     def cell_format(self) -> CellStyle:
         return self.styles or {}
@@ -306,7 +444,7 @@ class Box:
     def calculate_column_span(self, raises: bool = True) -> Any:
         if self.colspan:
             return self.colspan + self.offset
-        if self.grow:
+        if self.grow or self.lazy:
             if raises:
                 raise ValueError(f"{self} cannot grow as the col have to be determined")
             return _NotDetermined
@@ -324,7 +462,7 @@ class Box:
     def calculate_row_span(self, raises: bool = True) -> Any:
         if self.rowspan:
             return self.rowspan + self.offset
-        if self.grow:
+        if self.grow or self.lazy:
             if raises:
                 raise ValueError(f"{self} cannot grow as the row have to be determined")
             return _NotDetermined
@@ -360,26 +498,12 @@ class Row(Box):
                 "only one col in a row can have grow attr"
             )
             if not self.colspan:
-                if self.instance.parent:
-                    parent = self.instance.parent.box
-                else:
+                if not self.instance.parent:
                     raise ValueError(f"{child} width is not determinable")
-
-                neighbor_with_cols = [child for child in parent.children if child]
-                if neighbor_with_cols:
-                    neighbour_cols = [
-                        n.calculate_column_span(raises=False)
-                        for n in neighbor_with_cols
-                    ]
-                    valid_cols = [
-                        col for col in neighbour_cols if col is not _NotDetermined
-                    ]
-                    if valid_cols:
-                        self.colspan = max(valid_cols)
-                    else:
-                        raise ValueError(f"{child} width is not determinable")
-                else:
+                colspan = self.instance.parent.max_child_span("cols")
+                if colspan is _NotDetermined:
                     raise ValueError(f"{child} width is not determinable")
+                self.colspan = colspan
             child.colspan = (
                 self.colspan
                 - child.offset
@@ -392,16 +516,24 @@ class Row(Box):
         offset = self.offset if self.is_horizontal else 0
         if self.colspan:
             return self.colspan + offset
-        self.assert_children_bound()
-        return sum(child.cols for child in self.children) + offset
+        if self.lazy:
+            return self.lazy_cols + offset
+        if self._cols is None:
+            self.assert_children_bound()
+            self._cols = sum(child.cols for child in self.children)
+        return self._cols + offset
 
     @property
     def rows(self) -> int:
         offset = self.offset if self.is_vertical else 0
         if self.rowspan:
             return self.rowspan + offset
-        self.assert_children_bound()
-        return max(child.rows for child in self.children) + offset
+        if self.lazy:
+            return self.lazy_rows + offset
+        if self._rows is None:
+            self.assert_children_bound()
+            self._rows = max(child.rows for child in self.children)
+        return self._rows + offset
 
 
 class Col(Box):
@@ -415,24 +547,12 @@ class Col(Box):
                 "only one row in a col can have grow attr"
             )
             if not self.rowspan:
-                if self.instance.parent:
-                    parent = self.instance.parent.box
-                else:
+                if not self.instance.parent:
                     raise ValueError(f"{child} height is not determinable")
-                neighbor_with_rows = [child for child in parent.children if child]
-                if neighbor_with_rows:
-                    neighbour_rows = [
-                        n.calculate_row_span(raises=False) for n in neighbor_with_rows
-                    ]
-                    valid_rows = [
-                        row for row in neighbour_rows if row is not _NotDetermined
-                    ]
-                    if valid_rows:
-                        self.rowspan = max(valid_rows)
-                    else:
-                        raise ValueError(f"{child} height is not determinable")
-                else:
+                rowspan = self.instance.parent.max_child_span("rows")
+                if rowspan is _NotDetermined:
                     raise ValueError(f"{child} height is not determinable")
+                self.rowspan = rowspan
             child.rowspan = (
                 self.rowspan
                 - child.offset
@@ -453,16 +573,24 @@ class Col(Box):
         if self.colspan:
             offset = self.offset if self.is_horizontal else 0
             return self.colspan + offset
-        self.assert_children_bound()
-        return max(child.cols for child in self.children)
+        if self.lazy:
+            return self.lazy_cols
+        if self._cols is None:
+            self.assert_children_bound()
+            self._cols = max(child.cols for child in self.children)
+        return self._cols
 
     @property
     def rows(self) -> int:
         if self.rowspan:
             offset = self.offset if self.is_vertical else 0
             return self.rowspan + offset
-        self.assert_children_bound()
-        return sum(child.rows for child in self.children)
+        if self.lazy:
+            return self.lazy_rows
+        if self._rows is None:
+            self.assert_children_bound()
+            self._rows = sum(child.rows for child in self.children)
+        return self._rows
 
 
 class PrimitiveBox(Box):
@@ -513,7 +641,7 @@ class Cell(PrimitiveBox):
 class Image(PrimitiveBox):
     def __init__(
         self,
-        filename: str,
+        filename: ImageSource,
         *,  # Force keyword-only arguments
         # Box layout parameters
         rowspan: int | None = None,
@@ -535,7 +663,12 @@ class Image(PrimitiveBox):
 
 
 class Column(NamedTuple):
-    """Configuration for table columns."""
+    """Configuration for table columns.
+
+    A ``formula`` column writes a formula in every row, from a template that
+    refers to the other columns of the row by attr, e.g. ``"={q4}-{q3}"``.
+    Its ``attr`` or ``render`` value, if any, is stored as the cached result.
+    """
 
     title: str
     attr: str | None = None
@@ -546,23 +679,132 @@ class Column(NamedTuple):
     format: CellStyle | None = None
     title_comment: str | None = None
     title_comment_options: CommentOptions | None = None
+    formula: str | None = None
+
+
+_FORMULA_FIELD = re.compile(r"\{([A-Za-z_]\w*(?:\??\.\w+)*)\}")
+# Braces that are not fields: string literals and array constants, such as
+# {1,2;3,4} or {"a","b"}, the strings being blanked first.
+_FORMULA_STRING = re.compile(r'"(?:[^"]|"")*"')
+_FORMULA_ARRAY = re.compile(r'\{(?:[^{}]*[,;][^{}]*|\s*(?:""|[-+\d.E]+)\s*)\}')
+
+
+def compile_formula(template: str, columns: list[Column], first_col: int) -> str:
+    """Compile a formula column template for a table starting at ``first_col``.
+
+    Every ``{attr}`` becomes the column letter of that column, dotted attrs
+    included, and other braces must be array constants.  The result is a
+    ``str.format`` string taking the 1-based row number, so a row's formula
+    is a single substitution.
+    """
+    letters = {
+        column.attr: xl_col_to_name(first_col + j)
+        for j, column in enumerate(columns)
+        if column.attr
+    }
+    parts = []
+    pos = 0
+    for match in _FORMULA_FIELD.finditer(template):
+        name = match.group(1)
+        if name not in letters:
+            raise ValueError(
+                f"formula {template!r} refers to {name!r}, which is not the attr "
+                "of a column of the table"
+            )
+        parts.append(_formula_literal(template, template[pos : match.start()]))
+        parts.append(letters[name] + "{0}")
+        pos = match.end()
+    parts.append(_formula_literal(template, template[pos:]))
+    return "".join(parts)
+
+
+def _formula_literal(template: str, literal: str) -> str:
+    """Escape the text between fields of ``template`` for ``str.format``."""
+    left = _FORMULA_ARRAY.sub("", _FORMULA_STRING.sub('""', literal))
+    if "{" in left or "}" in left:
+        raise ValueError(
+            f"formula {template!r} has braces that are neither a column attr "
+            "nor an array constant"
+        )
+    return literal.replace("{", "{{").replace("}", "}}")
+
+
+@runtime_checkable
+class Cursor(Protocol):
+    """The part of a DB-API cursor a ``Table`` reads from."""
+
+    @property
+    def description(self) -> Any: ...
+
+    def fetchmany(self, size: int = ...) -> Any: ...
+
+
+def _cursor_records(cursor: Cursor, batch_size: int) -> Iterator[dict[str, Any]]:
+    """Yield the rows of ``cursor`` as dicts, fetching ``batch_size`` at a time."""
+    names = [d[0] for d in cursor.description]
+    while True:
+        batch = cursor.fetchmany(batch_size)
+        if not batch:
+            return
+        for row in batch:
+            yield dict(zip(names, row, strict=True))
 
 
 class Table(Box, Generic[T]):
-    """High-level component for tabular data with headers and formatting."""
+    """High-level component for tabular data with headers and formatting.
+
+    ``data`` can also be a DB-API cursor (any object with ``fetchmany`` and
+    ``description``) of an executed query.  Its rows are fetched
+    ``batch_size`` at a time while the table is written, as dicts keyed by
+    column name, and ``columns`` defaults to one column per result column.
+    As the number of rows is only known once written, such a table has to be
+    the last child of its parent, like lazy children, and it can only be
+    written once.
+
+    With ``excel_table`` the data is written as a native Excel table with
+    its own style, autofilter and an optional totals row, instead of styling
+    every cell: the table-wide style is not applied, only ``cell_style``,
+    column formats and date formats are.
+
+    ``footer`` adds a row below the data with an aggregate of some columns,
+    keyed by column title: ``"sum"``, ``"count"``, ``"mean"``, ``"min"``,
+    ``"max"`` (and the other functions of ``AggregateFunction``), or a
+    function reducing the values like ``functools.reduce``.  Aggregates are
+    accumulated while the rows are written, so the data is only read once.
+    With ``footer_formulas`` they are written as ``SUBTOTAL`` formulas over
+    the column, with the computed value cached, and ``footer_label`` goes in
+    the first column unless it has an aggregate.
+
+    ``group_by`` takes the titles of columns, outermost first, whose runs of
+    equal values in (sorted) data are merged into one cell, detected while
+    the rows are written.  ``group_subtotals`` adds a row of aggregates after
+    each group, like ``footer``, labelled with ``subtotal_label`` formatted
+    with the group's value; ``footer_formulas`` writes them as ``SUBTOTAL``
+    formulas too, which the footer's formulas skip.  As subtotal rows make
+    the span of the table only known once written, such a table has to be
+    the last child of its parent.
+    """
 
     columns: list[Column]
 
     def __init__(
         self,
-        data: Collection[T],
-        columns: Collection[ColumnConfig],
+        data: Collection[T] | Cursor,
+        columns: Collection[ColumnConfig] | None = None,
         col_width: int | Literal["auto"] | None = None,
         row_height: RowHeightCallback[T] | int | None = None,
         cell_style: dict[str, RenderFunction[T]] | str | None = None,
         datetime_format: str | None = None,
         date_format: str | None = None,
         time_format: str | None = None,
+        batch_size: int = 1000,
+        excel_table: bool | ExcelTableOptions = False,
+        footer: dict[str, Aggregate] | None = None,
+        footer_formulas: bool = False,
+        footer_label: str | None = "Total",
+        group_by: Collection[str] = (),
+        group_subtotals: dict[str, Aggregate] | None = None,
+        subtotal_label: str = "{} Total",
         # Table-wide style parameters (includes border)
         **kwargs: Unpack[CellStyle],
     ) -> None:
@@ -572,7 +814,35 @@ class Table(Box, Generic[T]):
             children=None,  # Table manages its own children
             **kwargs,
         )
-        self.data = data
+        self.excel_table: ExcelTableOptions | None = None
+        if isinstance(excel_table, dict):
+            self.excel_table = excel_table
+        elif excel_table:
+            self.excel_table = {}
+        self.footer = footer or {}
+        self.footer_formulas = footer_formulas
+        self.footer_label = footer_label
+        self.group_by = list(group_by)
+        self.group_subtotals = group_subtotals or {}
+        self.subtotal_label = subtotal_label
+        # Whether the rows of a cursor were read by a write.
+        self.consumed = False
+        if isinstance(data, Cursor):
+            if batch_size < 1:
+                raise ValueError(f"batch_size must be positive, got {batch_size}")
+            if data.description is None:
+                raise ValueError("the cursor has no result set, execute a query")
+            if columns is None:
+                columns = [(d[0], d[0]) for d in data.description]
+            self.data: Collection[T] | Iterator[Any] = _cursor_records(data, batch_size)
+            # The row count is known once the cursor is exhausted.
+            self.lazy_extent = self.single_pass = True
+            self.rowspan = 1
+        else:
+            if columns is None:
+                raise ValueError("columns are required unless data is a cursor")
+            self.data = data
+            self.rowspan = self.extent(len(data))
         self.col_width = col_width or 15
         self.row_height = row_height
 
@@ -599,6 +869,7 @@ class Table(Box, Generic[T]):
                     render=col.get("render"),
                     width=col.get("width"),
                     format=col.get("format"),
+                    formula=col.get("formula"),
                     title_comment=col.get("title_comment"),
                     title_comment_options=col.get("title_comment_options"),
                 )
@@ -606,8 +877,90 @@ class Table(Box, Generic[T]):
                 raise ValueError(f"Column must be tuple or dict, got {type(col)}")
             self.columns.append(item)
 
-        self.rowspan = len(self.data) + 1
         self.colspan = len(self.columns)
+        for item in self.columns:
+            if item.formula:
+                # Check the references now rather than once written.
+                compile_formula(item.formula, self.columns, 0)
+        if self.excel_table is not None:
+            self._check_excel_table(self.excel_table)
+        if self.footer:
+            self._check_footer(self.footer)
+        if self.group_by or self.group_subtotals:
+            self._check_groups()
+            if self.group_subtotals:
+                # The number of groups is known once written.
+                self.lazy_extent = True
+
+    def iter_data(self) -> Iterable[Any]:
+        """The rows to write.  Those of a cursor can only be read once."""
+        if isinstance(self.data, Iterator):
+            if self.consumed:
+                raise ValueError(
+                    f"{self} reads a cursor, which was already read; it can "
+                    "only be written once"
+                )
+            self.consumed = True
+        return self.data
+
+    def _check_excel_table(self, options: ExcelTableOptions) -> None:
+        seen = set()
+        for column in self.columns:
+            # Excel compares the headers of a table case-insensitively.
+            if column.title.lower() in seen:
+                raise ValueError(
+                    f"column titles of an Excel table must be unique, "
+                    f"{column.title!r} is repeated"
+                )
+            seen.add(column.title.lower())
+        totals = options.get("totals", {})
+        unknown = [t for t in totals if t.lower() not in seen]
+        if unknown:
+            raise ValueError(f"totals refer to unknown columns: {unknown}")
+        for title, function in totals.items():
+            # A single word is a misspelt function rather than a formula.
+            if function not in SUBTOTAL_CODES and (
+                not isinstance(function, str) or re.fullmatch(r"\w+", function)
+            ):
+                raise ValueError(
+                    f"the total of {title!r} must be one of "
+                    f"{', '.join(SUBTOTAL_CODES)} or a formula, got {function!r}"
+                )
+
+    def _check_footer(self, footer: dict[str, Aggregate]) -> None:
+        if self.excel_table is not None:
+            raise ValueError("Excel tables have a totals row instead of a footer")
+        titles = {column.title for column in self.columns}
+        unknown = [title for title in footer if title not in titles]
+        if unknown:
+            raise ValueError(f"footer refers to unknown columns: {unknown}")
+        for aggregate in footer.values():
+            check_aggregate(aggregate)
+
+    def _check_groups(self) -> None:
+        if self.excel_table is not None:
+            raise ValueError("Excel tables cannot merge cells to group rows")
+        if not self.group_by:
+            raise ValueError("group_subtotals need group_by columns")
+        columns = {column.title: column for column in self.columns}
+        for title in self.group_by:
+            column = columns.get(title)
+            if column is None:
+                raise ValueError(f"group_by refers to an unknown column {title!r}")
+            if column.type == "image" or column.formula:
+                raise ValueError(f"cannot group by the values of {title!r}")
+        unknown = [title for title in self.group_subtotals if title not in columns]
+        if unknown:
+            raise ValueError(f"group_subtotals refer to unknown columns: {unknown}")
+        for aggregate in self.group_subtotals.values():
+            check_aggregate(aggregate)
+
+    def extent(self, count: int) -> int:
+        """Number of rows spanned with ``count`` data and subtotal rows."""
+        if self.excel_table is None:
+            return count + 1 + bool(self.footer)
+        # An Excel table has at least one, possibly blank, data row.
+        return max(count, 1) + 1 + bool(self.excel_table.get("totals"))
 
     @property
     def rows(self) -> int:
@@ -621,3 +974,176 @@ class Table(Box, Generic[T]):
         offset = self.offset if self.is_horizontal else 0
         assert self.colspan
         return self.colspan + offset
+
+
+PivotKeys = tuple[Any, ...]
+
+
+def _sorted_keys(keys: Iterable[PivotKeys]) -> list[PivotKeys]:
+    try:
+        return sorted(keys)
+    except TypeError:
+        # Mixed types or None: still keep groups together.
+        return sorted(keys, key=lambda key: tuple(map(repr, key)))
+
+
+def _pivot_layout(
+    keys: Iterable[PivotKeys], depth: int, subtotals: bool, totals: bool
+) -> list[PivotKeys]:
+    """The keys in display order, each group followed by its subtotal (its
+    keys prefix) and all of them by the grand total, ``()``."""
+    if not depth:
+        return [()]
+    slots: list[PivotKeys] = []
+    previous: PivotKeys | None = None
+    for key in _sorted_keys(keys):
+        if previous is not None and subtotals:
+            common = next(
+                i for i, (a, b) in enumerate(zip(previous, key, strict=True)) if a != b
+            )
+            slots.extend(previous[:n] for n in range(depth - 1, common, -1))
+        slots.append(key)
+        previous = key
+    if previous is not None and subtotals:
+        slots.extend(previous[:n] for n in range(depth - 1, 0, -1))
+    if totals:
+        slots.append(())
+    return slots
+
+
+class Pivot(Box):
+    """Crosstab of records aggregated by row and column keys.
+
+    ``rows`` and ``columns`` are attrs of the records, or ``(attr, title)``
+    tuples, outermost first.  ``values`` are ``(attr, aggregate)`` or
+    ``(attr, aggregate, title)`` tuples, with the aggregates of a Table's
+    ``footer``.  The data is read once when the pivot is created, keeping
+    one accumulator per value for each combination of keys and groups of
+    keys, so memory grows with the number of groups, not of records.
+
+    Keys are sorted.  Each level of column keys is a header row, whose cells
+    are merged over the columns of their group, as row keys are over the
+    rows of their group.  ``subtotals`` adds a row after each group of row
+    keys and a column after each group of column keys, but the innermost,
+    labelled with ``subtotal_label`` formatted with the group's key, and
+    ``totals`` a grand total row and column labelled with ``total_label``.
+    """
+
+    def __init__(
+        self,
+        data: Iterable[Any],
+        rows: Collection[PivotKey],
+        columns: Collection[PivotKey] = (),
+        values: Collection[PivotValue] = (),
+        subtotals: bool = True,
+        totals: bool = True,
+        subtotal_label: str = "{} Total",
+        total_label: str = "Total",
+        date_format: str = "yyyy-mm-dd",
+        # Pivot-wide style parameters (includes border)
+        **kwargs: Unpack[CellStyle],
+    ) -> None:
+        kwargs.setdefault("border", 1)
+        super().__init__(children=None, **kwargs)
+        if not rows:
+            raise ValueError("a pivot needs row keys")
+        if not values:
+            raise ValueError("a pivot needs values to aggregate")
+        self.row_keys = [_pivot_key(key) for key in rows]
+        self.column_keys = [_pivot_key(key) for key in columns]
+        self.values: list[tuple[str, Aggregate, str]] = []
+        for value in values:
+            if len(value) == 2:
+                attr, aggregate = value
+                name = aggregate if isinstance(aggregate, str) else aggregate.__name__
+                title = f"{attr} ({name})"
+            elif len(value) == 3:
+                attr, aggregate, title = value
+            else:
+                raise ValueError(
+                    f"values must be (attr, aggregate) or (attr, aggregate, title), "
+                    f"got {value!r}"
+                )
+            check_aggregate(aggregate)
+            self.values.append((attr, aggregate, title))
+        self.subtotal_label = subtotal_label
+        self.total_label = total_label
+        self.date_format = date_format
+
+        self.cells = self._aggregate(data, subtotals, totals)
+        n_rows, n_cols = len(self.row_keys), len(self.column_keys)
+        self.row_slots = _pivot_layout(
+            {key for key, _ in self.cells if len(key) == n_rows},
+            n_rows,
+            subtotals,
+            totals,
+        )
+        self.column_slots = _pivot_layout(
+            {key for _, key in self.cells if len(key) == n_cols},
+            n_cols,
+            subtotals,
+            totals,
+        )
+        # A row per level of column keys, and one for the value titles
+        # unless there is a single value under column keys.
+        self.header_rows = n_cols + (len(self.values) > 1 or not n_cols)
+        self.rowspan = self.header_rows + len(self.row_slots)
+        self.colspan = n_rows + len(self.column_slots) * len(self.values)
+
+    def _aggregate(
+        self, data: Iterable[Any], subtotals: bool, totals: bool
+    ) -> dict[tuple[PivotKeys, PivotKeys], list[Accumulator]]:
+        def levels(depth: int) -> list[int]:
+            # Lengths of the key prefixes aggregated: full keys, groups, total.
+            lengths = {depth}
+            if subtotals:
+                lengths.update(range(1, depth))
+            if totals:
+                lengths.add(0)
+            return sorted(lengths, reverse=True)
+
+        row_attrs = [attr for attr, _ in self.row_keys]
+        column_attrs = [attr for attr, _ in self.column_keys]
+        value_attrs = [attr for attr, _, _ in self.values]
+        functions = [aggregate for _, aggregate, _ in self.values]
+        row_levels = levels(len(row_attrs))
+        column_levels = levels(len(column_attrs))
+        cells: dict[tuple[PivotKeys, PivotKeys], list[Accumulator]] = {}
+        for record in data:
+            row_key = tuple(get_obj_attr(record, attr) for attr in row_attrs)
+            column_key = tuple(get_obj_attr(record, attr) for attr in column_attrs)
+            values = [get_obj_attr(record, attr) for attr in value_attrs]
+            row_prefixes = [row_key[:n] for n in row_levels]
+            for n in column_levels:
+                column_prefix = column_key[:n]
+                for row_prefix in row_prefixes:
+                    accumulators = cells.get((row_prefix, column_prefix))
+                    if accumulators is None:
+                        accumulators = [Accumulator(f) for f in functions]
+                        cells[row_prefix, column_prefix] = accumulators
+                    for accumulator, value in zip(accumulators, values, strict=True):
+                        accumulator.add(value)
+        return cells
+
+    def label(self, slot: PivotKeys) -> str:
+        """Label of the subtotal or grand total ``slot``."""
+        return self.subtotal_label.format(slot[-1]) if slot else self.total_label
+
+    @property
+    def rows(self) -> int:
+        offset = self.offset if self.is_vertical else 0
+        return self.rowspan + offset  # type: ignore
+
+    @property
+    def cols(self) -> int:
+        offset = self.offset if self.is_horizontal else 0
+        assert self.colspan
+        return self.colspan + offset
+
+
+def _pivot_key(key: PivotKey) -> tuple[str, str]:
+    if isinstance(key, str):
+        return key, key
+    if len(key) != 2:
+        raise ValueError(f"pivot keys must be attr or (attr, title), got {key!r}")
+    return key
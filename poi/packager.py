@@ -0,0 +1,362 @@
+from __future__ import annotations
+
+import ast
+import functools
+import hashlib
+import inspect
+import io
+import logging
+import os
+import struct
+import textwrap
+import zlib
+from collections.abc import Container, Iterator, Mapping
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import IO, Any, Literal, NamedTuple
+from zipfile import ZIP_DEFLATED, ZipFile, ZipInfo
+
+import xlsxwriter
+from xlsxwriter.worksheet import Worksheet
+
+logger = logging.getLogger(__name__)
+
+CompressionProfile = Literal["fastest", "balanced", "smallest"]
+
+COMPRESSION_LEVELS: dict[str, int] = {
+    "fastest": 1,
+    "balanced": 6,  # zlib's default, what xlsxwriter uses
+    "smallest": 9,
+}
+
+# Parts are split into chunks of this size and deflated independently, each
+# chunk primed with the tail of the previous one (the same scheme as pigz).
+DEFAULT_CHUNK_SIZE = 1 << 20
+_WINDOW_SIZE = 1 << 15
+_ZIP32_LIMIT = 0xFFFFFFFF
+# Excel's timestamp of 1/1/1980, as used by xlsxwriter for in-memory files.
+_DOS_TIME = 0
+_DOS_DATE = (1 << 5) | 1
+# The SHA-256 of the unparsed body of Workbook._store_workbook() in the
+# xlsxwriter releases ParallelZipWorkbook was checked against.
+_STORE_WORKBOOK_DIGEST = (
+    "627f1348c3dd06ac81d4bdeca2039fc7ff7e58b205e17993244cee275852488c"
+)
+# Other private state of Workbook that packaging and sheet reuse depend on.
+_WORKBOOK_INTERNALS = (
+    "str_table",
+    "xf_formats",
+    "xf_format_indices",
+    "dxf_format_indices",
+)
+
+
+def compression_level(compression: CompressionProfile | int) -> int:
+    if isinstance(compression, int):
+        if not 0 <= compression <= 9:
+            raise ValueError(f"compression level must be 0-9, got {compression}")
+        return compression
+    try:
+        return COMPRESSION_LEVELS[compression]
+    except KeyError:
+        raise ValueError(
+            f"compression must be one of {list(COMPRESSION_LEVELS)}, "
+            f"got {compression!r}"
+        ) from None
+
+
+def _deflate_chunk(data: bytes, start: int, end: int, level: int, final: bool) -> bytes:
+    zdict = data[max(0, start - _WINDOW_SIZE) : start]
+    if zdict:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15, zdict=zdict)
+    else:
+        c = zlib.compressobj(level, zlib.DEFLATED, -15)
+    out = c.compress(data[start:end])
+    # A sync flush ends the chunk on a byte boundary without marking the last
+    # block, so the raw streams of all chunks concatenate into one.
+    return out + c.flush(zlib.Z_FINISH if final else zlib.Z_SYNC_FLUSH)
+
+
+class CompressedPart(NamedTuple):
+    """A package part as deflated into the zip file."""
+
+    size: int
+    crc: int
+    data: bytes
+
+
+def _done(value: Any) -> Future[Any]:
+    future: Future[Any] = Future()
+    future.set_result(value)
+    return future
+
+
+class _Part:
+    def __init__(
+        self,
+        name: str,
+        data: bytes,
+        level: int,
+        chunk_size: int,
+        executor: Executor,
+        compressed: CompressedPart | None = None,
+    ) -> None:
+        self.name = name
+        if compressed is not None:
+            self.size = compressed.size
+            self.chunks: list[Future[bytes]] = [_done(compressed.data)]
+            self.crc: Future[int] = _done(compressed.crc)
+            return
+        self.size = len(data)
+        starts = range(0, len(data), chunk_size) if data else range(1)
+        self.chunks = [
+            executor.submit(
+                _deflate_chunk,
+                data,
+                start,
+                start + chunk_size,
+                level,
+                start + chunk_size >= len(data),
+            )
+            for start in starts
+        ]
+        self.crc = executor.submit(zlib.crc32, data)
+
+
+def write_zip(
+    fileobj: IO[bytes],
+    files: list[tuple[str, bytes]],
+    level: int,
+    executor: Executor,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    precompressed: Mapping[str, CompressedPart] | None = None,
+    keep: Container[str] = (),
+) -> dict[str, CompressedPart]:
+    """Write ``files`` as a deflated zip container, compressing in parallel.
+
+    Parts are submitted to ``executor`` up front and written in order as their
+    chunks complete.  ``zlib`` releases the GIL, so a thread pool scales.
+
+    Parts named in ``precompressed`` are written as given instead of their
+    data; the compressed parts named in ``keep`` are returned.
+    """
+    precompressed = precompressed or {}
+    parts = [
+        _Part(name, data, level, chunk_size, executor, precompressed.get(name))
+        for name, data in files
+    ]
+    central = []
+    kept = {}
+    offset = 0
+    for part in parts:
+        compressed = b"".join(chunk.result() for chunk in part.chunks)
+        crc = part.crc.result()
+        if part.name in keep:
+            kept[part.name] = CompressedPart(part.size, crc, compressed)
+        name = part.name.encode("utf-8")
+        header = struct.pack(
+            "<IHHHHHIIIHH",
+            0x04034B50,
+            20,
+            0,
+            ZIP_DEFLATED,
+            _DOS_TIME,
+            _DOS_DATE,
+            crc,
+            len(compressed),
+            part.size,
+            len(name),
+            0,
+        )
+        fileobj.write(header)
+        fileobj.write(name)
+        fileobj.write(compressed)
+        central.append(
+            struct.pack(
+                "<IHHHHHHIIIHHHHHII",
+                0x02014B50,
+                20,
+                20,
+                0,
+                ZIP_DEFLATED,
+                _DOS_TIME,
+                _DOS_DATE,
+                crc,
+                len(compressed),
+                part.size,
+                len(name),
+                0,
+                0,
+                0,
+                0,
+                0,
+                offset,
+            )
+            + name
+        )
+        offset += len(header) + len(name) + len(compressed)
+
+    directory = b"".join(central)
+    fileobj.write(directory)
+    fileobj.write(
+        struct.pack(
+            "<IHHHHIIH",
+            0x06054B50,
+            0,
+            0,
+            len(central),
+            len(central),
+            len(directory),
+            offset,
+            0,
+        )
+    )
+    return kept
+
+
+def _write_zip_serial(
+    fileobj: IO[bytes], files: list[tuple[str, bytes]], level: int
+) -> None:
+    with ZipFile(
+        fileobj, "w", compression=ZIP_DEFLATED, compresslevel=level, allowZip64=True
+    ) as zf:
+        for name, data in files:
+            zipinfo = ZipInfo(name, (1980, 1, 1, 0, 0, 0))
+            zipinfo.compress_type = ZIP_DEFLATED
+            zf.writestr(zipinfo, data)
+
+
+@functools.cache
+def mirrors_upstream() -> bool:
+    """Whether the installed xlsxwriter closes workbooks the way
+    ``ParallelZipWorkbook`` and the sheet reuse of ``Book`` expect.
+
+    Both rely on private parts of xlsxwriter, when it has changed workbooks
+    are closed by xlsxwriter itself and nothing is reused.
+    """
+    try:
+        source = textwrap.dedent(inspect.getsource(xlsxwriter.Workbook._store_workbook))
+    except (OSError, TypeError):
+        matches = False
+    else:
+        body = ast.parse(source).body[0].body  # type: ignore[attr-defined]
+        unparsed = ast.unparse(ast.Module(body, []))
+        workbook = xlsxwriter.Workbook(io.BytesIO(), {"in_memory": True})
+        matches = (
+            hashlib.sha256(unparsed.encode()).hexdigest() == _STORE_WORKBOOK_DIGEST
+            and all(hasattr(workbook, name) for name in _WORKBOOK_INTERNALS)
+            and hasattr(Worksheet, "_size_col")
+        )
+    if not matches:
+        logger.warning(
+            "xlsxwriter %s is not supported by parallel compression or "
+            "incremental writes, closing workbooks serially",
+            xlsxwriter.__version__,
+        )
+    return matches
+
+
+class ParallelZipWorkbook(xlsxwriter.Workbook):  # type: ignore[misc]
+    """An xlsxwriter ``Workbook`` whose ``close()`` deflates the package parts
+    in a thread pool, with a configurable compression profile.
+    """
+
+    def __init__(
+        self,
+        filename: str | os.PathLike[str] | IO[bytes],
+        options: dict[str, Any] | None = None,
+        compression: CompressionProfile | int = "balanced",
+        workers: int | None = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        # The parts have to be in memory to be compressed in parallel.
+        super().__init__(filename, {**(options or {}), "in_memory": True})
+        self.compression_level = compression_level(compression)
+        self.compression_workers = workers
+        self.chunk_size = chunk_size
+        # Parts written from an earlier package instead of the generated data,
+        # and the names of the compressed parts to keep in ``kept_parts``.
+        self.reused_parts: dict[str, CompressedPart] = {}
+        self.keep_parts: set[str] = set()
+        self.kept_parts: dict[str, CompressedPart] = {}
+
+    def _store_workbook(self) -> None:
+        if not mirrors_upstream():
+            super()._store_workbook()
+            return
+        # Mirrors xlsxwriter's Workbook._store_workbook() up to packaging.
+        packager = self._get_packager()
+
+        if not self.worksheets():
+            self.add_worksheet()
+
+        if self.worksheet_meta.activesheet == 0:
+            self.worksheets_objs[0].selected = 1
+            self.worksheets_objs[0].hidden = 0
+
+        for sheet in self.worksheets():
+            if sheet.index == self.worksheet_meta.activesheet:
+                sheet.active = 1
+
+        if self.vba_project:
+            for sheet in self.worksheets():
+                if sheet.vba_codename is None:
+                    sheet.set_vba_name()
+
+        self._prepare_sst_string_data()
+        self._prepare_vml()
+        self._prepare_defined_names()
+        self._prepare_drawings()
+        self._add_chart_data()
+        self._prepare_tables()
+        self._prepare_metadata()
+
+        packager._add_workbook(self)
+        packager._set_tmpdir(self.tmpdir)
+        packager._set_in_memory(True)
+        files = list(self._package_files(packager._create_package()))
+        packager = None
+
+        with self._open_output() as fileobj:
+            if self._needs_zip64(files):
+                files = [
+                    (name, self._inflate(self.reused_parts[name]))
+                    if name in self.reused_parts
+                    else (name, data)
+                    for name, data in files
+                ]
+                _write_zip_serial(fileobj, files, self.compression_level)
+            else:
+                with ThreadPoolExecutor(self.compression_workers) as executor:
+                    self.kept_parts = write_zip(
+                        fileobj,
+                        files,
+                        self.compression_level,
+                        executor,
+                        self.chunk_size,
+                        self.reused_parts,
+                        self.keep_parts,
+                    )
+
+    @staticmethod
+    def _inflate(part: CompressedPart) -> bytes:
+        return zlib.decompress(part.data, -15)
+
+    @staticmethod
+    def _package_files(
+        xml_files: list[tuple[Any, str, bool]],
+    ) -> Iterator[tuple[str, bytes]]:
+        for buffer, xml_filename, is_binary in xml_files:
+            data = buffer.getvalue()
+            yield xml_filename, data if is_binary else data.encode("utf-8")
+
+    @staticmethod
+    def _needs_zip64(files: list[tuple[str, bytes]]) -> bool:
+        # Leave headroom for incompressible parts that deflate slightly grows.
+        total = sum(len(d) for _, d in files)
+        return len(files) > 0xFFFF or total * 1.01 > _ZIP32_LIMIT
+
+    def _open_output(self) -> Any:
+        if hasattr(self.filename, "write"):
+            return nullcontext(self.filename)
+        return open(self.filename, "wb")
@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections.abc import Callable
+from typing import NamedTuple
+
+from xlsxwriter.worksheet import Worksheet
+
+
+class ExportCancelledError(RuntimeError):
+    """Raised when a write is stopped by its ``CancelToken``."""
+
+
+class Progress(NamedTuple):
+    # Rows written so far, over all sheets.
+    rows: int
+    # Index of the sheet being written.
+    sheet: int
+    # Seconds since the write started.
+    elapsed: float
+
+
+ProgressCallback = Callable[[Progress], object]
+
+
+class CancelToken:
+    """Stops a write cooperatively, from any thread.
+
+    A write checks the token every ``progress_interval`` rows and raises
+    ``ExportCancelledError`` once ``cancel()`` was called, or once ``timeout``
+    seconds have passed since the token was created.
+    """
+
+    def __init__(self, timeout: float | None = None) -> None:
+        self._event = threading.Event()
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+
+    def cancel(self) -> None:
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        return self.deadline is not None and time.monotonic() >= self.deadline
+
+    def check(self) -> None:
+        if self._event.is_set():
+            raise ExportCancelledError("export cancelled")
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise ExportCancelledError("export deadline exceeded")
+
+
+class Monitor:
+    """Reports progress and checks cancellation at the checkpoints of the
+    writers of a ``Sheet`` or ``Book``.
+    """
+
+    def __init__(
+        self, progress: ProgressCallback | None, cancel: CancelToken | None
+    ) -> None:
+        self.progress = progress
+        self.cancel = cancel
+        self.start = time.perf_counter()
+        self.sheet = 0
+        self.done = 0
+        self.sheet_start = 0
+        self.rows = 0
+
+    def begin_sheet(self, index: int, start_row: int) -> None:
+        self.done += self.rows
+        self.rows = 0
+        self.sheet = index
+        self.sheet_start = start_row
+
+    def __call__(self, row: int) -> None:
+        if self.cancel is not None:
+            self.cancel.check()
+        self.rows = max(self.rows, row - self.sheet_start)
+        if self.progress is not None:
+            elapsed = time.perf_counter() - self.start
+            self.progress(Progress(self.done + self.rows, self.sheet, elapsed))
+
+    def end_sheet(self, worksheet: Worksheet) -> None:
+        """Report the rows of a written sheet, up to the last one with cells.
+
+        The extent of the tree is not used, a root node has no direction to
+        tell its offset by.
+        """
+        last = worksheet.dim_rowmax
+        self(self.sheet_start if last is None else last + 1)
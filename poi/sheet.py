@@ -1,12 +1,22 @@
 from __future__ import annotations
 
+import os
+from collections.abc import Collection
 from io import BytesIO
-from typing import Any
+from typing import IO, Any
 
 from xlsxwriter import Workbook
 from xlsxwriter.worksheet import Worksheet
 
-from .nodes import Box, BoxInstance, Col
+from .budget import Budget
+from .images import ImagePipeline
+from .instrument import Instrumentation, make_writer
+from .nodes import Box, BoxInstance, Col, ColumnConfig
+from .packager import CompressionProfile
+from .progress import CancelToken, Monitor, ProgressCallback
+from .stream import SheetStream
+from .visitors.csv_writer import CsvLayout, CsvTarget, write_csv
+from .visitors.estimator import Estimate, estimate
 from .visitors.printer import print_visitor
 from .visitors.writer import writer_visitor
 from .writer import BytesIOWorkBook, Writer
@@ -20,13 +30,29 @@ class Sheet:
         start_col: int = 0,
         global_format: dict[str, Any] | None = None,
         fast: bool = False,
+        compression: CompressionProfile | int | None = None,
+        instrumentation: Instrumentation | None = None,
+        budget: Budget | None = None,
+        properties: dict[str, Any] | None = None,
+        image_pipeline: ImagePipeline | None = None,
     ) -> None:
         if isinstance(root, list):
             root = Col(children=root)
-        BoxInstance(root, start_row, start_col, None)
+        if instrumentation is None:
+            BoxInstance(root, start_row, start_col, None)
+        else:
+            with instrumentation.phase("layout"):
+                BoxInstance(root, start_row, start_col, None)
         self.root = root
         self.global_format = global_format
         self.fast = fast
+        self.compression = compression
+        self.instrumentation = instrumentation
+        self.budget = budget
+        # Document properties, see xlsxwriter's Workbook.set_properties().
+        self.properties = properties
+        # Downscales images when the workbook is closed, see ImagePipeline.
+        self.image_pipeline = image_pipeline
 
     @classmethod
     def attach_to_exist_worksheet(
@@ -44,27 +70,143 @@ class Sheet:
         sheet.root.accept(visitor)
         return writer
 
-    def write_to_bytes_io(self) -> BytesIO:
-        workbook = BytesIOWorkBook()
-        worksheet = workbook.add_worksheet()
-        writer = Writer(workbook, worksheet, self.global_format)
+    @staticmethod
+    def stream(
+        filename: str | os.PathLike[str] | IO[bytes],
+        columns: Collection[ColumnConfig],
+        header: Box | list[Box] | None = None,
+        **kwargs: Any,
+    ) -> SheetStream[Any]:
+        """Open a streaming session writing a ``Table`` row by row::
+
+            with Sheet.stream("out.xlsx", columns=columns, header=title) as s:
+                for record in records:
+                    s.append(record)
+
+        ``kwargs`` are the ``Table`` options plus ``start_row``, ``start_col``,
+        ``global_format``, ``fast``, ``max_rows`` and ``constant_memory``.
+        """
+        return SheetStream(filename, columns, header, **kwargs)
+
+    def _render(
+        self,
+        workbook: Any,
+        worksheet: Worksheet,
+        progress: ProgressCallback | None,
+        cancel: CancelToken | None,
+        progress_interval: int,
+    ) -> None:
+        writer = make_writer(
+            workbook, worksheet, self.global_format, self.instrumentation
+        )
+        if self.budget is not None:
+            self.budget.attach(writer, self.budget.guard())
+        monitor = None
+        if progress is not None or cancel is not None:
+            monitor = Monitor(progress, cancel)
+            monitor.begin_sheet(0, self.root.row)
+            writer.add_checkpoint(monitor, progress_interval)
         visitor = writer_visitor(writer, fast=self.fast)
         self.root.accept(visitor)
-        workbook.close()
+        if monitor is not None:
+            monitor.end_sheet(worksheet)
+
+    def write_to_bytes_io(
+        self,
+        progress: ProgressCallback | None = None,
+        cancel: CancelToken | None = None,
+        progress_interval: int = 1000,
+    ) -> BytesIO:
+        """Write the sheet into an in-memory xlsx file.
+
+        ``progress`` is called with a ``Progress`` every ``progress_interval``
+        rows and once the sheet is written; ``cancel`` stops the write with
+        ``ExportCancelledError`` at the same checkpoints.
+        """
+        budget = self.budget
+        constant_memory = budget is not None and budget.plan([self.root], self.fast)
+        workbook = BytesIOWorkBook(
+            self.compression,
+            constant_memory=constant_memory,
+            properties=self.properties,
+            image_pipeline=self.image_pipeline,
+        )
+        worksheet = workbook.add_worksheet()
+        self._render(workbook, worksheet, progress, cancel, progress_interval)
+        if self.instrumentation is None:
+            workbook.close()
+        else:
+            with self.instrumentation.phase("close"):
+                workbook.close()
+            self.instrumentation.report()
         return workbook.io
 
-    def write_to_worksheet(self, workbook: Workbook, worksheet: Worksheet) -> None:
-        writer = Writer(workbook, worksheet, self.global_format)
-        visitor = writer_visitor(writer, fast=self.fast)
-        self.root.accept(visitor)
+    def write_to_worksheet(
+        self,
+        workbook: Workbook,
+        worksheet: Worksheet,
+        progress: ProgressCallback | None = None,
+        cancel: CancelToken | None = None,
+        progress_interval: int = 1000,
+    ) -> None:
+        if self.budget is not None:
+            # The mode of a workbook we did not create cannot be changed.
+            self.budget.plan([self.root], self.fast, can_stream=False)
+        self._render(workbook, worksheet, progress, cancel, progress_interval)
+        if self.instrumentation is not None:
+            self.instrumentation.report()
+
+    def estimate(self) -> Estimate:
+        """Predict the cost of writing this sheet without writing it.
 
-    def write(self, filename: str) -> None:
-        io = self.write_to_bytes_io()
+        Cells, merges and images are counted from the layout, Table rows are
+        sampled to extrapolate string volume and formats; ``memory`` and
+        ``output_size`` are approximations derived from those counts.
+        """
+        return estimate([self.root], self.fast)
+
+    def write(
+        self,
+        filename: str,
+        progress: ProgressCallback | None = None,
+        cancel: CancelToken | None = None,
+        progress_interval: int = 1000,
+    ) -> None:
+        io = self.write_to_bytes_io(progress, cancel, progress_interval)
         with open(filename, "wb") as f:
             f.write(io.read())
 
+    def write_csv(
+        self,
+        target: CsvTarget,
+        layout: CsvLayout = "flatten",
+        encoding: str = "utf-8",
+        **fmtparams: Any,
+    ) -> None:
+        """Write the sheet as CSV, streaming Table rows as they are rendered.
+
+        Values come from the same column accessors and render callbacks, and
+        dates and times are formatted with the Table's date formats.
+        ``layout`` decides what is written from a tree with several parts:
+
+        - ``"flatten"``: the whole grid, with merged cells kept in their
+          top-left cell;
+        - ``"first_table"``: only the header and rows of the first Table;
+        - ``"per_table"``: each Table to its own file, ``target`` being a file
+          name with an ``{index}`` placeholder.
+
+        ``fmtparams`` are passed to ``csv.writer``, e.g. ``delimiter="\\t"``
+        for TSV.
+        """
+        write_csv(self.root, target, layout, self.fast, encoding, **fmtparams)
+
     def print(self) -> None:
         self.root.accept(print_visitor)
 
-    def to_bytes_io(self) -> BytesIO:
-        return self.write_to_bytes_io()
+    def to_bytes_io(
+        self,
+        progress: ProgressCallback | None = None,
+        cancel: CancelToken | None = None,
+        progress_interval: int = 1000,
+    ) -> BytesIO:
+        return self.write_to_bytes_io(progress, cancel, progress_interval)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import re
+from io import StringIO
+from typing import Any, NamedTuple
+
+from xlsxwriter.format import Format
+from xlsxwriter.sharedstrings import SharedStringTable
+from xlsxwriter.workbook import Workbook
+from xlsxwriter.worksheet import Worksheet
+
+# The style index of cells, rows and columns in worksheet XML.
+_STYLE = re.compile(
+    r'(<(?:c r="[A-Z]+[0-9]+"|row r="[0-9]+"(?: spans="[0-9:]+")?'
+    r'|col min="[0-9]+" max="[0-9]+" width="[^"]*") (?:s|style)=")([0-9]+)"'
+)
+# The shared string index of string cells.
+_STRING = re.compile(r'( t="s"><v>)([0-9]+)<')
+
+
+def has_parts(worksheet: Worksheet) -> bool:
+    """Whether ``worksheet``, before its workbook is closed, has parts or
+    workbook entries of its own besides its XML, such as images, comments,
+    hyperlinks, Excel tables or print ranges."""
+    return bool(
+        worksheet.images
+        or worksheet.charts
+        or worksheet.shapes
+        or worksheet.tables
+        or worksheet.has_vml
+        or worksheet.header_images
+        or worksheet.footer_images
+        or worksheet.background_image
+        or worksheet.hyperlinks
+        or worksheet.autofilter_area
+        or worksheet.print_area_range
+        or worksheet.repeat_row_range
+        or worksheet.repeat_col_range
+        or worksheet.cond_formats
+        or worksheet.has_dynamic_arrays
+        or worksheet.embedded_images.has_images()
+    )
+
+
+class RenderedSheet(NamedTuple):
+    """The XML of a worksheet written in a workbook of its own, with the
+    strings and formats its indices refer to."""
+
+    xml: str
+    # Strings by their index in the XML, and the number of references.
+    strings: list[str]
+    string_refs: int
+    # Formats by their style index in the XML, the default one first.
+    formats: list[Format]
+    # First and last rows with cells, if any.
+    rows: tuple[int, int] | None
+
+    @classmethod
+    def render(
+        cls, workbook: Workbook, worksheet: Worksheet, selected: bool
+    ) -> RenderedSheet:
+        """Assemble the XML of ``worksheet``, the only sheet of ``workbook``,
+        which must not ``has_parts``."""
+        worksheet.selected = int(selected)
+        fh = StringIO()
+        worksheet._set_xml_writer(fh)
+        # Assigns the style indices in the order the formats are used.
+        worksheet._assemble_xml_file()
+        table: SharedStringTable = workbook.str_table
+        strings = sorted(table.string_table, key=table.string_table.__getitem__)
+        formats: list[Any] = [None] * (len(workbook.xf_format_indices) + 1)
+        for fmt in workbook.formats:
+            if fmt.xf_index is not None:
+                # The indices are those of the workbook it is added to.
+                fmt.xf_format_indices = fmt.dxf_format_indices = None
+                formats[fmt.xf_index] = fmt
+        rows = None
+        if worksheet.dim_rowmax is not None:
+            rows = (worksheet.dim_rowmin, worksheet.dim_rowmax)
+        return cls(fh.getvalue(), strings, table.count, formats, rows)
+
+
+class RenderedWorksheet(Worksheet):  # type: ignore[misc]
+    """A worksheet written from a ``RenderedSheet``.
+
+    The strings of the sheet are added to the shared strings once attached,
+    in the order they were written, and its formats when the XML is
+    assembled, so both get the indices the sheet would have had if it was
+    written in the workbook itself.
+    """
+
+    rendered: RenderedSheet
+    workbook: Workbook
+    string_indices: list[int]
+
+    def attach(self, rendered: RenderedSheet, workbook: Workbook) -> None:
+        self.rendered = rendered
+        self.workbook = workbook
+        table = workbook.str_table
+        self.string_indices = [
+            table._get_shared_string_index(string) for string in rendered.strings
+        ]
+        table.count += rendered.string_refs - len(rendered.strings)
+        if rendered.rows is not None:
+            self.dim_rowmin, self.dim_rowmax = rendered.rows
+
+    def _style_indices(self) -> list[int]:
+        workbook = self.workbook
+        indices = [0]
+        for fmt in self.rendered.formats[1:]:
+            index = workbook.xf_format_indices.get(fmt._get_format_key())
+            if index is None:
+                fmt.xf_format_indices = workbook.xf_format_indices
+                fmt.dxf_format_indices = workbook.dxf_format_indices
+                fmt.xf_index = None
+                workbook.formats.append(fmt)
+                index = fmt._get_xf_index()
+            indices.append(index)
+        return indices
+
+    def _assemble_xml_file(self) -> None:
+        xml = self.rendered.xml
+        styles = self._style_indices()
+        if styles != list(range(len(styles))):
+            xml = _STYLE.sub(lambda m: f'{m[1]}{styles[int(m[2])]}"', xml)
+        strings = self.string_indices
+        if strings != list(range(len(strings))):
+            xml = _STRING.sub(lambda m: f"{m[1]}{strings[int(m[2])]}<", xml)
+        self.fh.write(xml)
+        self._xml_close()
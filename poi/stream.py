@@ -0,0 +1,209 @@
+from __future__ import annotations
+
+import os
+from collections.abc import Collection, Iterable
+from itertools import islice
+from types import TracebackType
+from typing import IO, Any, Generic, Literal, TypeVar, Unpack
+
+import xlsxwriter
+
+from .aggregate import Aggregate
+from .nodes import (
+    Box,
+    BoxInstance,
+    CellStyle,
+    Col,
+    ColumnConfig,
+    RenderFunction,
+    RowHeightCallback,
+    Table,
+)
+from .visitors.writer import TableRenderer, make_should_write, writer_visitor
+from .writer import Op, RecordingWriter, Writer
+
+T = TypeVar("T")
+
+
+def _op_row(op: Op) -> int:
+    name, args, _ = op
+    if name == "set_column":
+        return -1
+    return args[0]  # type: ignore[no-any-return]
+
+
+def _row_ordered(ops: list[Op]) -> list[Op]:
+    """Reorder recorded ops so rows are written top to bottom.
+
+    In constant memory mode xlsxwriter flushes a row as soon as a later row is
+    written, so merged ranges are split into their top-left cell and the blank
+    cells of the following rows, each emitted with its own row.
+    """
+    ordered: list[tuple[int, Op]] = []
+    for op in ops:
+        name, args, _ = op
+        if name != "merge_range":
+            ordered.append((_op_row(op), op))
+            continue
+        first_row, first_col, last_row, last_col, value, *fmt = args
+        for r in range(first_row, last_row + 1):
+            for c in range(first_col, last_col + 1):
+                cell = value if (r, c) == (first_row, first_col) else None
+                ordered.append((r, ("write", (r, c, cell, *fmt), False)))
+        ordered.append((last_row, ("_add_merge", args[:4], False)))
+    ordered.sort(key=lambda item: item[0])
+    return [op for _, op in ordered]
+
+
+class SheetStream(Generic[T]):
+    """Writes a ``Table`` row by row as records arrive, in constant memory.
+
+    Optional ``header`` layout sections are written above the table.  Rows are
+    flushed to disk as soon as they are appended, and auto-fit widths and the
+    file are finalized by ``close()``, which runs when the ``with`` block ends.
+    A ``footer`` of aggregates is accumulated as rows are appended and
+    written below them on ``close()``.
+
+    With ``max_rows``, a sheet holds at most that many records: the next ones
+    go to a new worksheet, with the header sections and table header written
+    again, and each sheet gets its own footer.  ``constant_memory=False``
+    keeps the rows in memory until ``close()`` instead, for the smaller files
+    of shared strings.
+    """
+
+    def __init__(
+        self,
+        filename: str | os.PathLike[str] | IO[bytes],
+        columns: Collection[ColumnConfig],
+        header: Box | list[Box] | None = None,
+        start_row: int = 0,
+        start_col: int = 0,
+        global_format: dict[str, Any] | None = None,
+        fast: bool = False,
+        col_width: int | Literal["auto"] | None = None,
+        row_height: RowHeightCallback[T] | int | None = None,
+        cell_style: dict[str, RenderFunction[T]] | str | None = None,
+        datetime_format: str | None = None,
+        date_format: str | None = None,
+        time_format: str | None = None,
+        footer: dict[str, Aggregate] | None = None,
+        footer_formulas: bool = False,
+        footer_label: str | None = "Total",
+        max_rows: int | None = None,
+        constant_memory: bool = True,
+        **kwargs: Unpack[CellStyle],
+    ) -> None:
+        if max_rows is not None and max_rows < 1:
+            raise ValueError(f"max_rows must be positive, got {max_rows}")
+        self.max_rows = max_rows
+        self.table: Table[T] = Table(
+            data=[],
+            columns=columns,
+            col_width=col_width,
+            row_height=row_height,
+            cell_style=cell_style,
+            datetime_format=datetime_format,
+            date_format=date_format,
+            time_format=time_format,
+            footer=footer,
+            footer_formulas=footer_formulas,
+            footer_label=footer_label,
+            **kwargs,
+        )
+        if header is None:
+            sections = []
+        elif isinstance(header, Box):
+            sections = [header]
+        else:
+            sections = list(header)
+        root = Col(children=[*sections, self.table])
+        BoxInstance(root, start_row, start_col, None)
+
+        self.workbook = xlsxwriter.Workbook(
+            os.fspath(filename) if isinstance(filename, os.PathLike) else filename,
+            {"constant_memory": constant_memory},
+        )
+        self.worksheet = self.workbook.add_worksheet()
+        self.writer = Writer(self.workbook, self.worksheet, global_format)
+        self.should_write = make_should_write(fast)
+        self.closed = False
+
+        # Recorded once, replayed on every sheet.
+        self.header_ops: list[Op] = []
+        if sections:
+            recorder = RecordingWriter()
+            visitor = writer_visitor(recorder, fast=fast)
+            for section in sections:
+                section.accept(visitor)
+            self.header_ops = _row_ordered(recorder.ops)
+        self._start_sheet()
+
+    def _start_sheet(self) -> None:
+        self._replay(self.header_ops)
+        self.renderer = TableRenderer(self.table, self.writer, self.should_write)
+        self.renderer.write_header()
+
+    def _next_sheet(self) -> None:
+        self.renderer.finish()
+        self.worksheet = self.workbook.add_worksheet()
+        # Keep the formats already added to the workbook.
+        self.writer.worksheet = self.worksheet
+        self._start_sheet()
+
+    def _replay(self, ops: list[Op]) -> None:
+        for name, args, on_worksheet in ops:
+            if name == "_add_merge":
+                # Register the range without rewriting its (already flushed)
+                # cells, see _row_ordered().
+                self.worksheet.merge.append(list(args))
+            else:
+                target = self.worksheet if on_worksheet else self.writer
+                getattr(target, name)(*args)
+
+    @property
+    def count(self) -> int:
+        """Number of records written so far to the current sheet."""
+        return self.renderer.count
+
+    def append(self, record: T) -> None:
+        if self.max_rows is not None and self.renderer.count >= self.max_rows:
+            self._next_sheet()
+        self.renderer.write_rows((record,))
+
+    def extend(self, records: Iterable[T]) -> None:
+        max_rows = self.max_rows
+        if max_rows is None:
+            self.renderer.write_rows(records)
+            return
+        records = iter(records)
+        while True:
+            if self.renderer.count >= max_rows:
+                # Only start a sheet if records are left.
+                first = list(islice(records, 1))
+                if not first:
+                    return
+                self._next_sheet()
+                self.renderer.write_rows(first)
+            count = self.renderer.count
+            room = max_rows - count
+            self.renderer.write_rows(islice(records, room))
+            if self.renderer.count - count < room:
+                return
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        self.renderer.finish()
+        self.workbook.close()
+
+    def __enter__(self) -> SheetStream[T]:
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc: BaseException | None,
+        tb: TracebackType | None,
+    ) -> None:
+        self.close()
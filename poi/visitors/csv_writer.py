@@ -0,0 +1,262 @@
+import csv
+import datetime
+import os
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager, nullcontext
+from functools import singledispatch
+from typing import IO, Any, Literal
+
+from ..nodes import Box, Cell, Col, Image, Row, Table
+from ..writer import Writer
+from .writer import (
+    TableRenderer,
+    as_datetime,
+    format_excel_date,
+    make_should_write,
+    writer_visitor,
+)
+
+# How a tree that is more than one table is written as CSV: the whole grid,
+# only the first Table, or each Table to a file of its own.
+CsvLayout = Literal["flatten", "first_table", "per_table"]
+
+
+def format_value(value: Any, cell_format: Any) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, bool):
+        return "TRUE" if value else "FALSE"
+    if isinstance(value, datetime.date | datetime.time):
+        num_format = (cell_format or {}).get("num_format")
+        if num_format:
+            return format_excel_date(as_datetime(value), num_format)
+        return value.isoformat()
+    return value
+
+
+class _NullWorksheet:
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args: None
+
+
+class CsvWriter(Writer):
+    """A ``Writer`` that writes cell values as CSV rows.
+
+    Rows are kept until ``flush`` says no more cells will be written to them,
+    or with ``eager`` set, until a later row is written, so a table written
+    top to bottom only holds its current row.  Merged ranges keep their value
+    in the top-left cell, formulas are written as their cached result, images
+    and styles are dropped, and date and time values are formatted with their
+    ``num_format``.
+    """
+
+    def __init__(
+        self,
+        out: Any,
+        origin: tuple[int, int],
+        width: int | None = None,
+        **fmtparams: Any,
+    ) -> None:
+        self.worksheet = _NullWorksheet()
+        self.global_format = None
+        self.global_format_dict = {}
+        self.formats = {}
+        self.csv = csv.writer(out, **fmtparams)
+        self.row, self.col = origin
+        self.width = width
+        self.pending: dict[int, dict[int, Any]] = {}
+        self.eager = False
+
+    def _set(self, row: int, col: int, value: Any, cell_format: Any) -> None:
+        if row < self.row:
+            raise ValueError(
+                f"cannot write row {row} to CSV, rows up to {self.row} are written"
+            )
+        if self.eager and row > self.row:
+            self.flush(row)
+        cells = self.pending.setdefault(row, {})
+        cells[col - self.col] = format_value(value, cell_format)
+
+    def write(self, *args: Any) -> None:
+        self._set(args[0], args[1], args[2], args[3] if len(args) > 3 else None)
+
+    def write_formula(self, *args: Any) -> None:
+        # Formulas are written as their cached result.
+        self._set(args[0], args[1], args[4] if len(args) > 4 else None, args[3])
+
+    def merge_range(self, *args: Any) -> None:
+        first_row, first_col, last_row, last_col = args[:4]
+        if first_row < self.row:
+            # Table groups write their value in the first row before the
+            # range is merged, and those rows may be written out already.
+            first_row = self.row
+        else:
+            fmt = args[5] if len(args) > 5 else None
+            self._set(first_row, first_col, args[4], fmt)
+        # The rest of the range is blank, but still spans the rows.
+        for row in range(first_row + 1, last_row + 1):
+            self.pending.setdefault(row, {})
+        self.pending.setdefault(first_row, {}).setdefault(last_col - self.col, None)
+
+    def insert_image(self, *args: Any) -> None:
+        pass
+
+    def resolve_format(self, cell_format: dict[str, Any]) -> Any:
+        return cell_format
+
+    def add_table(self, *args: Any) -> None:
+        # Only the totals row is not written as cells.
+        first_row, first_col, last_row, last_col, options = args
+        if not options.get("total_row"):
+            return
+        for j, column in enumerate(options["columns"]):
+            if "total_function" in column:
+                self._set(last_row, first_col + j, column["total_value"], None)
+            elif "total_string" in column:
+                self._set(last_row, first_col + j, column["total_string"], None)
+
+    def flush(self, row: int) -> None:
+        """Write out every row above ``row``."""
+        while self.row < row:
+            cells = self.pending.pop(self.row, {})
+            width = max(cells, default=-1) + 1
+            if self.width is not None:
+                width = max(width, self.width)
+            values = (cells.get(col) for col in range(width))
+            self.csv.writerow("" if value is None else value for value in values)
+            self.row += 1
+
+    def close(self) -> None:
+        if self.pending:
+            self.flush(max(self.pending) + 1)
+
+
+def _width(root: Box) -> int | None:
+    if root.lazy_extent:
+        return None
+    if root.colspan:
+        return root.colspan
+    # The extent of the root, which has no direction to place an offset in.
+    spans = [child.cols for child in root.children]
+    if isinstance(root, Row):
+        return sum(spans)
+    return max(spans, default=0)
+
+
+def csv_visitor(writer: CsvWriter, fast: bool = False) -> Any:
+    """Walk a laid-out tree writing the whole grid into ``writer``.
+
+    Rows are written out as soon as they are complete: after each child of a
+    Col, and row by row in Tables, unless they are next to other boxes in a
+    Row.
+    """
+    should_write = make_should_write(fast)
+    write = writer_visitor(writer, fast)
+    in_row = False
+
+    @singledispatch
+    def visitor(self: Any) -> None:
+        write(self)
+
+    @visitor.register
+    def _(self: Row) -> None:
+        nonlocal in_row
+        outer, in_row = in_row, True
+        for child in self.iter_children():
+            visitor(child)
+        in_row = outer
+
+    @visitor.register
+    def _(self: Col) -> None:
+        for child in self.iter_children():
+            visitor(child)
+            if not in_row:
+                # Only offsets make this fall short, which merely holds rows.
+                writer.flush(child.row + child.rows - child.offset)
+
+    @visitor.register
+    def _(self: Table) -> None:  # type: ignore
+        write_table(writer, self, should_write, eager=not in_row)
+
+    return visitor
+
+
+def write_table(
+    writer: CsvWriter,
+    table: Table[Any],
+    should_write: Callable[[object], bool],
+    eager: bool = True,
+) -> None:
+    rows = table.iter_data()
+    renderer = TableRenderer(table, writer, should_write)
+    writer.eager = eager
+    renderer.write_header()
+    renderer.write_rows(rows)
+    writer.eager = False
+    renderer.finish()
+
+
+def iter_tables(box: Box) -> Iterator[Table[Any]]:
+    """Yield the Tables of a laid-out tree in document order."""
+    if isinstance(box, Table):
+        yield box
+    elif not isinstance(box, Cell | Image):
+        for child in box.iter_children():
+            yield from iter_tables(child)
+
+
+CsvTarget = str | os.PathLike[str] | IO[str]
+
+
+@contextmanager
+def _open(target: CsvTarget, encoding: str) -> Iterator[IO[str]]:
+    if isinstance(target, str | os.PathLike):
+        with open(target, "w", newline="", encoding=encoding) as f:
+            yield f
+    else:
+        with nullcontext(target) as f:
+            yield f
+
+
+def write_csv(
+    root: Box,
+    target: CsvTarget,
+    layout: CsvLayout = "flatten",
+    fast: bool = False,
+    encoding: str = "utf-8",
+    **fmtparams: Any,
+) -> None:
+    """Write a laid-out tree as CSV, see ``Sheet.write_csv``."""
+    should_write = make_should_write(fast)
+    if layout == "flatten":
+        with _open(target, encoding) as out:
+            writer = CsvWriter(out, (root.row, root.col), _width(root), **fmtparams)
+            root.accept(csv_visitor(writer, fast))
+            writer.close()
+    elif layout == "first_table":
+        table = next(iter_tables(root), None)
+        if table is None:
+            raise ValueError("the layout has no Table to write")
+        with _open(target, encoding) as out:
+            writer = CsvWriter(out, (table.row, table.col), **fmtparams)
+            write_table(writer, table, should_write)
+            writer.close()
+    elif layout == "per_table":
+        if isinstance(target, str | os.PathLike):
+            template = os.fspath(target)
+        else:
+            template = ""
+        if "{index}" not in template:
+            raise ValueError(
+                "per_table needs a file name with an {index} placeholder, "
+                f"got {target!r}"
+            )
+        for i, table in enumerate(iter_tables(root)):
+            with _open(template.format(index=i), encoding) as out:
+                writer = CsvWriter(out, (table.row, table.col), **fmtparams)
+                write_table(writer, table, should_write)
+                writer.close()
+    else:
+        raise ValueError(
+            f"layout must be 'flatten', 'first_table' or 'per_table', got {layout!r}"
+        )
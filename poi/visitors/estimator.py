@@ -0,0 +1,208 @@
+import json
+import os
+from collections import defaultdict
+from collections.abc import Iterable
+from functools import singledispatch
+from io import BytesIO
+from itertools import islice
+from typing import Any, NamedTuple
+
+from ..nodes import Box, Col, Pivot, Row, Table
+from ..writer import Writer
+from .writer import TableRenderer, make_should_write, writer_visitor
+
+# Rough bytes xlsxwriter holds per cell until the workbook is closed, plus the
+# shared string table entry of a string cell and a format (measured with
+# tracemalloc).
+CELL_BYTES = 160
+STRING_BYTES = 120
+FORMAT_BYTES = 1000
+# Rough deflated size of the package: a fixed part, the XML of a cell, and
+# the shared strings per byte of text.
+OUTPUT_BASE_BYTES = 5000
+OUTPUT_CELL_BYTES = 4
+OUTPUT_STRING_RATIO = 0.25
+# Table rows written to extrapolate cell counts, string volume and formats.
+SAMPLE_ROWS = 100
+
+
+class Estimate(NamedTuple):
+    """Predicted cost of writing a laid-out Box tree."""
+
+    cells: int
+    merges: int
+    formats: int
+    strings: int
+    string_bytes: int
+    images: int
+    image_bytes: int
+    # False when lazy children hide part of the tree from the estimate.
+    exact: bool
+    # Whether cells are written top to bottom, as constant memory mode needs.
+    row_ordered: bool
+
+    @property
+    def memory(self) -> int:
+        """Bytes expected to be held in memory before the workbook is closed."""
+        return (
+            self.cells * CELL_BYTES
+            + self.strings * STRING_BYTES
+            + self.string_bytes
+            + self.formats * FORMAT_BYTES
+            + self.image_bytes
+        )
+
+    @property
+    def output_size(self) -> int:
+        """Approximate size of the xlsx file in bytes."""
+        return int(
+            OUTPUT_BASE_BYTES
+            + self.cells * OUTPUT_CELL_BYTES
+            + self.string_bytes * OUTPUT_STRING_RATIO
+            + self.image_bytes
+        )
+
+
+def _image_size(image: Any, options: Any) -> int:
+    data = (options or {}).get("image_data")
+    if data is not None:
+        return len(data.getbuffer())
+    if isinstance(image, BytesIO):
+        return len(image.getbuffer())
+    if isinstance(image, bytes | bytearray | memoryview):
+        return len(image)
+    try:
+        return os.path.getsize(image)
+    except (OSError, TypeError):
+        return 0
+
+
+class _NullWorksheet:
+    def __getattr__(self, name: str) -> Any:
+        return lambda *args: None
+
+
+class CostWriter(Writer):
+    """A ``Writer`` that counts what would be written, each call counting
+    ``weight`` times.
+    """
+
+    def __init__(self) -> None:
+        self.worksheet = _NullWorksheet()
+        self.global_format = None
+        self.global_format_dict = {}
+        self.formats = {}
+        self.counts: defaultdict[str, float] = defaultdict(float)
+        self.weight = 1.0
+
+    def _count(self, value: Any, cell_format: Any) -> None:
+        if isinstance(value, str):
+            self.counts["strings"] += self.weight
+            self.counts["string_bytes"] += len(value.encode()) * self.weight
+        if cell_format:
+            key = json.dumps(cell_format, sort_keys=True, default=str)
+            self.formats.setdefault(key, None)
+
+    def write(self, *args: Any) -> None:
+        self.counts["cells"] += self.weight
+        self._count(args[2], args[3] if len(args) > 3 else None)
+
+    def write_formula(self, *args: Any) -> None:
+        self.counts["cells"] += self.weight
+        self._count(None, args[3])
+
+    def merge_range(self, *args: Any) -> None:
+        first_row, first_col, last_row, last_col = args[:4]
+        cells = (last_row - first_row + 1) * (last_col - first_col + 1)
+        self.counts["cells"] += cells * self.weight
+        self.counts["merges"] += self.weight
+        self._count(args[4], args[5] if len(args) > 5 else None)
+
+    def insert_image(self, *args: Any) -> None:
+        self.counts["images"] += self.weight
+        self.counts["image_bytes"] += _image_size(args[2], args[3]) * self.weight
+
+    def resolve_format(self, cell_format: dict[str, Any]) -> Any:
+        return cell_format
+
+
+def estimate_visitor(writer: CostWriter, fast: bool = False) -> Any:
+    """Walk a laid-out tree counting into ``writer``.
+
+    Cells and images go through the writer visitor, Table rows are sampled
+    and their counts extrapolated.
+    """
+    should_write = make_should_write(fast)
+    write = writer_visitor(writer, fast)
+    counts = writer.counts
+
+    @singledispatch
+    def visitor(self: Any) -> None:
+        write(self)
+
+    @visitor.register
+    def _(self: Row) -> None:
+        if self.lazy:
+            counts["lazy"] += 1
+            counts["unordered"] += 1
+            return
+        # Cells of a row are written child by child, so a child spanning
+        # several rows is followed by cells going back up.
+        if any(child.rows > 1 for child in self.children):
+            counts["unordered"] += 1
+        for child in self.children:
+            visitor(child)
+
+    @visitor.register
+    def _(self: Col) -> None:
+        if self.lazy:
+            counts["lazy"] += 1
+            counts["unordered"] += 1
+            return
+        for child in self.children:
+            visitor(child)
+
+    @visitor.register
+    def _(self: Pivot) -> None:
+        # Row keys are written down their column before the aggregates.
+        counts["unordered"] += 1
+        write(self)
+
+    @visitor.register
+    def _(self: Table) -> None:  # type: ignore
+        renderer = TableRenderer(self, writer, should_write)
+        renderer.write_header()
+        if self.excel_table is not None or self.group_by:
+            # Excel tables cannot be added in constant memory mode, and groups
+            # are merged after their rows are written.
+            counts["unordered"] += 1
+        if self.single_pass:
+            # Reading rows from a cursor would consume them.
+            counts["lazy"] += 1
+            return
+        sample = list(islice(self.data, SAMPLE_ROWS))
+        if sample:
+            writer.weight = len(self.data) / len(sample)  # type: ignore[arg-type]
+            renderer.write_rows(sample)
+            writer.weight = 1.0
+
+    return visitor
+
+
+def estimate(roots: Iterable[Box], fast: bool = False) -> Estimate:
+    writer = CostWriter()
+    visitor = estimate_visitor(writer, fast)
+    for root in roots:
+        root.accept(visitor)
+    counts = writer.counts
+    return Estimate(
+        cells=round(counts["cells"]),
+        merges=round(counts["merges"]),
+        formats=len(writer.formats),
+        strings=round(counts["strings"]),
+        string_bytes=round(counts["string_bytes"]),
+        images=round(counts["images"]),
+        image_bytes=round(counts["image_bytes"]),
+        exact=not counts["lazy"],
+        row_ordered=not counts["unordered"],
+    )
@@ -1,7 +1,8 @@
+import os
 from functools import singledispatch
 from typing import Any
 
-from ..nodes import Cell, Col, Image, Row, Table
+from ..nodes import Box, Cell, Col, Image, Pivot, Row, Table
 
 
 @singledispatch
@@ -9,18 +10,25 @@ def print_visitor(_: Any) -> None:
     pass
 
 
+def _print_children(box: Box) -> None:
+    # Lazy children can only be traversed once, by the write.
+    if box.lazy:
+        print("  <lazy children, laid out when written>")
+        return
+    for child in box.children:
+        print_visitor(child)
+
+
 @print_visitor.register
 def _(self: Col) -> None:
     print(f"write Col at {self.row}:{self.col}")
-    for child in self.children:
-        print_visitor(child)
+    _print_children(self)
 
 
 @print_visitor.register
 def _(self: Row) -> None:
     print(f"write Row at {self.row}:{self.col}")
-    for child in self.children:
-        print_visitor(child)
+    _print_children(self)
 
 
 @print_visitor.register
@@ -28,6 +36,11 @@ def _(self: Table) -> None:  # type: ignore
     print(f"write Table at {self.row}:{self.col}")
 
 
+@print_visitor.register
+def _(self: Pivot) -> None:
+    print(f"write Pivot at {self.row}:{self.col}")
+
+
 @print_visitor.register
 def _(self: Cell) -> None:
     print(
@@ -38,4 +51,7 @@ def _(self: Cell) -> None:
 
 @print_visitor.register
 def _(self: Image) -> None:
-    print(f"insert image {self.filename} at {self.row}:{self.col}")
+    source = self.filename
+    if not isinstance(source, str | os.PathLike):
+        source = f"<{type(source).__name__}>"
+    print(f"insert image {source} at {self.row}:{self.col}")
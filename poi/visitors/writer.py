@@ -1,13 +1,26 @@
 import datetime
 import re
 import unicodedata
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from functools import singledispatch
 from inspect import signature
 from typing import Any
 from weakref import WeakKeyDictionary
 
-from ..nodes import Cell, Col, Image, Row, Table
+from xlsxwriter.utility import xl_col_to_name
+
+from ..aggregate import SUBTOTAL_CODES, Accumulator, Aggregate
+from ..nodes import (
+    Cell,
+    Col,
+    ExcelTableOptions,
+    Image,
+    Pivot,
+    PivotKeys,
+    Row,
+    Table,
+    compile_formula,
+)
 from ..utils import get_obj_attr
 from ..writer import Writer
 
@@ -40,9 +53,11 @@ def call_by_sig(fn: Callable[..., Any], *args: Any) -> Any:
 def format_excel_date(dt: datetime.datetime, excel_fmt: str) -> str:
     # Render dt through an Excel-style date/time format.  Single-char tokens
     # (d/m/h/s) render without leading zeros to match Excel; doubled tokens
-    # (dd/mm/hh/ss) zero-pad.
+    # (dd/mm/hh/ss) zero-pad.  Quoted and escaped text is literal, and
+    # bracketed locale or color codes are not shown.
     tokens_rx = re.compile(
-        r"(yyyy|yy|dddd|ddd|dd|d|mmmm|mmm|mm|m|hh|h|ss|s|[aA]/[pP]|[aA][mM]/[pP][mM])",
+        r'("[^"]*"|\\.|\[[^\]]*\]|\.0+|'
+        r"yyyy|yy|dddd|ddd|dd|d|mmmm|mmm|mm|m|hh|h|ss|s|[aA]/[pP]|[aA][mM]/[pP][mM])",
         re.IGNORECASE,
     )
     matches = list(tokens_rx.finditer(excel_fmt))
@@ -51,6 +66,15 @@ def format_excel_date(dt: datetime.datetime, excel_fmt: str) -> str:
     date_tokens = ("yyyy", "yy", "dddd", "ddd", "dd", "d", "mmmm", "mmm")
 
     def render(token: str, idx: int) -> str:
+        if token[0] == '"':
+            return token[1:-1]
+        if token[0] == "\\":
+            return token[1:]
+        if token[0] == "[":
+            return ""
+        if token[0] == ".":
+            # Fractions of a second.
+            return "." + f"{dt.microsecond:06d}"[: len(token) - 1]
         t = token.lower()
         if t == "yyyy":
             return f"{dt.year:04d}"
@@ -170,6 +194,20 @@ def format_excel_number(val: float | int, num_format: str) -> str:
     return res
 
 
+def fit_width(text_width: int) -> int:
+    """Width of a column fitting text ``text_width`` characters wide."""
+    return max(text_width + 3, 10)
+
+
+def as_datetime(val: datetime.date | datetime.time) -> datetime.datetime:
+    """A date or time as the datetime ``format_excel_date`` renders."""
+    if isinstance(val, datetime.datetime):
+        return val
+    if isinstance(val, datetime.date):
+        return datetime.datetime.combine(val, datetime.time.min)
+    return datetime.datetime.combine(datetime.date(2026, 1, 1), val)
+
+
 def get_string_width(val: Any, num_format: str | None = None) -> int:
     if val is None:
         return 0
@@ -184,13 +222,7 @@ def get_string_width(val: Any, num_format: str | None = None) -> int:
             s = str(val)
         else:
             try:
-                if isinstance(val, datetime.datetime):
-                    dt = val
-                elif isinstance(val, datetime.date):
-                    dt = datetime.datetime.combine(val, datetime.time.min)
-                else:
-                    dt = datetime.datetime.combine(datetime.date(2026, 1, 1), val)
-                s = format_excel_date(dt, num_format)
+                s = format_excel_date(as_datetime(val), num_format)
             except Exception:
                 if isinstance(val, datetime.datetime):
                     return 19
@@ -241,67 +273,126 @@ def format_from_style(style_css: str) -> dict[str, Any]:
     return rv
 
 
-def writer_visitor(writer: Writer, fast: bool = False) -> Any:
-    EMPTY_VALUES = (None, "")
+_UNRESOLVED = object()
 
-    if fast:
+_TABLE_OPTIONS = (
+    "style",
+    "name",
+    "autofilter",
+    "banded_rows",
+    "banded_columns",
+    "first_column",
+    "last_column",
+)
 
-        def should_write(value: object) -> bool:
-            return value not in EMPTY_VALUES
-    else:
 
-        def should_write(value: object) -> bool:
-            return True
+class TableRenderer:
+    """Writes a laid-out ``Table`` through a ``Writer``.
 
-    @singledispatch
-    def visitor(_: Any) -> None:
-        pass
+    The header, the data rows and the final auto-fit widths are written by
+    separate calls, so rows can be fed in batches as they arrive; the Table
+    visitor writes ``table.data`` in one go.
+    """
 
-    @visitor.register
-    def _(self: Row) -> None:
-        for child in self.children:
-            visitor(child)
+    def __init__(
+        self,
+        table: Table[Any],
+        writer: Writer,
+        should_write: Callable[[object], bool],
+    ) -> None:
+        self.table = table
+        self.writer = writer
+        self.should_write = should_write
+        self.row, self.col = table.row, table.col
+        # Number of data rows written so far, and of group subtotal rows.
+        self.count = 0
+        self.subtotal_rows = 0
+        # Native Excel tables are styled by the table, not cell by cell.
+        excel_table = table.excel_table
+        self.cell_format = table.cell_format if excel_table is None else {}
+        # Aggregates of the totals row of an Excel table, or of the footer.
+        functions: list[Aggregate | str | None]
+        if excel_table is not None:
+            totals = excel_table.get("totals", {})
+            titles = {title.lower(): function for title, function in totals.items()}
+            functions = [titles.get(c.title.lower()) for c in table.columns]
+        else:
+            functions = [table.footer.get(c.title) for c in table.columns]
+        self.totals = [None if f is None else Accumulator(f) for f in functions]
+
+        columns = table.columns
+        names = [c.title for c in columns]
+        self.group_cols = [names.index(title) for title in table.group_by]
+        self.cell_cols = [j for j in range(len(columns)) if j not in self.group_cols]
+        # The open group of each level: [value, first row, format].
+        self.groups: list[list[Any]] = []
+        # Subtotals of each column, for every group level.
+        subtotals = table.group_subtotals
+        self.subtotals = [
+            [Accumulator(subtotals[t]) for _ in self.group_cols]
+            if t in subtotals
+            else None
+            for t in names
+        ]
+        self.formulas = [
+            compile_formula(c.formula, columns, self.col) if c.formula else None
+            for c in columns
+        ]
+        self.column_widths: list[int | None] = []
+        self.fixed_widths: list[Any] = []
+        for column in columns:
+            width = column.width or table.col_width
+            if width == "auto":
+                self.column_widths.append(get_string_width(column.title))
+                self.fixed_widths.append(None)
+            else:
+                self.column_widths.append(None)
+                self.fixed_widths.append(width)
 
-    @visitor.register
-    def _(self: Col) -> None:
-        for child in self.children:
-            visitor(child)
+        # Pre-parse the cell styles once instead of for every cell.
+        cell_style = table.cell_style
+        self.static_style_fmt: dict[str, Any] | None = None
+        self.conditional_styles: list[Any] = []
+        if isinstance(cell_style, str):
+            self.static_style_fmt = format_from_style(cell_style)
+        else:
+            self.conditional_styles = [
+                (condition, format_from_style(styles))
+                for styles, condition in cell_style.items()
+            ]
 
-    @visitor.register
-    def _(self: Table) -> None:  # type: ignore
+        self.datetime_fmt = table.datetime_format or "yyyy-mm-dd hh:mm:ss"
+        self.date_fmt = table.date_format or "yyyy-mm-dd"
+        self.time_fmt = table.time_format or "hh:mm:ss"
+
+        # Without conditional styles the format of a cell only depends on its
+        # column and on whether the value is a date or a time: merge the three
+        # formats of each column once, and resolve each on first use.
+        self.uniform_formats: list[tuple[dict[str, Any], ...]] | None = None
+        self.resolved_formats: list[list[Any]] = []
+        if not self.conditional_styles:
+            base = {**self.cell_format, **(self.static_style_fmt or {})}
+            self.uniform_formats = [
+                (
+                    {**base, **column_format},
+                    {**base, "num_format": self.date_fmt, **column_format},
+                    {**base, "num_format": self.time_fmt, **column_format},
+                )
+                for column_format in (c.format or {} for c in columns)
+            ]
+            self.resolved_formats = [[_UNRESOLVED] * 3 for _ in columns]
+
+    def write_header(self) -> None:
         row, col = self.row, self.col
-        data = self.data
-        columns = self.columns
-        n_cols = len(columns)
+        worksheet = self.writer.worksheet
         cell_format = self.cell_format
-        worksheet = writer.worksheet
-        write = writer.write
-        insert_image = writer.insert_image
-
-        row_height = self.row_height
-        if row_height:
-            if isinstance(row_height, int):
-                for i in range(1, len(data) + 1):
-                    worksheet.set_row(row + i, row_height)
-            else:
-                for i in range(1, len(data) + 1):
-                    height = call_by_sig(row_height, data[i - 1], i - 1)  # type: ignore
-                    if height:
-                        worksheet.set_row(row + i, height)
-
-        column_widths: list[int | None] = []
-        for i, column in enumerate(columns):
-            width = column.width or self.col_width
-            if width == "auto":
-                column_widths.append(get_string_width(column.title))
-            else:
-                column_widths.append(None)
-                if width:
-                    worksheet.set_column(col + i, col + i, width)
+        for i, width in enumerate(self.fixed_widths):
+            if width:
+                worksheet.set_column(col + i, col + i, width)
 
-        for i, column in enumerate(columns):
-            if should_write(column.title):
-                write(row, col + i, column.title, cell_format)
+        for i, column in enumerate(self.table.columns):
+            if self.should_write(column.title):
+                self.writer.write(row, col + i, column.title, cell_format)
                 # Write comment for header if present
                 if column.title_comment:
                     comment_opts = column.title_comment_options or {}
@@ -309,17 +400,22 @@ def writer_visitor(writer: Writer, fast: bool = False) -> Any:
                         row, col + i, column.title_comment, comment_opts
                     )
 
-        # Pre-parse the cell styles once instead of for every cell.
-        cell_style = self.cell_style
-        static_style_fmt: dict[str, Any] | None = None
-        conditional_styles: list[Any] = []
-        if isinstance(cell_style, str):
-            static_style_fmt = format_from_style(cell_style)
-        else:
-            conditional_styles = [
-                (condition, format_from_style(styles))
-                for styles, condition in cell_style.items()
-            ]
+    def write_rows(self, data: Iterable[Any]) -> None:
+        row, col = self.row, self.col
+        table = self.table
+        columns = table.columns
+        cell_format = self.cell_format
+        worksheet = self.writer.worksheet
+        write = self.writer.write
+        write_formula = self.writer.write_formula
+        resolve_format = self.writer.resolve_format
+        insert_image = self.writer.insert_image
+        should_write = self.should_write
+        row_height = table.row_height
+        column_widths = self.column_widths
+        conditional_styles = self.conditional_styles
+        uniform_formats = self.uniform_formats
+        resolved_formats = self.resolved_formats
 
         # Hoist per-column attributes out of the row loop.
         col_attrs = [c.attr for c in columns]
@@ -327,67 +423,438 @@ def writer_visitor(writer: Writer, fast: bool = False) -> Any:
         col_types = [c.type for c in columns]
         col_options = [c.options for c in columns]
         col_formats = [c.format for c in columns]
+        col_formulas = self.formulas
+        totals = self.totals
+        subtotals = self.subtotals
+        group_cols = self.group_cols
+        cell_cols = self.cell_cols
+        extra_rows = self.subtotal_rows
+
+        datetime_fmt = self.datetime_fmt
+        date_fmt = self.date_fmt
+        time_fmt = self.time_fmt
+
+        get_attr = get_obj_attr
+        render_value = call_by_sig
+        check_style = call_by_sig
+        string_width = get_string_width
+        checkpoints = self.writer.checkpoints
+        instrumentation = self.writer.instrumentation
+        if instrumentation is not None:
+            titles = {c.attr: c.title for c in columns if c.attr}
+            get_attr = instrumentation.timed(
+                get_obj_attr, "values", lambda args: titles[args[1]]
+            )
+            render_value = instrumentation.timed(
+                call_by_sig, "values", lambda args: args[2].title
+            )
+            check_style = instrumentation.timed(call_by_sig, "formats")
+            string_width = instrumentation.timed(get_string_width, "autofit")
+
+        i = self.count - 1
+        for i, item in enumerate(data, self.count):
+            target_row = row + i + 1 + extra_rows
+            if group_cols:
+                inserted = self._group_row(item, target_row)
+                target_row += inserted
+                extra_rows += inserted
+            if checkpoints and target_row >= self.writer.next_checkpoint:
+                self.writer.checkpoint(target_row)
+            if row_height:
+                if isinstance(row_height, int):
+                    worksheet.set_row(target_row, row_height)
+                else:
+                    height = call_by_sig(row_height, item, i)
+                    if height:
+                        worksheet.set_row(target_row, height)
 
-        datetime_fmt = self.datetime_format or "yyyy-mm-dd hh:mm:ss"
-        date_fmt = self.date_format or "yyyy-mm-dd"
-        time_fmt = self.time_format or "hh:mm:ss"
-
-        for i, item in enumerate(data):
-            target_row = row + i + 1
-            for j in range(n_cols):
+            for j in cell_cols:
                 attr = col_attrs[j]
+                render = col_renders[j]
                 if attr:
-                    val = get_obj_attr(item, attr)
+                    val = get_attr(item, attr)
+                elif render is not None:
+                    val = render_value(render, item, columns[j])
                 else:
-                    render = col_renders[j]
-                    assert render
-                    val = call_by_sig(render, item, columns[j])
+                    # A formula column without a cached result.
+                    val = None
 
                 if col_types[j] == "image":
                     insert_image(target_row, col + j, val, col_options[j])
                     continue
 
-                if not should_write(val):
+                formula = col_formulas[j]
+                if formula is None and not should_write(val):
                     continue
 
-                # Build the per-cell format with precedence (low -> high):
-                # cell_format < cell_style < datetime < column.format
-                merged_fmt: dict[str, Any] = dict(cell_format)
-                if static_style_fmt is not None:
-                    merged_fmt.update(static_style_fmt)
-                elif conditional_styles:
+                if uniform_formats is not None:
+                    if isinstance(val, datetime.date):
+                        kind = 1
+                    elif isinstance(val, datetime.time):
+                        kind = 2
+                    else:
+                        kind = 0
+                    merged_fmt = uniform_formats[j][kind]
+                    cell_fmt = resolved_formats[j][kind]
+                    if cell_fmt is _UNRESOLVED:
+                        cell_fmt = resolve_format(merged_fmt)
+                        resolved_formats[j][kind] = cell_fmt
+                else:
+                    # Build the per-cell format with precedence (low -> high):
+                    # cell_format < cell_style < datetime < column.format
+                    merged_fmt = dict(cell_format)
                     column = columns[j]
                     for condition, parsed in conditional_styles:
-                        if call_by_sig(condition, item, column):
+                        if check_style(condition, item, column):
                             merged_fmt.update(parsed)
 
-                if isinstance(val, datetime.datetime):
-                    merged_fmt["num_format"] = datetime_fmt
-                if isinstance(val, datetime.date):
-                    merged_fmt["num_format"] = date_fmt
-                if isinstance(val, datetime.time):
-                    merged_fmt["num_format"] = time_fmt
+                    if isinstance(val, datetime.datetime):
+                        merged_fmt["num_format"] = datetime_fmt
+                    if isinstance(val, datetime.date):
+                        merged_fmt["num_format"] = date_fmt
+                    if isinstance(val, datetime.time):
+                        merged_fmt["num_format"] = time_fmt
 
-                col_fmt = col_formats[j]
-                if col_fmt:
-                    merged_fmt.update(col_fmt)
+                    col_fmt = col_formats[j]
+                    if col_fmt:
+                        merged_fmt.update(col_fmt)
+                    cell_fmt = merged_fmt
 
                 current_width = column_widths[j]
                 if current_width is not None:
-                    val_width = get_string_width(val, merged_fmt.get("num_format"))
+                    val_width = string_width(val, merged_fmt.get("num_format"))
                     if val_width > current_width:
                         column_widths[j] = val_width
 
-                write(target_row, col + j, val, merged_fmt)
-
-        for j, auto_w in enumerate(column_widths):
+                if formula is None:
+                    write(target_row, col + j, val, cell_fmt)
+                else:
+                    write_formula(
+                        target_row,
+                        col + j,
+                        formula.format(target_row + 1),
+                        cell_fmt,
+                        0 if val is None else val,
+                    )
+                total = totals[j]
+                if total is not None:
+                    total.add(val)
+                level_totals = subtotals[j]
+                if level_totals is not None:
+                    for total in level_totals:
+                        total.add(val)
+        if instrumentation is not None:
+            instrumentation.counters["rows"] += i + 1 - self.count
+        self.count = i + 1
+        self.subtotal_rows = extra_rows
+
+    def _value(self, item: Any, j: int) -> Any:
+        column = self.table.columns[j]
+        if column.attr:
+            return get_obj_attr(item, column.attr)
+        if column.render is not None:
+            return call_by_sig(column.render, item, column)
+        return None
+
+    def _cell_format(self, item: Any, j: int, val: Any) -> dict[str, Any]:
+        """The format of a cell, as built in the row loop of ``write_rows``."""
+        if self.uniform_formats is not None:
+            if isinstance(val, datetime.date):
+                return self.uniform_formats[j][1]
+            if isinstance(val, datetime.time):
+                return self.uniform_formats[j][2]
+            return self.uniform_formats[j][0]
+        column = self.table.columns[j]
+        merged_fmt = dict(self.cell_format)
+        for condition, parsed in self.conditional_styles:
+            if call_by_sig(condition, item, column):
+                merged_fmt.update(parsed)
+        if isinstance(val, datetime.datetime):
+            merged_fmt["num_format"] = self.datetime_fmt
+        if isinstance(val, datetime.date):
+            merged_fmt["num_format"] = self.date_fmt
+        if isinstance(val, datetime.time):
+            merged_fmt["num_format"] = self.time_fmt
+        merged_fmt.update(column.format or {})
+        return merged_fmt
+
+    def _group_row(self, item: Any, row: int) -> int:
+        """Track the groups of the data row ``item`` written at ``row``.
+
+        Groups that end before it are merged and followed by their subtotal
+        rows, and the number of those rows is returned.  The value of a new
+        group is written in its first row right away, so writers that stream
+        rows see it in order; the range is merged when the group ends.
+        """
+        values = [self._value(item, j) for j in self.group_cols]
+        groups = self.groups
+        level = 0
+        while level < len(groups) and groups[level][0] == values[level]:
+            level += 1
+        inserted = self._close_groups(level, row)
+        row += inserted
+        for value, j in zip(values[level:], self.group_cols[level:], strict=True):
+            cell_format = self._cell_format(item, j, value)
+            if self.should_write(value):
+                self.writer.write(row, self.col + j, value, cell_format)
+            self._fit(j, value, cell_format)
+            groups.append([value, row, cell_format])
+        for value, j in zip(values, self.group_cols, strict=True):
+            total = self.totals[j]
+            if total is not None:
+                total.add(value)
+            level_totals = self.subtotals[j]
+            if level_totals is not None:
+                for total in level_totals:
+                    total.add(value)
+        return inserted
+
+    def _close_groups(self, level: int, row: int) -> int:
+        """End the groups from ``level`` down, the next row being ``row``."""
+        table = self.table
+        start = row
+        while len(self.groups) > level:
+            depth = len(self.groups) - 1
+            value, first, cell_format = self.groups.pop()
+            col = self.col + self.group_cols[depth]
+            if row - 1 > first:
+                self.writer.merge_range(first, col, row - 1, col, value, cell_format)
+            if table.group_subtotals:
+                label = table.subtotal_label.format(value)
+                self._write_cell(row, self.group_cols[depth], label, self.cell_format)
+                totals = [None if t is None else t[depth] for t in self.subtotals]
+                self._write_aggregates(row, totals, first, row - 1)
+                for total in totals:
+                    if total is not None:
+                        total.reset()
+                row += 1
+        return row - start
+
+    def finish(self) -> None:
+        table = self.table
+        if self.groups:
+            next_row = self.row + self.count + self.subtotal_rows + 1
+            self.subtotal_rows += self._close_groups(0, next_row)
+        if table.lazy_extent:
+            # Rows streamed from a cursor, or subtotal rows, are only counted now.
+            table.rowspan = table.extent(self.count + self.subtotal_rows)
+            table.clear_ancestor_extents()
+        if table.excel_table is not None:
+            self.add_excel_table(table.excel_table)
+        elif table.footer:
+            self.write_footer()
+        col = self.col
+        for j, auto_w in enumerate(self.column_widths):
             if auto_w is not None:
-                final_width = max(auto_w + 3, 10)
-                worksheet.set_column(col + j, col + j, final_width)
+                self.writer.worksheet.set_column(col + j, col + j, fit_width(auto_w))
+
+    def write_footer(self) -> None:
+        table = self.table
+        row = self.row + self.count + self.subtotal_rows + 1
+        if self.totals[0] is None and table.footer_label:
+            self._write_cell(row, 0, table.footer_label, self.cell_format)
+        self._write_aggregates(row, self.totals, self.row + 1, row - 1)
+
+    def _write_aggregates(
+        self, row: int, totals: list[Accumulator | None], first: int, last: int
+    ) -> None:
+        """Write the values of ``totals`` at ``row``, or with ``footer_formulas``
+        SUBTOTAL formulas over the rows ``first`` to ``last``."""
+        table = self.table
+        for j, total in enumerate(totals):
+            if total is None:
+                continue
+            value = total.value
+            cell_format = dict(self.cell_format)
+            if isinstance(value, datetime.date):
+                cell_format["num_format"] = self.date_fmt
+            elif isinstance(value, datetime.time):
+                cell_format["num_format"] = self.time_fmt
+            cell_format.update(table.columns[j].format or {})
+            code = SUBTOTAL_CODES.get(total.function)  # type: ignore[arg-type]
+            if table.footer_formulas and code and last >= first:
+                col = self.col + j
+                letter = xl_col_to_name(col)
+                cells = f"{letter}{first + 1}:{letter}{last + 1}"
+                formula = f"=SUBTOTAL({code},{cells})"
+                self.writer.write_formula(row, col, formula, cell_format, value)
+                self._fit(j, value, cell_format)
+            else:
+                self._write_cell(row, j, value, cell_format)
+
+    def _write_cell(self, row: int, j: int, value: Any, cell_format: Any) -> None:
+        self.writer.write(row, self.col + j, value, cell_format)
+        self._fit(j, value, cell_format)
+
+    def _fit(self, j: int, value: Any, cell_format: dict[str, Any]) -> None:
+        width = self.column_widths[j]
+        if width is not None:
+            value_width = get_string_width(value, cell_format.get("num_format"))
+            self.column_widths[j] = max(width, value_width)
+
+    def add_excel_table(self, excel_table: ExcelTableOptions) -> None:
+        table = self.table
+        options: dict[str, Any] = {
+            key: excel_table[key]  # type: ignore[literal-required]
+            for key in _TABLE_OPTIONS
+            if key in excel_table
+        }
+        has_totals = any(self.totals)
+        columns = []
+        for j, (column, total) in enumerate(
+            zip(table.columns, self.totals, strict=True)
+        ):
+            spec: dict[str, Any] = {"header": column.title}
+            if column.format:
+                spec["format"] = column.format
+            if total is not None:
+                # Excel tables only know "mean" as "average".
+                function = total.function
+                spec["total_function"] = "average" if function == "mean" else function
+                spec["total_value"] = total.value
+            elif j == 0 and has_totals:
+                spec["total_string"] = excel_table.get("total_label", "Total")
+            columns.append(spec)
+        options["columns"] = columns
+        if has_totals:
+            options["total_row"] = True
+        last_row = self.row + table.extent(self.count) - 1
+        last_col = self.col + len(table.columns) - 1
+        self.writer.add_table(self.row, self.col, last_row, last_col, options)
+
+
+def _pivot_spans(
+    pivot: Pivot, slots: list[PivotKeys], depth: int
+) -> Iterator[tuple[int, int, int, int, Any]]:
+    """(level, first, last, last_level, value) of the key cells of ``slots``,
+    levels being header rows for column keys and columns for row keys.
+
+    A key spans the slots of its group, including the subtotals of inner
+    groups, and a subtotal label the levels below it.
+    """
+    for level in range(depth):
+        start, group = 0, None
+        for i, slot in enumerate(slots):
+            if len(slot) == depth or len(slot) > level + 1:
+                if slot[: level + 1] == group:
+                    continue
+                if group is not None:
+                    yield level, start, i - 1, level, group[-1]
+                start, group = i, slot[: level + 1]
+                continue
+            if group is not None:
+                yield level, start, i - 1, level, group[-1]
+                group = None
+            if level == max(len(slot) - 1, 0):
+                yield level, i, i, depth - 1, pivot.label(slot)
+        if group is not None:
+            yield level, start, len(slots) - 1, level, group[-1]
+
+
+def write_pivot(
+    pivot: Pivot, writer: Writer, should_write: Callable[[object], bool]
+) -> None:
+    row, col = pivot.row, pivot.col
+    n_values = len(pivot.values)
+    left = len(pivot.row_keys)
+    top = row + pivot.header_rows
+    cell_format = pivot.cell_format
+    date_format = {**cell_format, "num_format": pivot.date_format}
+
+    def put(
+        first_row: int, first_col: int, last_row: int, last_col: int, value: Any
+    ) -> None:
+        if not should_write(value):
+            return
+        fmt = date_format if isinstance(value, datetime.date) else cell_format
+        if first_row == last_row and first_col == last_col:
+            writer.write(first_row, first_col, value, fmt)
+        else:
+            writer.merge_range(first_row, first_col, last_row, last_col, value, fmt)
+
+    if pivot.header_rows > 1:
+        put(row, col, top - 2, col + left - 1, None)
+    for j, (_, title) in enumerate(pivot.row_keys):
+        put(top - 1, col + j, top - 1, col + j, title)
+    column_slots = pivot.column_slots
+    spans = _pivot_spans(pivot, column_slots, len(pivot.column_keys))
+    for level, first, last, last_level, value in spans:
+        first_col = col + left + first * n_values
+        last_col = col + left + (last + 1) * n_values - 1
+        put(row + level, first_col, row + last_level, last_col, value)
+    if n_values > 1 or not pivot.column_keys:
+        for i in range(len(column_slots)):
+            for k, (_, _, title) in enumerate(pivot.values):
+                j = col + left + i * n_values + k
+                put(top - 1, j, top - 1, j, title)
+
+    spans = _pivot_spans(pivot, pivot.row_slots, left)
+    for level, first, last, last_level, value in spans:
+        put(top + first, col + level, top + last, col + last_level, value)
+    cells = pivot.cells
+    for i, row_slot in enumerate(pivot.row_slots):
+        j = col + left
+        for column_slot in column_slots:
+            accumulators = cells.get((row_slot, column_slot))
+            for k in range(n_values):
+                value = None if accumulators is None else accumulators[k].value
+                put(top + i, j, top + i, j, value)
+                j += 1
+
+
+EMPTY_VALUES = (None, "")
+
+
+def make_should_write(fast: bool) -> Callable[[object], bool]:
+    """In fast mode empty values are skipped instead of written."""
+    if fast:
+
+        def should_write(value: object) -> bool:
+            return value not in EMPTY_VALUES
+    else:
+
+        def should_write(value: object) -> bool:
+            return True
+
+    return should_write
+
+
+def writer_visitor(writer: Writer, fast: bool = False) -> Any:
+    should_write = make_should_write(fast)
+
+    @singledispatch
+    def visitor(_: Any) -> None:
+        pass
+
+    @visitor.register
+    def _(self: Row) -> None:
+        for child in self.iter_children():
+            visitor(child)
+
+    @visitor.register
+    def _(self: Col) -> None:
+        checkpoints = writer.checkpoints
+        for child in self.iter_children():
+            if checkpoints and child.row >= writer.next_checkpoint:
+                writer.checkpoint(child.row)
+            visitor(child)
+
+    @visitor.register
+    def _(self: Table) -> None:  # type: ignore
+        rows = self.iter_data()
+        renderer = TableRenderer(self, writer, should_write)
+        renderer.write_header()
+        renderer.write_rows(rows)
+        renderer.finish()
+
+    @visitor.register
+    def _(self: Pivot) -> None:
+        write_pivot(self, writer, should_write)
 
     @visitor.register
     def _(self: Image) -> None:
-        writer.insert_image(self.row, self.col, self.filename, self.options)
+        span = (self.rowspan or 1, self.colspan or 1)
+        writer.insert_image(self.row, self.col, self.filename, self.options, span)
 
     @visitor.register
     def _(self: Cell) -> None:
@@ -1,14 +1,23 @@
 from __future__ import annotations
 
+import datetime
 import json
 import logging
+from collections.abc import Callable
 from io import BytesIO
-from typing import Any, Protocol
+from typing import TYPE_CHECKING, Any, Protocol
 
 import xlsxwriter
 from xlsxwriter.format import Format
+from xlsxwriter.utility import _datetime_to_excel_datetime
 from xlsxwriter.worksheet import Worksheet
 
+from .images import DeferredImage, ImageCache, ImagePipeline
+from .packager import CompressionProfile, ParallelZipWorkbook
+
+if TYPE_CHECKING:
+    from .instrument import Instrumentation
+
 logger = logging.getLogger(__name__)
 
 # Excel stores numbers as IEEE 754 doubles, so integers outside the range
@@ -25,6 +34,13 @@ def _coerce_large_int(value: Any) -> Any:
     return value
 
 
+def _cached_value(value: Any) -> Any:
+    # Cached formula results are stored as is, dates must be serial numbers.
+    if isinstance(value, datetime.date | datetime.time):
+        return _datetime_to_excel_datetime(value, False, True)
+    return _coerce_large_int(value)
+
+
 class WorkBook(Protocol):
     def add_format(self, format: dict[str, Any]) -> Format: ...
 
@@ -34,14 +50,41 @@ class WorkBook(Protocol):
 
 
 class BytesIOWorkBook:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        compression: CompressionProfile | int | None = None,
+        compression_workers: int | None = None,
+        constant_memory: bool = False,
+        properties: dict[str, Any] | None = None,
+        image_pipeline: ImagePipeline | None = None,
+    ) -> None:
         self.io = BytesIO()
-        self.workbook = xlsxwriter.Workbook(self.io)
+        if constant_memory:
+            # Parallel compression needs every part in memory.
+            self.workbook = xlsxwriter.Workbook(self.io, {"constant_memory": True})
+        elif compression is None and compression_workers is None:
+            self.workbook = xlsxwriter.Workbook(self.io)
+        else:
+            self.workbook = ParallelZipWorkbook(
+                self.io,
+                compression=compression if compression is not None else "balanced",
+                workers=compression_workers,
+            )
+        if properties:
+            self.workbook.set_properties(properties)
+        # Shared by the writers of all sheets.
+        self.image_cache = ImageCache()
+        self.image_pipeline = image_pipeline
+        # Images waiting for the pipeline until the workbook is closed.
+        self.deferred_images: list[DeferredImage] = []
 
     def add_format(self, format: dict[str, Any]) -> Format:
         return self.workbook.add_format(format)
 
     def close(self) -> None:
+        if self.image_pipeline is not None:
+            self.image_pipeline.insert(self.deferred_images, self.image_cache)
+            self.deferred_images = []
         self.workbook.close()
         self.io.seek(0)
 
@@ -53,11 +96,20 @@ class BytesIOWorkBook:
     def worksheets(self) -> Worksheet:
         return self.workbook.worksheets()
 
-    def add_worksheet(self, name: str | None = None) -> Worksheet:
-        return self.workbook.add_worksheet(name)
+    def add_worksheet(
+        self, name: str | None = None, worksheet_class: type[Worksheet] | None = None
+    ) -> Worksheet:
+        return self.workbook.add_worksheet(name, worksheet_class)
 
 
 class Writer:
+    instrumentation: Instrumentation | None = None
+    # Called with the row being written every ``checkpoint_interval`` rows,
+    # to report progress and enforce cancellation and memory budgets.
+    checkpoints: tuple[Callable[[int], None], ...] = ()
+    checkpoint_interval = 1000
+    next_checkpoint = 0
+
     def __init__(
         self,
         workbook: WorkBook,
@@ -71,6 +123,22 @@ class Writer:
         )
         self.global_format_dict = global_format or {}
         self.formats: dict[str, Any] = {}
+        cache = getattr(workbook, "image_cache", None)
+        self.image_cache: ImageCache = cache if cache is not None else ImageCache()
+        self.image_pipeline: ImagePipeline | None = getattr(
+            workbook, "image_pipeline", None
+        )
+
+    def add_checkpoint(self, check: Callable[[int], None], interval: int) -> None:
+        if self.checkpoints:
+            interval = min(interval, self.checkpoint_interval)
+        self.checkpoints = (*self.checkpoints, check)
+        self.checkpoint_interval = interval
+
+    def checkpoint(self, row: int) -> None:
+        self.next_checkpoint = row + self.checkpoint_interval
+        for check in self.checkpoints:
+            check(row)
 
     def _calc_format(self, cell_format: Any) -> Any:
         if not cell_format:
@@ -92,6 +160,11 @@ class Writer:
             logger.error(f"cell_format must be dict, got {cell_format}")
             return self.global_format
 
+    def resolve_format(self, cell_format: dict[str, Any]) -> Any:
+        """The format ``write`` uses for ``cell_format``, to look up once and
+        pass for every cell sharing it."""
+        return self._calc_format(cell_format)
+
     def _path_args(self, args: Any) -> Any:
         last_arg = args[-1]
         if isinstance(last_arg, dict):
@@ -105,6 +178,15 @@ class Writer:
             out[2] = _coerce_large_int(out[2])
         self.worksheet.write(*out)
 
+    def write_formula(
+        self, row: int, col: int, formula: str, cell_format: Any, value: Any = 0
+    ) -> None:
+        """Write ``formula`` with ``value`` as its cached result."""
+        if isinstance(cell_format, dict):
+            cell_format = self._calc_format(cell_format)
+        value = _cached_value(value)
+        self.worksheet.write_formula(row, col, formula, cell_format, value)
+
     def merge_range(self, *args: Any) -> None:
         out = list(self._path_args(args))
         # out: (first_row, first_col, last_row, last_col, value, [format])
@@ -112,5 +194,97 @@ class Writer:
             out[4] = _coerce_large_int(out[4])
         self.worksheet.merge_range(*out)
 
+    def insert_image(
+        self,
+        row: int,
+        col: int,
+        source: Any,
+        options: Any = None,
+        span: tuple[int, int] = (1, 1),
+    ) -> None:
+        """Insert an image anchored at ``(row, col)`` and meant to fill the
+        ``(rows, cols)`` cells of ``span``."""
+        if self.image_pipeline is not None:
+            self.workbook.deferred_images.append(  # type: ignore[attr-defined]
+                DeferredImage(self.worksheet, row, col, source, options or {}, span)
+            )
+            return
+        image = self.image_cache.get(source, options)
+        self.worksheet.insert_image(row, col, image, options)
+
+    def add_table(
+        self,
+        first_row: int,
+        first_col: int,
+        last_row: int,
+        last_col: int,
+        options: dict[str, Any],
+    ) -> None:
+        """Add a native Excel table, the ``format`` of its columns are dicts."""
+        columns = []
+        for column in options.get("columns", []):
+            column = dict(column)
+            if "format" in column:
+                column["format"] = self._calc_format(column["format"])
+            if "total_value" in column:
+                column["total_value"] = _cached_value(column["total_value"])
+            columns.append(column)
+        self.worksheet.add_table(
+            first_row, first_col, last_row, last_col, {**options, "columns": columns}
+        )
+
+
+# A recorded call: (method name, positional args, whether it targets the
+# worksheet rather than the Writer).
+Op = tuple[str, tuple[Any, ...], bool]
+
+
+class _RecordingWorksheet:
+    def __init__(self, ops: list[Op]) -> None:
+        self._ops = ops
+
+    def __getattr__(self, name: str) -> Any:
+        def record(*args: Any) -> None:
+            self._ops.append((name, args, True))
+
+        return record
+
+
+class RecordingWriter(Writer):
+    """A ``Writer`` that records every call instead of touching a workbook.
+
+    Formats are kept as plain dicts, so the recorded ops are picklable as long
+    as the written values are, and can be replayed into a real ``Writer`` in
+    another process with ``replay``.
+    """
+
+    def __init__(self) -> None:
+        self.ops: list[Op] = []
+        self.worksheet = _RecordingWorksheet(self.ops)
+        self.global_format = None
+        self.global_format_dict = {}
+        self.formats = {}
+
+    def write(self, *args: Any) -> None:
+        self.ops.append(("write", args, False))
+
+    def write_formula(self, *args: Any) -> None:
+        self.ops.append(("write_formula", args, False))
+
+    def merge_range(self, *args: Any) -> None:
+        self.ops.append(("merge_range", args, False))
+
     def insert_image(self, *args: Any) -> None:
-        self.worksheet.insert_image(*args)
+        self.ops.append(("insert_image", args, False))
+
+    def add_table(self, *args: Any) -> None:
+        self.ops.append(("add_table", args, False))
+
+    def resolve_format(self, cell_format: dict[str, Any]) -> Any:
+        return cell_format
+
+
+def replay(ops: list[Op], writer: Writer) -> None:
+    for name, args, on_worksheet in ops:
+        target = writer.worksheet if on_worksheet else writer
+        getattr(target, name)(*args)
@@ -0,0 +1,31 @@
+"""Read the parts of written xlsx files."""
+
+import io
+import zipfile
+
+
+def parts(data):
+    """All the parts of the xlsx ``data`` by name, checking their CRCs.
+
+    docProps/core.xml is left out, it holds the creation timestamp.
+    """
+    z = zipfile.ZipFile(io.BytesIO(data))
+    assert z.testzip() is None
+    return {n: z.read(n) for n in z.namelist() if n != "docProps/core.xml"}
+
+
+def part(data, name):
+    """The XML part ``name`` of the xlsx ``data``."""
+    return zipfile.ZipFile(io.BytesIO(data)).read(name).decode()
+
+
+def sheet_xml(data, index=1):
+    """The XML of the ``index``-th worksheet of the xlsx ``data``."""
+    return part(data, f"xl/worksheets/sheet{index}.xml")
+
+
+def media(data):
+    """The images of the xlsx ``data`` by name, in name order."""
+    z = zipfile.ZipFile(io.BytesIO(data))
+    names = sorted(n for n in z.namelist() if n.startswith("xl/media/"))
+    return {n: z.read(n) for n in names}
@@ -395,9 +395,11 @@ def test_autofit_edge_cases():
         last_name: str
         logo_path: str
 
+    # Images are loaded by the writer, so the path has to exist.
+    logo = os.path.join(os.path.dirname(__file__), "..", "docs", "assets", "hello.png")
     data = [
-        Item(first_name="Jane", last_name="Doe", logo_path="logo.png"),
-        Item(first_name="Haowei", last_name="Wang", logo_path="logo.png"),
+        Item(first_name="Jane", last_name="Doe", logo_path=logo),
+        Item(first_name="Haowei", last_name="Wang", logo_path=logo),
     ]
 
     columns = [
@@ -418,7 +420,7 @@ def test_autofit_edge_cases():
 
     workbook = xlsxwriter.Workbook()
     worksheet = workbook.add_worksheet()
-    # Mock insert_image to prevent file not found errors for "logo.png"
+    # Mock insert_image, only the column widths matter here
     worksheet.insert_image = lambda *args, **kwargs: None
 
     table = Table(data=data, columns=columns)
@@ -0,0 +1,73 @@
+from poi import BatchJob, Cell, Col, Sheet, Table, export_batch
+
+from .helpers import part
+
+
+def build_report(customer):
+    return Sheet(
+        root=Col(
+            children=[
+                Cell(f"Customer {customer['name']}"),
+                Table(data=customer["orders"], columns=[("id", "Order")]),
+            ]
+        )
+    )
+
+
+def fail(_):
+    raise ValueError("boom")
+
+
+def _customers(n):
+    return [
+        {"name": f"c{i}", "orders": [{"id": j} for j in range(i + 1)]} for i in range(n)
+    ]
+
+
+def _shared_strings(content):
+    return part(content, "xl/sharedStrings.xml")
+
+
+def test_export_batch_ordered(tmp_path):
+    customers = _customers(6)
+    jobs = [
+        BatchJob(build_report, c, tmp_path / f"{c['name']}.xlsx" if i % 2 else None)
+        for i, c in enumerate(customers)
+    ]
+    results = list(export_batch(jobs, workers=2, max_pending=2))
+
+    assert [r.job_index for r in results] == list(range(6))
+    assert all(r.ok and r.elapsed >= 0 for r in results)
+    for i, result in enumerate(results):
+        if i % 2:
+            assert result.content is None
+            content = (tmp_path / f"c{i}.xlsx").read_bytes()
+        else:
+            content = result.content
+        assert f"Customer c{i}" in _shared_strings(content)
+
+
+def test_export_batch_reports_failures_and_sinks():
+    received = []
+    jobs = [
+        BatchJob(build_report, _customers(1)[0], received.append),
+        BatchJob(fail),
+        BatchJob(data=Col(children=[Cell("raw tree")])),
+    ]
+    results = sorted(
+        export_batch(jobs, workers=2, ordered=False), key=lambda r: r.job_index
+    )
+
+    assert results[0].ok and results[0].content is None
+    assert len(received) == 1 and "Customer c0" in _shared_strings(received[0])
+    assert isinstance(results[1].error, ValueError)
+    assert "boom" in results[1].traceback
+    assert "raw tree" in _shared_strings(results[2].content)
+
+
+def test_export_batch_in_process():
+    results = list(
+        export_batch([BatchJob(build_report, c) for c in _customers(3)], workers=1)
+    )
+    assert [r.job_index for r in results] == [0, 1, 2]
+    assert all(r.ok for r in results)
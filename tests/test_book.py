@@ -0,0 +1,115 @@
+import datetime
+import functools
+import pickle
+import weakref
+
+from poi import Book, Cell, Col, Row, Sheet, Table
+from poi.book import _render_pickled_sheet
+from poi.sheet_xml import RenderedSheet
+
+from .helpers import parts
+
+
+def render_total(record):
+    return record["price"] * record["qty"]
+
+
+def _sheet(n):
+    data = [
+        {
+            "name": f"item {i}",
+            "price": i * 1.5,
+            "qty": i,
+            "day": datetime.date(2026, 1, 1 + i % 28),
+        }
+        for i in range(n)
+    ]
+    return Sheet(
+        root=Col(
+            children=[
+                Row(children=[Cell(f"Report {n}", colspan=3, bold=True), Cell("x")]),
+                Table(
+                    data=data,
+                    columns=[
+                        ("name", "Name"),
+                        {"attr": "price", "title": "Price", "width": "auto"},
+                        ("day", "Day"),
+                        {"title": "Total", "render": render_total},
+                    ],
+                    cell_style="bg_color: #EEEEEE",
+                ),
+            ]
+        )
+    )
+
+
+def _book(workers, sheets):
+    book = Book(workers=workers)
+    for sheet in sheets:
+        book.add_sheet(sheet)
+    return book.write_to_bytes_io().read()
+
+
+def test_parallel_book_matches_serial():
+    sheets = [_sheet(n) for n in (5, 20, 1, 12)]
+    assert parts(_book(2, sheets)) == parts(_book(0, sheets))
+
+
+def _styled(*styles):
+    cells = [Cell(f"cell {i % 3}", **style) for i, style in enumerate(styles)]
+    return Sheet(root=Col(children=cells))
+
+
+def test_parallel_book_renumbers_strings_and_styles():
+    unpicklable = Sheet(
+        root=Table(
+            data=[{"a": "cell 2"}, {"a": "other"}],
+            columns=[("a", "A")],
+            cell_style={"font_color: red": lambda r: r["a"] == "other"},
+        )
+    )
+    sheets = [
+        _styled({"bold": True}, {"italic": True}),
+        unpicklable,
+        _styled({"italic": True}, {"font_color": "red"}, {"bold": True}, {}),
+        _styled({"underline": 1}, {"bold": True}),
+    ]
+    assert parts(_book(2, sheets)) == parts(_book(0, sheets))
+
+
+def test_workers_send_back_the_writes_of_sheets_with_parts():
+    rendered = _render_pickled_sheet(pickle.dumps(_sheet(3)), True)
+    assert isinstance(rendered, RenderedSheet)
+    assert 'tabSelected="1"' in rendered.xml
+    table = Sheet(root=Table([{"a": 1}], [("a", "A")], excel_table=True))
+    assert isinstance(_render_pickled_sheet(pickle.dumps(table), False), list)
+
+
+def test_parallel_book_renders_unpicklable_sheets_in_parent():
+    unpicklable = Sheet(
+        root=Table(
+            data=[{"a": 1}], columns=[{"title": "A", "render": lambda r: r["a"] + 1}]
+        )
+    )
+    sheets = [_sheet(3), unpicklable]
+    assert parts(_book(2, sheets)) == parts(_book(0, sheets))
+
+
+def test_book_builds_sheet_factories_one_at_a_time():
+    built = []
+
+    def factory(n):
+        # The previously built sheet is freed before the next one is built.
+        assert all(ref() is None for ref in built)
+        sheet = _sheet(n)
+        built.append(weakref.ref(sheet))
+        return sheet
+
+    lazy = [functools.partial(factory, n) for n in (5, 20, 1)]
+    assert parts(_book(0, lazy)) == parts(_book(0, [_sheet(n) for n in (5, 20, 1)]))
+    assert len(built) == 3
+
+
+def test_parallel_book_builds_sheet_factories_in_workers():
+    lazy = [functools.partial(_sheet, n) for n in (5, 20, 1)]
+    assert parts(_book(2, lazy)) == parts(_book(0, [_sheet(n) for n in (5, 20, 1)]))
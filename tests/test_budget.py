@@ -0,0 +1,80 @@
+import itertools
+
+import pytest
+
+import poi.budget
+from poi import Book, Budget, BudgetExceededError, Cell, Col, Row, Sheet, Table
+
+from .helpers import parts, sheet_xml
+
+
+def _root(n=50):
+    data = [{"name": f"item {i}", "qty": i} for i in range(n)]
+    return Col(
+        children=[
+            Row(children=[Cell("Report", colspan=2), Cell("x")]),
+            Table(data=data, columns=[("name", "Name"), ("qty", "Qty")]),
+        ]
+    )
+
+
+def test_within_budget_unchanged():
+    plain = Sheet(root=_root()).write_to_bytes_io().getvalue()
+    budget = Budget(max_cells=1000, max_memory=10**9)
+    limited = Sheet(root=_root(), budget=budget).write_to_bytes_io().getvalue()
+    assert parts(plain) == parts(limited)
+
+
+def test_exceeded_streams():
+    sheet = Sheet(root=_root(), budget=Budget(max_cells=10))
+    xml = sheet_xml(sheet.write_to_bytes_io().getvalue())
+    # Constant memory mode writes strings inline.
+    assert 'inlineStr"><is><t>item 49</t>' in xml
+    assert '<mergeCell ref="A1:B1"/>' in xml
+
+
+def test_exceeded_raises():
+    sheet = Sheet(root=_root(), budget=Budget(max_cells=10, on_exceed="raise"))
+    with pytest.raises(BudgetExceededError, match="105 cells exceed"):
+        sheet.write_to_bytes_io()
+
+
+def test_unordered_layout_raises():
+    root = Row(children=[Table(data=[1, 2], columns=[("real", "R")]), Cell("x")])
+    sheet = Sheet(root=root, budget=Budget(max_cells=1))
+    with pytest.raises(BudgetExceededError, match="cannot be written"):
+        sheet.write_to_bytes_io()
+
+
+def test_memory_guard_aborts(monkeypatch):
+    rss = itertools.count(0, 10**6)
+    monkeypatch.setattr(poi.budget, "_rss", lambda: next(rss))
+    budget = Budget(max_memory=5 * 10**6, check_interval=10)
+    with pytest.raises(BudgetExceededError, match="over the memory budget"):
+        Sheet(root=_root(), budget=budget).write_to_bytes_io()
+
+
+def test_book_streams():
+    book = Book(workers=2, budget=Budget(max_cells=100))
+    book.add_sheet(Sheet(root=_root()))
+    book.add_sheet(Sheet(root=_root()))
+    data = book.write_to_bytes_io().getvalue()
+    assert "inlineStr" in sheet_xml(data)
+
+
+def test_book_builds_sheet_functions_for_the_plan():
+    calls = []
+
+    def build():
+        calls.append(1)
+        return Sheet(root=Table(data=[{"a": 1}], columns=[("a", "A")]))
+
+    book = Book(budget=Budget(max_cells=10))
+    book.add_sheet(build)
+    book.write_to_bytes_io()
+    assert len(calls) == 2
+
+
+def test_invalid_on_exceed():
+    with pytest.raises(ValueError, match="on_exceed"):
+        Budget(on_exceed="ignore")  # type: ignore[arg-type]
@@ -0,0 +1,123 @@
+import os
+import shutil
+import sqlite3
+import time
+
+import pytest
+
+from poi import Book, Cell, Col, Image, OutputCache, Sheet, Table, content_key
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "docs", "assets")
+
+
+def _sheet(n=20, color="red", calls=None):
+    def total(r):
+        if calls is not None:
+            calls.append(r)
+        return r["qty"] * 2
+
+    data = [{"name": f"item {i}", "qty": i} for i in range(n)]
+    return Sheet(
+        root=Col(
+            children=[
+                Cell("Report", bold=True),
+                Table(
+                    data=data,
+                    columns=[
+                        ("name", "Name"),
+                        {"title": "Total", "render": total},
+                    ],
+                    cell_style={f"color: {color}": lambda r: r["qty"] > 10},
+                ),
+            ]
+        )
+    )
+
+
+def test_content_key():
+    key = content_key(_sheet())
+    assert key == content_key(_sheet())
+    assert key != content_key(_sheet(21))
+    assert key != content_key(_sheet(color="blue"))
+    assert key != content_key(Sheet(root=_sheet().root, fast=True))
+
+    book = Book()
+    book.add_sheet(_sheet())
+    assert content_key(book) not in (key, content_key(Book()))
+
+
+def test_render_hit_is_byte_identical(tmp_path):
+    cache = OutputCache(tmp_path / "a")
+    first = cache.render(_sheet()).getvalue()
+    calls = []
+    second = cache.render(_sheet(calls=calls)).getvalue()
+    assert first == second
+    # Only the key was computed.
+    assert len(calls) == 20
+
+    # A cold cache renders the same bytes again.
+    assert OutputCache(tmp_path / "b").render(_sheet()).getvalue() == first
+
+
+def test_render_keeps_report_properties(tmp_path):
+    sheet = _sheet()
+    OutputCache(tmp_path).render(sheet)
+    assert sheet.properties is None
+
+
+def test_content_key_reads_image_files(tmp_path):
+    path = tmp_path / "logo.png"
+    shutil.copy(os.path.join(ASSETS, "basic.png"), path)
+    sheet = Sheet(root=Image(str(path)))
+    key = content_key(sheet)
+    shutil.copy(os.path.join(ASSETS, "hello.png"), path)
+    assert content_key(sheet) != key
+
+
+def test_user_key(tmp_path):
+    cache = OutputCache(tmp_path)
+    first = cache.render(_sheet(), key="report:2026-01").getvalue()
+    calls = []
+    second = cache.render(_sheet(calls=calls), key="report:2026-01").getvalue()
+    assert first == second
+    assert calls == []
+
+
+def test_lazy_needs_key(tmp_path):
+    sheet = Sheet(root=Col(children=(Cell(i) for i in range(3)), lazy=True))
+    with pytest.raises(ValueError, match="lazy"):
+        OutputCache(tmp_path).render(sheet)
+
+
+def test_lru_eviction(tmp_path):
+    cache = OutputCache(tmp_path, max_bytes=250)
+    cache.put("a", b"a" * 100)
+    cache.put("b", b"b" * 100)
+    past = time.time() - 60
+    os.utime(tmp_path / "a.xlsx", (past, past))
+    os.utime(tmp_path / "b.xlsx", (past + 1, past + 1))
+    # Reading "a" makes it the most recently used.
+    assert cache.get("a") == b"a" * 100
+    cache.put("c", b"c" * 100)
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+    assert sorted(os.listdir(tmp_path)) == ["a.xlsx", "c.xlsx"]
+
+
+def test_content_key_of_grouped_tables():
+    def grouped(n):
+        data = [{"group": i // 3, "qty": i} for i in range(n)]
+        columns = [("group", "Group"), ("qty", "Qty")]
+        table = Table(data, columns, group_by=["Group"], group_subtotals={"Qty": "sum"})
+        return Sheet(root=table)
+
+    assert content_key(grouped(9)) == content_key(grouped(9))
+    assert content_key(grouped(9)) != content_key(grouped(10))
+
+
+def test_cursor_needs_key(tmp_path):
+    conn = sqlite3.connect(":memory:")
+    sheet = Sheet(root=Table(conn.execute("select 1 as a")))
+    with pytest.raises(ValueError, match="cursor"):
+        content_key(sheet)
@@ -0,0 +1,134 @@
+import io
+import json
+import re
+import subprocess
+import sys
+import zipfile
+
+import pytest
+
+from poi.cli import main, parse_value
+
+CSV = "name,amount,zip\nalice,10,02139\nbob,2.5,\n"
+
+
+def _sheets(path):
+    z = zipfile.ZipFile(path)
+    names = sorted(n for n in z.namelist() if n.startswith("xl/worksheets/sheet"))
+    return [z.read(name).decode() for name in names]
+
+
+def _cells(xml):
+    return re.findall(r'<c r="(\w+)"[^>]*>(?:<is>)?<[vt]>([^<]*)</[vt]>', xml)
+
+
+def test_csv_to_xlsx(tmp_path):
+    source = tmp_path / "sales.csv"
+    source.write_text(CSV)
+    assert main([str(source)]) == 0
+    (xml,) = _sheets(tmp_path / "sales.xlsx")
+    assert _cells(xml) == [
+        ("A1", "name"),
+        ("B1", "amount"),
+        ("C1", "zip"),
+        ("A2", "alice"),
+        ("B2", "10"),
+        ("C2", "02139"),
+        ("A3", "bob"),
+        ("B3", "2.5"),
+    ]
+
+
+def test_spec_and_auto_width(tmp_path):
+    source = tmp_path / "sales.csv"
+    source.write_text(CSV)
+    spec = tmp_path / "spec.json"
+    spec.write_text(
+        json.dumps(
+            {
+                "columns": [["name", "Customer name"], "amount"],
+                "style": {"bold": True},
+                "footer": {"amount": "sum"},
+            }
+        )
+    )
+    out = tmp_path / "out.xlsx"
+    args = [str(source), "-s", str(spec), "-o", str(out), "--auto-width", "1"]
+    assert main(args) == 0
+    (xml,) = _sheets(out)
+    assert ("A1", "Customer name") in _cells(xml)
+    assert ("B4", "12.5") in _cells(xml)
+    # Only the title and the first record are measured.
+    assert re.findall(r'<col min="(\d)" max="\d" width="(\d+)', xml) == [
+        ("1", "16"),
+        ("2", "10"),
+    ]
+
+
+def test_jsonl_from_stdin_split_into_sheets(tmp_path, monkeypatch):
+    lines = "".join(json.dumps({"n": i, "tag": f"t{i}"}) + "\n" for i in range(5))
+    monkeypatch.setattr(sys, "stdin", io.TextIOWrapper(io.BytesIO(lines.encode())))
+    out = tmp_path / "out.xlsx"
+    args = ["-", "-f", "jsonl", "-o", str(out), "--max-rows", "2"]
+    assert main([*args, "--no-constant-memory"]) == 0
+    sheets = _sheets(out)
+    assert len(sheets) == 3
+    assert ("A2", "4") in _cells(sheets[2])
+    # Kept in memory, strings are shared rather than inline.
+    assert 't="s"' in sheets[2]
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["data.txt"], "input format"),
+        (["-", "-f", "csv"], "--output is required"),
+        (["missing.csv"], "No such file"),
+    ],
+)
+def test_cli_errors(args, message, capsys):
+    with pytest.raises(SystemExit):
+        main(args)
+    assert message in capsys.readouterr().err
+
+
+def test_parse_value():
+    assert [parse_value(v) for v in ["", "7", "-1.5e3", "007", "1_000", "x"]] == [
+        None,
+        7,
+        -1500.0,
+        "007",
+        "1_000",
+        "x",
+    ]
+
+
+def test_startup_defers_imports():
+    code = "import sys, poi.cli; print('xlsxwriter' in sys.modules)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_spec_cell_style_must_be_a_string(tmp_path, capsys):
+    source = tmp_path / "sales.csv"
+    source.write_text(CSV)
+    spec = tmp_path / "spec.json"
+    spec.write_text(json.dumps({"cell_style": {"bold: true": "x"}}))
+    with pytest.raises(SystemExit):
+        main([str(source), "-s", str(spec)])
+    assert "cell_style must be a style string" in capsys.readouterr().err
+    assert not (tmp_path / "sales.xlsx").exists()
+
+
+def test_failed_input_keeps_previous_output(tmp_path, capsys):
+    source = tmp_path / "events.jsonl"
+    source.write_text('{"n": 1}\n{"n": 2}\nnot json\n')
+    out = tmp_path / "events.xlsx"
+    out.write_bytes(b"previous")
+    with pytest.raises(SystemExit):
+        main([str(source)])
+    assert "line 3" in capsys.readouterr().err
+    assert out.read_bytes() == b"previous"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["events.jsonl", "events.xlsx"]
@@ -0,0 +1,151 @@
+import csv
+import datetime
+import io
+
+import pytest
+
+from poi import Cell, Col, Row, Sheet, Table
+from poi.visitors.csv_writer import format_value
+
+
+def _records(n):
+    return [
+        {
+            "name": f"item {i}",
+            "qty": i,
+            "day": datetime.date(2026, 1, 1 + i),
+            "ok": i % 2 == 0,
+        }
+        for i in range(n)
+    ]
+
+
+COLUMNS = [
+    ("name", "Name"),
+    ("qty", "Qty"),
+    ("day", "Day"),
+    {"title": "Double", "render": lambda r: r["qty"] * 2},
+    ("ok", "OK"),
+]
+
+
+def _report(n=3):
+    return Sheet(
+        root=Col(
+            children=[
+                Row(children=[Cell("Report", colspan=5, bold=True)]),
+                Table(data=_records(n), columns=COLUMNS, date_format="dd/mm/yyyy"),
+                Row(children=[Cell("Total", colspan=3), Cell(n)], offset=1),
+            ]
+        )
+    )
+
+
+def _rows(text, delimiter=","):
+    return list(csv.reader(io.StringIO(text), delimiter=delimiter))
+
+
+def test_flatten_writes_the_grid():
+    out = io.StringIO()
+    _report().write_csv(out)
+    assert _rows(out.getvalue()) == [
+        ["Report", "", "", "", ""],
+        ["Name", "Qty", "Day", "Double", "OK"],
+        ["item 0", "0", "01/01/2026", "0", "TRUE"],
+        ["item 1", "1", "02/01/2026", "2", "FALSE"],
+        ["item 2", "2", "03/01/2026", "4", "TRUE"],
+        ["", "", "", "", ""],
+        ["Total", "", "", "3", ""],
+    ]
+
+
+def test_flatten_side_by_side():
+    sheet = Sheet(
+        root=Row(
+            children=[
+                Table(data=_records(2), columns=COLUMNS[:2]),
+                Col(children=[Cell("note"), Cell("more", rowspan=2)]),
+            ]
+        )
+    )
+    out = io.StringIO()
+    sheet.write_csv(out)
+    assert _rows(out.getvalue()) == [
+        ["Name", "Qty", "note"],
+        ["item 0", "0", "more"],
+        ["item 1", "1", ""],
+    ]
+
+
+def test_first_table_as_tsv(tmp_path):
+    path = tmp_path / "out.tsv"
+    _report(2).write_csv(path, layout="first_table", delimiter="\t")
+    assert _rows(path.read_text(), "\t") == [
+        ["Name", "Qty", "Day", "Double", "OK"],
+        ["item 0", "0", "01/01/2026", "0", "TRUE"],
+        ["item 1", "1", "02/01/2026", "2", "FALSE"],
+    ]
+
+
+def test_per_table(tmp_path):
+    sheet = Sheet(
+        root=Col(
+            children=[
+                Cell("Two tables"),
+                Table(data=_records(1), columns=COLUMNS[:1]),
+                Row(children=[Table(data=_records(2), columns=COLUMNS[1:2])], offset=1),
+            ]
+        )
+    )
+    sheet.write_csv(tmp_path / "table-{index}.csv", layout="per_table")
+    assert _rows((tmp_path / "table-0.csv").read_text()) == [["Name"], ["item 0"]]
+    assert _rows((tmp_path / "table-1.csv").read_text()) == [["Qty"], ["0"], ["1"]]
+
+    with pytest.raises(ValueError, match="index"):
+        sheet.write_csv(tmp_path / "table.csv", layout="per_table")
+
+
+def test_rows_are_written_while_rendering():
+    out = io.StringIO()
+
+    class Records:
+        def __len__(self):
+            return 5
+
+        def __iter__(self):
+            for i, record in enumerate(_records(5)):
+                # Only the last row written is still held back.
+                assert out.getvalue().count("\n") == i
+                yield record
+
+    Sheet(root=Table(data=Records(), columns=COLUMNS)).write_csv(out)
+    assert len(_rows(out.getvalue())) == 6
+
+
+def test_unknown_layout():
+    with pytest.raises(ValueError, match="layout"):
+        _report().write_csv(io.StringIO(), layout="sideways")
+
+
+@pytest.mark.parametrize(
+    ("value", "num_format", "expected"),
+    [
+        (datetime.date(2026, 3, 4), "yyyy-mm-dd", "2026-03-04"),
+        (datetime.date(2026, 3, 4), "d mmm yy", "4 Mar 26"),
+        (datetime.date(2026, 3, 4), "dddd, mmmm d", "Wednesday, March 4"),
+        (
+            datetime.datetime(2026, 3, 4, 15, 7, 9),
+            "yyyy-mm-dd hh:mm:ss",
+            "2026-03-04 15:07:09",
+        ),
+        (
+            datetime.datetime(2026, 3, 4, 15, 7, 9),
+            "m/d/yy h:mm AM/PM",
+            "3/4/26 3:07 PM",
+        ),
+        (datetime.time(9, 5, 1, 250000), "hh:mm:ss.00", "09:05:01.25"),
+        (datetime.date(2026, 3, 4), '[$-409]yyyy" week"', "2026 week"),
+    ],
+)
+def test_format_date(value, num_format, expected):
+    assert format_value(value, {"num_format": num_format}) == expected
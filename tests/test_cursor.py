@@ -0,0 +1,103 @@
+import sqlite3
+
+import pytest
+
+from poi import Cell, Col, Sheet, Table
+
+from .helpers import parts
+
+
+class _Recording:
+    """Wraps a cursor, recording the sizes passed to fetchmany."""
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.sizes = []
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def fetchmany(self, size):
+        self.sizes.append(size)
+        return self.cursor.fetchmany(size)
+
+
+@pytest.fixture
+def db():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("create table sales (product text, qty integer, price real)")
+    conn.executemany(
+        "insert into sales values (?, ?, ?)",
+        [(f"item {i}", i, i * 1.5) for i in range(7)],
+    )
+    yield conn
+    conn.close()
+
+
+def _write(root):
+    return parts(Sheet(root=root).write_to_bytes_io().read())
+
+
+def test_table_reads_cursor_in_batches(db):
+    cursor = _Recording(db.execute("select * from sales order by qty"))
+    table = Table(data=cursor, batch_size=3)
+    records = [{"product": f"item {i}", "qty": i, "price": i * 1.5} for i in range(7)]
+    columns = [("product", "product"), ("qty", "qty"), ("price", "price")]
+    expected = _write(Col(children=[Cell("Sales"), Table(records, columns)]))
+
+    assert _write(Col(children=[Cell("Sales"), table])) == expected
+    # 7 rows in batches of 3, until an empty batch.
+    assert cursor.sizes == [3, 3, 3, 3]
+    assert table.rows == 8
+
+
+def test_table_cursor_with_columns(db):
+    cursor = db.execute("select product, qty from sales where qty < 3")
+    columns = [
+        ("product", "Product"),
+        {"title": "Double", "render": lambda r: r["qty"] * 2},
+    ]
+    records = [{"product": f"item {i}", "qty": i} for i in range(3)]
+    assert _write(Table(data=cursor, columns=columns)) == _write(
+        Table(data=records, columns=columns)
+    )
+
+
+def test_table_cursor_must_be_last_child(db):
+    cursor = db.execute("select * from sales")
+    with pytest.raises(ValueError, match="only known once written"):
+        Sheet(root=Col(children=[Table(data=cursor), Cell("total")]))
+
+
+def test_table_cursor_is_written_once(db):
+    sheet = Sheet(root=Table(data=db.execute("select * from sales")))
+    sheet.write_to_bytes_io()
+    with pytest.raises(ValueError, match="already read"):
+        sheet.write_to_bytes_io()
+
+
+def test_table_cursor_estimate_is_not_exact(db):
+    cursor = _Recording(db.execute("select * from sales"))
+    sheet = Sheet(root=Col(children=[Table(data=cursor)]))
+    assert not sheet.estimate().exact
+    # Estimating does not consume the cursor.
+    assert cursor.sizes == []
+
+
+def test_table_requires_columns_without_cursor():
+    with pytest.raises(ValueError, match="columns are required"):
+        Table(data=[{"a": 1}])
+
+
+def test_ancestors_see_the_cursor_table_extent():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("create table t (n integer)")
+    conn.executemany("insert into t values (?)", [(i,) for i in range(5000)])
+    table = Table(data=conn.execute("select n from t"))
+    sheet = Sheet(
+        root=Col(children=[Cell("Report"), Col(children=[Cell("Numbers"), table])])
+    )
+    sheet.write_to_bytes_io()
+    assert table.rows == 5001
+    assert sheet.root.rows == 5003
@@ -0,0 +1,90 @@
+import datetime
+import io
+import os
+
+from poi import Book, Cell, Col, Image, Row, Sheet, Table
+
+IMAGE = os.path.join(os.path.dirname(__file__), "..", "docs", "assets", "basic.png")
+
+
+def _root(n=50):
+    data = [
+        {"name": f"item {i}", "qty": i, "day": datetime.date(2026, 1, 1 + i % 28)}
+        for i in range(n)
+    ]
+    return Col(
+        children=[
+            Row(children=[Cell("Report", colspan=2, bold=True), Cell("x")]),
+            Table(
+                data=data,
+                columns=[("name", "Name"), ("qty", "Qty"), ("day", "Day")],
+                cell_style={"color: red": lambda r: r["qty"] > 5},
+            ),
+        ]
+    )
+
+
+def test_sheet_estimate():
+    est = Sheet(root=_root(50)).estimate()
+    assert est.cells == 2 + 1 + 3 * 51
+    assert est.merges == 1
+    # "Report", "x", three titles and 50 names
+    assert est.strings == 55
+    assert est.string_bytes == len("Reportx") + len("NameQtyDay") + sum(
+        len(f"item {i}") for i in range(50)
+    )
+    # bold, table, table with date, both in red
+    assert est.formats == 5
+    assert est.images == 0
+    assert est.exact and est.row_ordered
+    assert est.memory > est.output_size > 0
+
+
+def test_estimate_samples_large_tables():
+    est = Sheet(root=_root(10_000)).estimate()
+    assert est.cells == 3 + 3 * 10_001
+    assert est.strings == 2 + 3 + 10_000
+
+
+def test_estimate_images_and_order():
+    with open(IMAGE, "rb") as f:
+        data = f.read()
+    root = Row(
+        children=[
+            Image(IMAGE),
+            Image("in-memory.png", options={"image_data": io.BytesIO(data)}),
+            Table(data=[1, 2], columns=[("real", "R")]),
+        ]
+    )
+    est = Sheet(root=root).estimate()
+    assert est.images == 2
+    assert est.image_bytes == 2 * len(data)
+    assert not est.row_ordered
+
+
+def test_estimate_lazy():
+    root = Col(children=(Cell(i) for i in range(3)), lazy=True)
+    est = Sheet(root=root).estimate()
+    assert not est.exact
+
+
+def test_estimate_samples_grouped_tables():
+    data = [{"group": i // 100, "qty": i} for i in range(10_000)]
+    table = Table(
+        data=data,
+        columns=[("group", "Group"), ("qty", "Qty")],
+        group_by=["Group"],
+        group_subtotals={"Qty": "sum"},
+    )
+    # Group cells are merged down their runs, the quantities are all written.
+    assert Sheet(root=table).estimate().cells > 10_000
+
+
+def test_book_estimate():
+    book = Book()
+    book.add_sheet(Sheet(root=_root(10)))
+    book.add_sheet(Sheet(root=_root(20)))
+    est = book.estimate()
+    assert est.cells == 2 * 3 + 3 * 11 + 3 * 21
+    # Formats are shared by the workbook.
+    assert est.formats == 5
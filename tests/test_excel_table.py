@@ -0,0 +1,155 @@
+import io
+import re
+import sqlite3
+from datetime import date
+
+import pytest
+
+from poi import Book, Budget, BudgetExceededError, Cell, Col, Sheet, Table
+
+from .helpers import part, sheet_xml
+
+RECORDS = [
+    {"product": "apple", "qty": 3, "price": 1.5, "day": date(2024, 1, 2)},
+    {"product": "pear", "qty": 5, "price": 2.0, "day": date(2024, 1, 3)},
+    {"product": "plum", "qty": 4, "price": 0.5, "day": date(2024, 1, 4)},
+]
+COLUMNS = [
+    ("product", "Product"),
+    ("qty", "Qty"),
+    {"attr": "price", "title": "Price", "format": {"num_format": "0.00"}},
+    ("day", "Day"),
+]
+
+
+def _write(root):
+    return Sheet(root=root).write_to_bytes_io().read()
+
+
+def test_excel_table_part():
+    data = _write(Table(RECORDS, COLUMNS, excel_table=True))
+    table = part(data, "xl/tables/table1.xml")
+    assert 'ref="A1:D4"' in table
+    assert '<autoFilter ref="A1:D4"/>' in table
+    assert 'name="TableStyleMedium9"' in table
+    assert re.findall(r'tableColumn id="\d" name="(\w+)"', table) == [
+        "Product",
+        "Qty",
+        "Price",
+        "Day",
+    ]
+    assert "<tableParts" in sheet_xml(data)
+
+
+def test_excel_table_drops_table_wide_formats():
+    plain = part(_write(Table(RECORDS, COLUMNS, bold=True)), "xl/styles.xml")
+    native = part(
+        _write(Table(RECORDS, COLUMNS, bold=True, excel_table=True)), "xl/styles.xml"
+    )
+    count = re.compile(r'<cellXfs count="(\d+)"')
+    # Only the default, the price and the date formats are left.
+    assert count.search(native).group(1) == "3"
+    assert int(count.search(plain).group(1)) > 3
+    assert "<b/>" not in native
+
+
+def test_excel_table_options_and_totals():
+    table = Table(
+        RECORDS,
+        COLUMNS,
+        excel_table={
+            "style": "Table Style Light 1",
+            "name": "Fruit",
+            "autofilter": False,
+            "totals": {"qty": "sum", "Price": "average", "Day": "max"},
+            "total_label": "All",
+        },
+    )
+    assert table.rowspan == 5
+    data = _write(table)
+    xml = part(data, "xl/tables/table1.xml")
+    assert 'name="Fruit"' in xml
+    assert 'name="TableStyleLight1"' in xml
+    assert "autoFilter" not in xml
+    assert 'totalsRowCount="1"' in xml
+    assert 'totalsRowLabel="All"' in xml
+    sheet = sheet_xml(data)
+    # Totals are formulas with their results cached.
+    assert "<f>SUBTOTAL(109,[Qty])</f><v>12</v>" in sheet
+    assert "<f>SUBTOTAL(101,[Price])</f><v>1.3333333333333333</v>" in sheet
+    assert "<f>SUBTOTAL(104,[Day])</f><v>45295.0</v>" in sheet
+
+
+def test_excel_table_custom_total_and_cursor():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("create table t (qty integer)")
+    conn.executemany("insert into t values (?)", [(i,) for i in range(5)])
+    table = Table(
+        conn.execute("select * from t"),
+        excel_table={"totals": {"qty": "SUM([qty])*2"}},
+        batch_size=2,
+    )
+    data = _write(Col(children=[Cell("Title"), table]))
+    assert table.rowspan == 7
+    assert 'ref="A2:A8"' in part(data, "xl/tables/table1.xml")
+    assert "<f>SUM([qty])*2</f>" in sheet_xml(data)
+
+
+def test_excel_table_mean_total():
+    table = Table(RECORDS, COLUMNS, excel_table={"totals": {"Qty": "mean"}})
+    data = _write(table)
+    assert 'totalsRowFunction="average"' in part(data, "xl/tables/table1.xml")
+    assert "<f>SUBTOTAL(101,[Qty])</f><v>4.0</v>" in sheet_xml(data)
+
+
+def test_excel_table_keeps_a_data_row():
+    table = Table([], COLUMNS, excel_table=True)
+    assert table.rowspan == 2
+    assert 'ref="A1:D2"' in part(_write(table), "xl/tables/table1.xml")
+
+
+@pytest.mark.parametrize(
+    "columns, options, message",
+    [
+        ([("a", "Name"), ("b", "name")], True, "must be unique"),
+        ([("a", "A")], {"totals": {"B": "sum"}}, "unknown columns"),
+        ([("a", "A")], {"totals": {"A": "median"}}, "must be one of"),
+    ],
+)
+def test_excel_table_invalid(columns, options, message):
+    with pytest.raises(ValueError, match=message):
+        Table([], columns, excel_table=options)
+
+
+def test_excel_table_in_parallel_book():
+    def sheet():
+        return Sheet(
+            root=Table(RECORDS, COLUMNS, excel_table={"totals": {"Qty": "sum"}})
+        )
+
+    serial, parallel = Book(), Book(workers=2)
+    for book in (serial, parallel):
+        book.sheets = [sheet(), sheet()]
+    tables = [
+        part(book.write_to_bytes_io().read(), "xl/tables/table2.xml")
+        for book in (serial, parallel)
+    ]
+    assert tables[0] == tables[1]
+
+
+def test_excel_table_is_not_streamed():
+    budget = Budget(max_cells=1, on_exceed="stream")
+    assert Sheet(root=Table(RECORDS, COLUMNS)).estimate().row_ordered
+    sheet = Sheet(root=Table(RECORDS, COLUMNS, excel_table=True), budget=budget)
+    assert not sheet.estimate().row_ordered
+    with pytest.raises(BudgetExceededError, match="constant memory"):
+        sheet.write_to_bytes_io()
+
+
+def test_excel_table_csv_totals():
+    table = Table(RECORDS, COLUMNS, excel_table={"totals": {"Qty": "count"}})
+    out = io.StringIO()
+    Sheet(root=table).write_csv(out)
+    lines = out.getvalue().splitlines()
+    assert lines[0] == "Product,Qty,Price,Day"
+    assert lines[-1] == "Total,3,,"
@@ -0,0 +1,89 @@
+import io
+import re
+from datetime import date
+
+import pytest
+
+from poi import Sheet, Table
+
+from .helpers import sheet_xml
+
+RECORDS = [
+    {"name": "apple", "qty": 3, "price": 1.5, "day": date(2024, 1, 2)},
+    {"name": "pear", "qty": 5, "price": None, "day": date(2024, 1, 3)},
+    {"name": "plum", "qty": 4, "price": 0.5, "day": date(2024, 1, 4)},
+]
+COLUMNS = [("name", "Name"), ("qty", "Qty"), ("price", "Price"), ("day", "Day")]
+
+
+def _csv(sheet):
+    out = io.StringIO()
+    sheet.write_csv(out)
+    return out.getvalue().splitlines()
+
+
+def _once(records):
+    # The footer must not iterate the data a second time.
+    yield from records
+
+
+class _Once(list):
+    def __iter__(self):
+        if getattr(self, "read", False):
+            raise AssertionError("data read twice")
+        self.read = True
+        return super().__iter__()
+
+
+def test_footer_values():
+    footer = {"Qty": "sum", "Price": "mean", "Day": "max"}
+    table = Table(_Once(RECORDS), COLUMNS, footer=footer)
+    assert table.rowspan == 5
+    assert _csv(Sheet(root=table))[-1] == "Total,12,1.0,2024-01-04"
+
+
+def test_footer_count_min_and_reducer():
+    footer = {
+        "Name": lambda longest, name: max(longest, name, key=len),
+        "Qty": "min",
+        "Price": "count",
+    }
+    table = Table(RECORDS, COLUMNS, footer=footer, footer_label="ignored")
+    assert _csv(Sheet(root=table))[-1] == "apple,3,2,"
+
+
+def test_footer_formulas():
+    table = Table(
+        RECORDS, COLUMNS, footer={"Qty": "sum", "Day": "min"}, footer_formulas=True
+    )
+    xml = sheet_xml(Sheet(root=table).write_to_bytes_io().read())
+    assert "<f>SUBTOTAL(109,B2:B4)</f><v>12</v>" in xml
+    assert "<f>SUBTOTAL(105,D2:D4)</f><v>45293.0</v>" in xml
+
+
+def test_footer_of_empty_table():
+    table = Table([], COLUMNS, footer={"Qty": "sum"}, footer_formulas=True)
+    xml = sheet_xml(Sheet(root=table).write_to_bytes_io().read())
+    assert "SUBTOTAL" not in xml
+    assert re.search(r'<c r="B2"[^>]*><v>0</v>', xml)
+
+
+def test_footer_streamed():
+    out = io.BytesIO()
+    with Sheet.stream(out, columns=COLUMNS, footer={"Qty": "sum"}) as stream:
+        stream.extend(_once(RECORDS))
+    xml = sheet_xml(out.getvalue())
+    assert re.search(r'<c r="B5"[^>]*><v>12</v>', xml)
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"footer": {"Cost": "sum"}}, "unknown columns"),
+        ({"footer": {"Qty": "median"}}, "aggregate must be"),
+        ({"footer": {"Qty": "sum"}, "excel_table": True}, "totals row"),
+    ],
+)
+def test_footer_invalid(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        Table(RECORDS, COLUMNS, **kwargs)
@@ -0,0 +1,92 @@
+import io
+import re
+
+import pytest
+
+from poi import Cell, Col, Row, Sheet, Table
+
+from .helpers import sheet_xml
+
+RECORDS = [{"q3": 10, "q4": 15}, {"q3": 7, "q4": 4}]
+
+
+def _formulas(root):
+    xml = sheet_xml(Sheet(root=root).write_to_bytes_io().read())
+    return re.findall(r'<c r="(\w+)"[^>]*><f>(.*?)</f><v>(.*?)</v>', xml)
+
+
+def test_formula_column():
+    columns = [
+        ("q3", "Q3"),
+        ("q4", "Q4"),
+        {"title": "Delta", "formula": "={q4}-{q3}"},
+        {
+            "title": "Growth",
+            "formula": "={q4}/{q3}-1",
+            "render": lambda r: r["q4"] / r["q3"] - 1,
+        },
+    ]
+    assert _formulas(Table(RECORDS, columns)) == [
+        ("C2", "B2-A2", "0"),
+        ("D2", "B2/A2-1", "0.5"),
+        ("C3", "B3-A3", "0"),
+        ("D3", "B3/A3-1", "-0.4285714285714286"),
+    ]
+
+
+def test_formula_follows_table_position():
+    columns = [
+        {"title": "Total", "formula": "=SUM({q3}:{q4})", "attr": "total"},
+        ("q3", "Q3"),
+        ("q4", "Q4"),
+    ]
+    records = [{**r, "total": r["q3"] + r["q4"]} for r in RECORDS]
+    root = Col(
+        children=[
+            Cell("Quarterly"),
+            Row(children=[Cell("", colspan=2), Table(records, columns)]),
+        ]
+    )
+    assert _formulas(root) == [("C3", "SUM(D3:E3)", "25"), ("C4", "SUM(D4:E4)", "11")]
+
+
+def test_formula_keeps_literal_braces():
+    columns = [("q3", "Q3"), {"title": "In", "formula": "=MATCH({q3},{1,7,10},0)"}]
+    assert _formulas(Table(RECORDS, columns))[0][1] == "MATCH(A2,{1,7,10},0)"
+
+
+def test_formula_dotted_attr():
+    records = [{"sales": r} for r in RECORDS]
+    columns = [
+        ("sales.q3", "Q3"),
+        ("sales.q4", "Q4"),
+        {"title": "Delta", "formula": "={sales.q4}-{sales.q3}"},
+    ]
+    assert _formulas(Table(records, columns))[0][1] == "B2-A2"
+
+
+@pytest.mark.parametrize("formula", ["={q3 }+1", "={Q-3}*2", "={}", "=SUM({q3}})"])
+def test_formula_stray_braces(formula):
+    with pytest.raises(ValueError, match="neither a column attr"):
+        Table(RECORDS, [("q3", "Q3"), {"title": "X", "formula": formula}])
+
+
+def test_formula_braces_in_strings():
+    formula = '=IF({q3}>{5},"}",{"a","b"})'
+    columns = [("q3", "Q3"), {"title": "X", "formula": formula}]
+    assert _formulas(Table(RECORDS, columns))[0][1] == 'IF(A2&gt;{5},"}",{"a","b"})'
+
+
+def test_formula_unknown_column():
+    with pytest.raises(ValueError, match="'q5'"):
+        Table(RECORDS, [("q3", "Q3"), {"title": "X", "formula": "={q5}+1"}])
+
+
+def test_formula_csv_writes_cached_result():
+    columns = [
+        ("q3", "Q3"),
+        {"title": "Double", "formula": "={q3}*2", "render": lambda r: r["q3"] * 2},
+    ]
+    out = io.StringIO()
+    Sheet(root=Table(RECORDS, columns)).write_csv(out)
+    assert out.getvalue().splitlines() == ["Q3,Double", "10,20", "7,14"]
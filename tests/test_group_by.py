@@ -0,0 +1,104 @@
+import io
+import re
+
+import pytest
+
+from poi import Cell, Col, Sheet, Table
+
+from .helpers import sheet_xml
+
+RECORDS = [
+    {"region": "East", "city": "Boston", "sales": 10},
+    {"region": "East", "city": "Boston", "sales": 5},
+    {"region": "East", "city": "NYC", "sales": 7},
+    {"region": "West", "city": "LA", "sales": 3},
+]
+COLUMNS = [("region", "Region"), ("city", "City"), ("sales", "Sales")]
+
+
+def _merges(xml):
+    return re.findall(r'<mergeCell ref="([\w:]+)"/>', xml)
+
+
+def _csv(sheet):
+    out = io.StringIO()
+    sheet.write_csv(out)
+    return out.getvalue().splitlines()
+
+
+def test_group_by_merges_runs():
+    table = Table(RECORDS, COLUMNS, group_by=["Region"])
+    assert table.rowspan == 5
+    assert not table.lazy_extent
+    xml = sheet_xml(Sheet(root=table).write_to_bytes_io().read())
+    assert _merges(xml) == ["A2:A4"]
+    assert _csv(Sheet(root=Table(RECORDS, COLUMNS, group_by=["Region"]))) == [
+        "Region,City,Sales",
+        "East,Boston,10",
+        ",Boston,5",
+        ",NYC,7",
+        "West,LA,3",
+    ]
+
+
+def test_group_by_nested_levels():
+    table = Table(RECORDS, COLUMNS, group_by=["Region", "City"])
+    xml = sheet_xml(Sheet(root=table).write_to_bytes_io().read())
+    assert sorted(_merges(xml)) == ["A2:A4", "B2:B3"]
+
+
+def test_group_subtotals():
+    table = Table(
+        RECORDS,
+        COLUMNS,
+        group_by=["Region", "City"],
+        group_subtotals={"Sales": "sum"},
+        footer={"Sales": "sum"},
+    )
+    root = Col(children=[Cell("Sales by region"), table])
+    assert _csv(Sheet(root=root)) == [
+        "Sales by region",
+        "Region,City,Sales",
+        "East,Boston,10",
+        ",,5",
+        ",Boston Total,15",
+        ",NYC,7",
+        ",NYC Total,7",
+        "East Total,,22",
+        "West,LA,3",
+        ",LA Total,3",
+        "West Total,,3",
+        "Total,,25",
+    ]
+    assert table.rowspan == 11
+
+
+def test_group_subtotal_formulas():
+    table = Table(
+        RECORDS,
+        COLUMNS,
+        group_by=["Region"],
+        group_subtotals={"Sales": "max"},
+        footer={"Sales": "sum"},
+        footer_formulas=True,
+        subtotal_label="Best of {}",
+    )
+    xml = sheet_xml(Sheet(root=table).write_to_bytes_io().read())
+    assert _merges(xml) == ["A2:A4"]
+    assert "<f>SUBTOTAL(104,C2:C4)</f><v>10</v>" in xml
+    assert "<f>SUBTOTAL(104,C6:C6)</f><v>3</v>" in xml
+    # The footer's SUBTOTAL skips the subtotal rows.
+    assert "<f>SUBTOTAL(109,C2:C7)</f><v>25</v>" in xml
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"group_by": ["Country"]}, "unknown column"),
+        ({"group_subtotals": {"Sales": "sum"}}, "need group_by"),
+        ({"group_by": ["Region"], "excel_table": True}, "Excel tables"),
+    ],
+)
+def test_group_by_invalid(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        Table(RECORDS, COLUMNS, **kwargs)
@@ -0,0 +1,81 @@
+import io
+
+import pytest
+
+from poi import Col, Image, ImagePipeline, Sheet, Table
+
+from .helpers import media
+
+PIL = pytest.importorskip("PIL.Image")
+
+
+def _photo(width=1200, height=800, fmt="JPEG", sigma=40):
+    # Noise, so the photo does not compress to nothing.
+    out = io.BytesIO()
+    PIL.effect_noise((width, height), sigma).convert("RGB").save(out, fmt)
+    return out.getvalue()
+
+
+def _sizes(data):
+    return {n: PIL.open(io.BytesIO(image)).size for n, image in media(data).items()}
+
+
+def _table(photos, pipeline, **kwargs):
+    rows = [{"name": str(i), "photo": photo} for i, photo in enumerate(photos)]
+    table = Table(
+        data=rows,
+        columns=[
+            ("name", "Name"),
+            {"attr": "photo", "title": "Photo", "type": "image", "width": 20},
+        ],
+        row_height=60,
+        **kwargs,
+    )
+    return Sheet(root=table, image_pipeline=pipeline).write_to_bytes_io().read()
+
+
+def test_pipeline_fits_images_to_cells():
+    photo = _photo()
+    plain = _table([photo, photo], None)
+    data = _table([photo, photo], ImagePipeline())
+    assert len(data) < len(plain) / 5
+    # A 20 character column is 145 pixels, a 60 point row 80 pixels.
+    (size,) = _sizes(data).values()
+    assert size[0] <= 145 and size[1] <= 80
+    assert size == (120, 80)
+
+
+def test_pipeline_keeps_small_images():
+    photo = _photo(40, 30, "PNG")
+    data = _table([photo], ImagePipeline())
+    assert list(_sizes(data).values()) == [(40, 30)]
+    assert media(data)["xl/media/image1.png"] == photo
+
+
+def test_pipeline_density_and_max_size():
+    sheet = Sheet(
+        root=Col(children=[Image(_photo(), colspan=4, rowspan=10)]),
+        image_pipeline=ImagePipeline(max_size=(100, 100), density=2, format="PNG"),
+    )
+    ((name, size),) = _sizes(sheet.write_to_bytes_io().read()).items()
+    assert name.endswith(".png")
+    assert size == (200, 133)
+
+
+def test_pipeline_caches_results_across_writes():
+    pipeline = ImagePipeline()
+    photos = [_photo(sigma=10 + i) for i in range(3)]
+    _table(photos * 2, pipeline)
+    assert len(pipeline._results) == 3
+    _table(photos, pipeline)
+    assert len(pipeline._results) == 3
+
+
+def test_pipeline_in_processes():
+    data = _table([_photo()], ImagePipeline(processes=True, workers=2))
+    assert list(_sizes(data).values()) == [(120, 80)]
+
+
+def test_pipeline_rejects_unknown_format():
+    with pytest.raises(ValueError, match="format"):
+        ImagePipeline(format="GIF")
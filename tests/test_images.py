@@ -0,0 +1,86 @@
+import io
+import os
+
+import pytest
+
+from poi import Col, Image, Sheet, Table
+from poi.images import ImageCache
+
+from .helpers import media, part
+
+ASSETS = os.path.join(os.path.dirname(__file__), "..", "docs", "assets")
+BASIC = os.path.join(ASSETS, "basic.png")
+HELLO = os.path.join(ASSETS, "hello.png")
+
+
+def test_image_cache_loads_each_path_once(monkeypatch):
+    opened = []
+    real_open = open
+
+    def counting_open(path, *args, **kwargs):
+        opened.append(path)
+        return real_open(path, *args, **kwargs)
+
+    monkeypatch.setattr("builtins.open", counting_open)
+    cache = ImageCache()
+    first = cache.get(BASIC, None)
+    second = cache.get(BASIC, None)
+    assert opened == [BASIC]
+    assert first is not second
+    assert first._digest == second._digest
+    assert first.image_name == "basic.png"
+
+
+def test_image_cache_keys_bytes_by_content():
+    with open(BASIC, "rb") as f:
+        data = f.read()
+    cache = ImageCache()
+    images = [
+        cache.get(data, None),
+        cache.get(bytearray(data), None),
+        cache.get(io.BytesIO(data), None),
+        cache.get("named.png", {"image_data": io.BytesIO(data)}),
+    ]
+    assert len(cache._images) == 1
+    assert len({image._digest for image in images}) == 1
+
+
+def test_image_column_accepts_paths_bytes_and_buffers():
+    with open(HELLO, "rb") as f:
+        hello = f.read()
+    rows = [
+        {"name": "a", "logo": BASIC},
+        {"name": "b", "logo": hello},
+        {"name": "c", "logo": io.BytesIO(hello)},
+        {"name": "d", "logo": BASIC},
+    ]
+    sheet = Sheet(
+        root=Col(
+            children=[
+                Image(hello),
+                Table(
+                    data=rows,
+                    columns=[
+                        ("name", "Name"),
+                        {"attr": "logo", "title": "Logo", "type": "image"},
+                    ],
+                ),
+            ]
+        )
+    )
+    data = sheet.write_to_bytes_io().read()
+    # Five pictures of two distinct images.
+    assert part(data, "xl/drawings/drawing1.xml").count("<xdr:pic>") == 5
+    assert list(media(data)) == ["xl/media/image1.png", "xl/media/image2.png"]
+
+
+def test_image_paths_match_uncached_output():
+    sheet = Sheet(root=Col(children=[Image(BASIC), Image(BASIC, offset=1)]))
+    data = sheet.write_to_bytes_io().read()
+    assert 'descr="basic.png"' in part(data, "xl/drawings/drawing1.xml")
+    assert list(media(data)) == ["xl/media/image1.png"]
+
+
+def test_image_cache_rejects_missing_files():
+    with pytest.raises(FileNotFoundError):
+        ImageCache().get("missing.png", None)
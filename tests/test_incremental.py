@@ -0,0 +1,183 @@
+import io
+import re
+import xml.etree.ElementTree as ET
+
+import pytest
+
+from poi import Book, Cell, Col, Row, Sheet, Table
+from poi.packager import ParallelZipWorkbook
+
+from .helpers import parts
+
+NS = {"m": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
+
+rendered = []
+
+
+def render_total(record):
+    rendered.append(record["sheet"])
+    return record["price"] * record["qty"]
+
+
+def _sheet(name, n, style="bg_color: #EEEEEE"):
+    data = [
+        {"sheet": name, "name": f"{name} {i}", "price": i * 1.5, "qty": i}
+        for i in range(n)
+    ]
+    return Sheet(
+        root=Col(
+            children=[
+                Row(children=[Cell(f"Report {name}", colspan=2, bold=True)]),
+                Table(
+                    data=data,
+                    columns=[
+                        ("name", "Name"),
+                        {"attr": "price", "title": "Price"},
+                        {"title": "Total", "render": render_total},
+                    ],
+                    cell_style=style,
+                ),
+            ]
+        )
+    )
+
+
+def _resolve(data):
+    """The cells of every sheet with their shared strings and styles resolved."""
+    written = parts(data)
+    strings = [
+        "".join(si.itertext())
+        for si in ET.fromstring(written["xl/sharedStrings.xml"]).iterfind("m:si", NS)
+    ]
+    styles = ET.fromstring(written["xl/styles.xml"])
+
+    def children(tag):
+        found = styles.find(tag, NS)
+        return [] if found is None else list(found)
+
+    fonts, fills, borders = (
+        children("m:fonts"),
+        children("m:fills"),
+        children("m:borders"),
+    )
+    num_formats = {
+        e.get("numFmtId"): e.get("formatCode") for e in children("m:numFmts")
+    }
+    xfs = []
+    for xf in children("m:cellXfs"):
+        xfs.append(
+            (
+                ET.tostring(fonts[int(xf.get("fontId"))]),
+                ET.tostring(fills[int(xf.get("fillId"))]),
+                ET.tostring(borders[int(xf.get("borderId"))]),
+                num_formats.get(xf.get("numFmtId"), xf.get("numFmtId")),
+                b"".join(ET.tostring(child) for child in xf),
+            )
+        )
+    sheets = []
+    for name in sorted(n for n in written if re.match(r"xl/worksheets/sheet", n)):
+        cells = {}
+        for c in ET.fromstring(written[name]).iterfind(".//m:c", NS):
+            v = c.find("m:v", NS)
+            value = None if v is None else v.text
+            if c.get("t") == "s":
+                value = strings[int(value)]
+            cells[c.get("r")] = (value, xfs[int(c.get("s", 0))])
+        sheets.append(cells)
+    return sheets
+
+
+def _write(book, sheets):
+    book.sheets = list(sheets)
+    return book.write_to_bytes_io().read()
+
+
+def _fresh(sheets):
+    return _write(Book(), sheets)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_incremental_book_reuses_unchanged_sheets(workers):
+    book = Book(workers=workers, incremental=True)
+    first = [_sheet("a", 5), _sheet("b", 7), _sheet("c", 3)]
+    _write(book, first)
+
+    rendered.clear()
+    second = [_sheet("a", 5), _sheet("b", 9, "bold: true"), _sheet("c", 3)]
+    data = _write(book, second)
+    if not workers:
+        assert set(rendered) == {"b"}
+    assert _resolve(data) == _resolve(_fresh(second))
+
+    # A sheet that changed back matches the first write again.
+    third = [_sheet("a", 5), _sheet("b", 7), _sheet("c", 4)]
+    assert _resolve(_write(book, third)) == _resolve(_fresh(third))
+
+
+def test_incremental_book_without_changes():
+    book = Book(incremental=True)
+    sheets = [_sheet("a", 5), _sheet("b", 7)]
+    _write(book, sheets)
+    rendered.clear()
+    data = _write(book, sheets)
+    assert rendered == []
+    assert _resolve(data) == _resolve(_fresh(sheets))
+
+
+def test_incremental_book_without_supported_xlsxwriter(monkeypatch):
+    monkeypatch.setattr("poi.book.mirrors_upstream", lambda: False)
+    book = Book(incremental=True)
+    sheets = [_sheet("a", 5), _sheet("b", 7)]
+    _write(book, sheets)
+    rendered.clear()
+    data = _write(book, sheets)
+    assert set(rendered) == {"a", "b"}
+    assert _resolve(data) == _resolve(_fresh(sheets))
+
+
+def test_incremental_book_renders_unpicklable_sheets():
+    def unpicklable(sheets):
+        return [
+            Sheet(
+                root=Table(
+                    data=[{"x": 1}],
+                    columns=[{"title": "X", "render": lambda r: r["x"] + 1}],
+                )
+            ),
+            *sheets,
+        ]
+
+    book = Book(incremental=True)
+    _write(book, unpicklable([_sheet("a", 2)]))
+    rendered.clear()
+    sheets = unpicklable([_sheet("a", 2)])
+    data = _write(book, sheets)
+    assert rendered == []
+    assert _resolve(data) == _resolve(_fresh(sheets))
+
+
+def test_incremental_book_rebuilds_stale_strings():
+    book = Book(incremental=True)
+    _write(book, [_sheet("a", 2), _sheet("b", 50)])
+    rendered.clear()
+    sheets = [_sheet("a", 2), _sheet("c", 50)]
+    data = _write(book, sheets)
+    # Most strings of the last write are unused, so everything is rendered.
+    assert set(rendered) == {"a", "c"}
+    assert _resolve(data) == _resolve(_fresh(sheets))
+    assert len(book.reuse.strings) < 60
+
+
+def test_incremental_book_keeps_formats_it_did_not_prime():
+    book = Book(incremental=True)
+    sheets = [_sheet("a", 5), _sheet("b", 7)]
+    _write(book, sheets)
+    workbook = ParallelZipWorkbook(io.BytesIO())
+    italic = workbook.add_format({"italic": True})
+    index = italic._get_xf_index()
+    known = dict(workbook.xf_format_indices)
+    # The formats of the last write no longer get their old indices, so
+    # nothing is reused, and the formats already there stay registered.
+    assert book.reuse.prime(workbook, sheets) == set()
+    assert workbook.xf_format_indices == known
+    assert workbook.add_format({"italic": True})._get_xf_index() == index
@@ -0,0 +1,60 @@
+from poi import Book, Cell, Col, Instrumentation, Sheet, Table
+
+from .helpers import parts
+
+
+def _root(n=20):
+    data = [{"name": f"item {i}", "qty": i} for i in range(n)]
+    return Col(
+        children=[
+            Cell("Report", bold=True),
+            Table(
+                data=data,
+                columns=[
+                    ("name", "Name"),
+                    {
+                        "attr": "qty",
+                        "title": "Qty",
+                        "width": "auto",
+                        "render": lambda r: r["qty"] * 2,
+                    },
+                ],
+                cell_style={"color: red": lambda r: r["qty"] % 2},
+            ),
+        ]
+    )
+
+
+def test_sheet_instrumentation():
+    reports = []
+    stats = Instrumentation(callback=reports.append)
+    Sheet(root=_root(), instrumentation=stats).write_to_bytes_io()
+
+    result = stats.as_dict()
+    assert reports == [result]
+    for phase in ("layout", "values", "formats", "autofit", "cells", "close"):
+        assert result["phases"][phase] > 0, phase
+    assert set(result["columns"]) == {"Name", "Qty"}
+    counters = result["counters"]
+    assert counters["rows"] == 20
+    # title + header + 20 rows of 2 cells
+    assert counters["cells"] == 1 + 2 + 40
+    assert counters["formats_created"] >= 2
+    assert counters["format_cache_hits"] > 0
+
+
+def test_output_unchanged():
+    plain = Sheet(root=_root()).write_to_bytes_io().getvalue()
+    stats = Instrumentation()
+    timed = Sheet(root=_root(), instrumentation=stats).write_to_bytes_io().getvalue()
+    assert parts(plain) == parts(timed)
+
+
+def test_book_instrumentation():
+    stats = Instrumentation()
+    book = Book(instrumentation=stats)
+    book.add_sheet(Sheet(root=_root(5)))
+    book.add_sheet(Sheet(root=_root(7)))
+    book.write_to_bytes_io()
+    assert stats.counters["rows"] == 12
+    assert stats.phases["close"] > 0
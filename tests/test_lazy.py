@@ -0,0 +1,141 @@
+import gc
+import io
+import weakref
+
+import pytest
+
+from poi import Cell, Col, Row, Sheet, Table
+
+from .helpers import part, sheet_xml
+
+
+def _xml(sheet):
+    data = sheet.write_to_bytes_io().read()
+    return sheet_xml(data) + part(data, "xl/sharedStrings.xml")
+
+
+def test_lazy_col_matches_eager_layout():
+    def build(lazy):
+        sections = (
+            Col(
+                children=[
+                    Cell(f"customer {i}", colspan=2, bold=True),
+                    Table(
+                        data=[{"id": i, "v": j} for j in range(3)],
+                        columns=[("id", "ID"), ("v", "V")],
+                    ),
+                ]
+            )
+            for i in range(5)
+        )
+        return Sheet(
+            root=Col(
+                children=[
+                    Row(children=[Cell("Report"), Cell("2026")]),
+                    Col(children=sections, lazy=lazy),
+                ]
+            )
+        )
+
+    assert _xml(build(lazy=True)) == _xml(build(lazy=False))
+
+
+def test_lazy_row_and_styles():
+    row = Row(children=(Cell(i) for i in range(4)), lazy=True, bold=True)
+    sheet = Sheet(root=Col(children=[Cell("title", colspan=4), row]))
+    xml = _xml(sheet)
+    assert 'r="D2"' in xml
+    assert row.cols == 4 and row.rows == 1
+
+
+def test_lazy_children_are_released_after_writing():
+    refs = []
+
+    def children():
+        for i in range(50):
+            cell = Cell(i)
+            refs.append(weakref.ref(cell))
+            # Earlier children must have been released by now.
+            gc.collect()
+            assert sum(r() is not None for r in refs) <= 2
+            yield cell
+
+    Sheet(root=Col(children=children(), lazy=True)).write_to_bytes_io()
+    assert len(refs) == 50
+
+
+def test_lazy_box_must_be_last():
+    with pytest.raises(ValueError, match="last child"):
+        Sheet(root=Col(children=[Col(children=iter([Cell(1)]), lazy=True), Cell(2)]))
+
+
+def test_lazy_children_cannot_grow():
+    sheet = Sheet(root=Row(colspan=4, children=iter([Cell(1, grow=True)]), lazy=True))
+    with pytest.raises(ValueError, match="cannot grow"):
+        sheet.write_to_bytes_io()
+
+
+def _csv(sheet):
+    out = io.StringIO()
+    sheet.write_csv(out)
+    return out.getvalue().splitlines()
+
+
+def test_nested_lazy_boxes_follow_each_other():
+    sections = (
+        Col(children=(Cell(f"{i}.{j}") for j in range(2)), lazy=True) for i in range(3)
+    )
+    root = Col(children=sections, lazy=True)
+    assert _csv(Sheet(root=root)) == ["0.0", "0.1", "1.0", "1.1", "2.0", "2.1"]
+    assert root.rows == 6
+
+
+def test_cursor_tables_in_lazy_col():
+    import sqlite3
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("create table t (n integer)")
+    conn.executemany("insert into t values (?)", [(i,) for i in range(3)])
+    tables = (Table(data=conn.execute(f"select n + {k} as n from t")) for k in (0, 10))
+    assert _csv(Sheet(root=Col(children=tables, lazy=True))) == [
+        "n",
+        "0",
+        "1",
+        "2",
+        "n",
+        "10",
+        "11",
+        "12",
+    ]
+
+
+def test_group_subtotal_tables_in_lazy_col():
+    records = [{"g": "a", "v": 1}, {"g": "a", "v": 2}, {"g": "b", "v": 3}]
+    tables = (
+        Table(
+            records,
+            [("g", "G"), ("v", "V")],
+            group_by=["G"],
+            group_subtotals={"V": "sum"},
+        )
+        for _ in range(2)
+    )
+    section = ["G,V", "a,1", ",2", "a Total,3", "b,3", "b Total,3"]
+    assert _csv(Sheet(root=Col(children=tables, lazy=True))) == section * 2
+
+
+def test_lazy_children_are_traversed_once():
+    sheet = Sheet(root=Col(children=iter([Cell(1)]), lazy=True))
+    sheet.write_to_bytes_io()
+    with pytest.raises(ValueError, match="already traversed"):
+        sheet.write_to_bytes_io()
+
+
+def test_print_leaves_lazy_children_for_the_write(capsys):
+    sections = (Cell(f"section {i}") for i in range(3))
+    sheet = Sheet(
+        root=Col(children=[Cell("Report"), Col(children=sections, lazy=True)])
+    )
+    sheet.print()
+    assert "<lazy children" in capsys.readouterr().out
+    assert "section 2" in _xml(sheet)
@@ -0,0 +1,72 @@
+import pytest
+
+from poi import Book, Sheet, Table, packager
+from poi.packager import ParallelZipWorkbook, compression_level, mirrors_upstream
+
+from .helpers import parts
+
+
+def _sheet(**kwargs):
+    data = [{"id": i, "name": f"name {i}", "score": i * 0.5} for i in range(2000)]
+    columns = [("id", "ID"), ("name", "Name"), ("score", "Score")]
+    return Sheet(root=Table(data=data, columns=columns), **kwargs)
+
+
+@pytest.mark.parametrize("compression", ["fastest", "balanced", "smallest", 0])
+def test_parallel_compression_matches_default_parts(compression):
+    expected = parts(_sheet().write_to_bytes_io().read())
+    actual = _sheet(compression=compression).write_to_bytes_io().read()
+    assert parts(actual) == expected
+
+
+def test_compression_profiles_trade_size_for_speed():
+    fastest = _sheet(compression="fastest").write_to_bytes_io().read()
+    smallest = _sheet(compression="smallest").write_to_bytes_io().read()
+    stored = _sheet(compression=0).write_to_bytes_io().read()
+    assert len(smallest) <= len(fastest) < len(stored)
+
+
+def test_chunked_parts_form_a_single_deflate_stream(tmp_path):
+    path = tmp_path / "chunked.xlsx"
+    workbook = ParallelZipWorkbook(str(path), workers=4, chunk_size=4096)
+    worksheet = workbook.add_worksheet()
+    for i in range(5000):
+        worksheet.write(i, 0, f"row {i}")
+    workbook.close()
+
+    written = parts(path.read_bytes())
+    assert b"row 4999" in written["xl/sharedStrings.xml"]
+
+
+def test_parallel_compression_for_book():
+    book = Book(compression="fastest")
+    book.add_sheet(_sheet())
+    book.add_sheet(_sheet())
+    written = parts(book.write_to_bytes_io().read())
+    assert "xl/worksheets/sheet2.xml" in written
+
+
+def test_invalid_compression():
+    with pytest.raises(ValueError):
+        compression_level("tiny")
+    with pytest.raises(ValueError):
+        compression_level(10)
+
+
+def test_store_workbook_mirrors_upstream():
+    # ParallelZipWorkbook._store_workbook() copies the upstream method, so
+    # review it against the new one and update the digest when this fails.
+    assert mirrors_upstream()
+
+
+def test_unsupported_xlsxwriter_closes_serially(monkeypatch, caplog):
+    expected = parts(_sheet().write_to_bytes_io().read())
+    mirrors_upstream.cache_clear()
+    monkeypatch.setattr(packager, "_STORE_WORKBOOK_DIGEST", "")
+    try:
+        assert not mirrors_upstream()
+        assert "closing workbooks serially" in caplog.text
+        actual = _sheet(compression="fastest").write_to_bytes_io().read()
+    finally:
+        mirrors_upstream.cache_clear()
+    assert parts(actual) == expected
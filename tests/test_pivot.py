@@ -0,0 +1,115 @@
+import io
+import re
+from datetime import date
+
+import pytest
+
+from poi import Cell, Col, Pivot, Sheet
+
+from .helpers import sheet_xml
+
+RECORDS = [
+    {"region": "East", "city": "Boston", "year": 2023, "sales": 10},
+    {"region": "East", "city": "Boston", "year": 2024, "sales": 5},
+    {"region": "West", "city": "LA", "year": 2023, "sales": 3},
+    {"region": "East", "city": "NYC", "year": 2024, "sales": 7},
+    {"region": "West", "city": "LA", "year": 2024, "sales": 1},
+]
+
+
+def _csv(root):
+    out = io.StringIO()
+    Sheet(root=root).write_csv(out)
+    return out.getvalue().splitlines()
+
+
+def _merges(root):
+    xml = sheet_xml(Sheet(root=root).write_to_bytes_io().read())
+    return re.findall(r'<mergeCell ref="([\w:]+)"/>', xml)
+
+
+def test_pivot_row_subtotals():
+    pivot = Pivot(
+        iter(RECORDS),
+        rows=[("region", "Region"), ("city", "City")],
+        columns=["year"],
+        values=[("sales", "sum")],
+    )
+    assert (pivot.rowspan, pivot.colspan) == (7, 5)
+    assert _csv(pivot) == [
+        "Region,City,2023,2024,Total",
+        "East,Boston,10,5,15",
+        ",NYC,,7,7",
+        "East Total,,10,12,22",
+        "West,LA,3,1,4",
+        "West Total,,3,1,4",
+        "Total,,13,13,26",
+    ]
+    assert _merges(pivot) == ["A2:A3", "A4:B4", "A6:B6", "A7:B7"]
+
+
+def test_pivot_column_levels_and_values():
+    pivot = Pivot(
+        RECORDS,
+        rows=["region"],
+        columns=["year", "city"],
+        values=[("sales", "sum", "Sales"), ("sales", "count", "N")],
+        totals=False,
+    )
+    rows = _csv(pivot)
+    assert rows[:3] == [
+        ",2023,,,,2023 Total,,2024,,,,,,2024 Total,",
+        ",Boston,,LA,,,,Boston,,LA,,NYC,,,",
+        "region,Sales,N,Sales,N,Sales,N,Sales,N,Sales,N,Sales,N,Sales,N",
+    ]
+    assert rows[3:] == [
+        "East,10,1,,,10,1,5,1,,,7,1,12,2",
+        "West,,,3,1,3,1,,,1,1,,,1,1",
+    ]
+    assert _merges(pivot)[:4] == ["A1:A2", "B1:E1", "F1:G2", "H1:M1"]
+
+
+def test_pivot_without_column_keys():
+    records = [{**r, "day": date(2024, 1, r["sales"])} for r in RECORDS]
+    pivot = Pivot(
+        records,
+        rows=["region"],
+        values=[("day", "max", "Last")],
+        subtotals=False,
+        total_label="All",
+    )
+    root = Col(children=[Cell("Last sale"), pivot])
+    assert _csv(root) == [
+        "Last sale,",
+        "region,Last",
+        "East,2024-01-10",
+        "West,2024-01-03",
+        "All,2024-01-10",
+    ]
+
+
+def test_pivot_mixed_keys_stay_grouped():
+    records = [{"k": None, "v": 1}, {"k": 2, "v": 2}, {"k": "a", "v": 3}]
+    rows = _csv(Pivot(records, rows=["k"], values=[("v", "sum")], totals=False))
+    assert sorted(rows[1:]) == [",1", "2,2", "a,3"]
+
+
+def test_pivot_estimate_is_unordered():
+    estimate = Sheet(
+        root=Pivot(RECORDS, rows=["region"], values=[("sales", "sum")])
+    ).estimate()
+    assert not estimate.row_ordered
+
+
+@pytest.mark.parametrize(
+    "kwargs, message",
+    [
+        ({"rows": [], "values": [("sales", "sum")]}, "row keys"),
+        ({"rows": ["region"]}, "values to aggregate"),
+        ({"rows": ["region"], "values": [("sales", "median")]}, "aggregate must"),
+        ({"rows": [("region",)], "values": [("sales", "sum")]}, "pivot keys"),
+    ],
+)
+def test_pivot_invalid(kwargs, message):
+    with pytest.raises(ValueError, match=message):
+        Pivot(RECORDS, **kwargs)
@@ -0,0 +1,102 @@
+import pytest
+
+from poi import (
+    Book,
+    CancelToken,
+    Cell,
+    Col,
+    ExportCancelledError,
+    Row,
+    Sheet,
+    Table,
+)
+
+from .helpers import parts
+
+
+def _root(n):
+    data = [{"name": f"item {i}", "qty": i} for i in range(n)]
+    return Col(
+        children=[
+            Row(children=[Cell("Report", colspan=2)]),
+            Table(data=data, columns=[("name", "Name"), ("qty", "Qty")]),
+        ]
+    )
+
+
+def test_progress():
+    reports = []
+    sheet = Sheet(root=_root(250))
+    data = sheet.write_to_bytes_io(progress=reports.append, progress_interval=100)
+
+    rows = [p.rows for p in reports]
+    assert rows == sorted(rows)
+    assert len(reports) == 4
+    # title + header + 250 rows
+    assert reports[-1].rows == 252
+    assert all(p.sheet == 0 and p.elapsed >= 0 for p in reports)
+    assert parts(data.getvalue()) == parts(
+        Sheet(root=_root(250)).write_to_bytes_io().getvalue()
+    )
+
+
+def test_cancel():
+    token = CancelToken()
+    reports = []
+
+    def progress(p):
+        reports.append(p)
+        if p.rows >= 100:
+            token.cancel()
+
+    with pytest.raises(ExportCancelledError, match="cancelled"):
+        Sheet(root=_root(1000)).write_to_bytes_io(
+            progress=progress, cancel=token, progress_interval=50
+        )
+    assert token.cancelled
+    assert reports[-1].rows < 200
+
+
+def test_deadline():
+    token = CancelToken(timeout=0)
+    with pytest.raises(ExportCancelledError, match="deadline"):
+        Sheet(root=_root(10)).write_to_bytes_io(cancel=token)
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_book_progress(workers):
+    book = Book(workers=workers)
+    book.add_sheet(Sheet(root=_root(10)))
+    book.add_sheet(Sheet(root=_root(20)))
+    reports = []
+    book.write_to_bytes_io(progress=reports.append, progress_interval=5)
+    assert {p.sheet for p in reports} == {0, 1}
+    assert reports[-1].rows == 12 + 22
+
+
+def test_book_cancel():
+    book = Book()
+    book.add_sheet(Sheet(root=_root(10)))
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(ExportCancelledError):
+        book.write_to_bytes_io(cancel=token)
+
+
+def test_progress_with_a_table_root():
+    data = [{"name": f"item {i}", "qty": i} for i in range(30)]
+    reports = []
+    sheet = Sheet(root=Table(data=data, columns=[("name", "Name"), ("qty", "Qty")]))
+    sheet.write_to_bytes_io(progress=reports.append, progress_interval=10)
+    assert reports[-1].rows == 31
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_book_progress_with_table_roots(workers):
+    book = Book(workers=workers)
+    for n in (5, 8):
+        data = [{"qty": i} for i in range(n)]
+        book.add_sheet(Sheet(root=Table(data=data, columns=[("qty", "Qty")])))
+    reports = []
+    book.write_to_bytes_io(progress=reports.append, cancel=CancelToken())
+    assert reports[-1].rows == 6 + 9
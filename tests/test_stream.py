@@ -0,0 +1,76 @@
+import datetime
+import io
+import re
+
+from poi import Cell, Col, Row, Sheet
+
+from .helpers import parts, sheet_xml
+
+
+def test_stream_rows_with_header_sections():
+    out = io.BytesIO()
+    header = Row(
+        children=[
+            Cell("Monthly report", colspan=2, rowspan=2, bold=True),
+            Col(children=[Cell("generated"), Cell("today")]),
+        ]
+    )
+    columns = [
+        ("name", "Name"),
+        {"attr": "amount", "title": "Amount", "width": "auto"},
+        ("day", "Day"),
+    ]
+    with Sheet.stream(out, columns=columns, header=header) as s:
+        for i in range(500):
+            s.append(
+                {
+                    "name": f"customer {i}",
+                    "amount": i * 1000.5,
+                    "day": datetime.date(2026, 1, 1),
+                }
+            )
+            # Constant memory: only the current row is held by xlsxwriter.
+            assert len(s.worksheet.table) <= 1
+        s.extend([{"name": "last", "amount": 1, "day": None}])
+        assert s.count == 501
+
+    xml = sheet_xml(out.getvalue())
+    rows = [int(r) for r in re.findall(r'<row r="(\d+)"', xml)]
+    assert rows == sorted(rows)
+    # Header sections keep their merged ranges and cells.
+    assert '<mergeCell ref="A1:B2"/>' in xml
+    assert 'r="C1"' in xml and 'r="C2"' in xml
+    # Table header sits below the header sections, data follows it.
+    assert '<row r="3"' in xml and '<row r="504"' in xml
+    assert "<t>customer 499</t>" in xml
+    # Auto width is finalized on exit.
+    assert re.search(r'<col min="2" max="2" width="1[0-9]\.', xml)
+
+
+def test_stream_to_path(tmp_path):
+    path = tmp_path / "stream.xlsx"
+    with Sheet.stream(path, columns=[("a", "A")], row_height=20) as s:
+        s.extend({"a": i} for i in range(3))
+    xml = sheet_xml(path.read_bytes())
+    assert xml.count('ht="20"') == 3
+
+
+def test_stream_splits_sheets():
+    out = io.BytesIO()
+    header = Cell("Report", colspan=2)
+    columns = [("a", "A"), ("b", "B")]
+    with Sheet.stream(
+        out, columns=columns, header=header, max_rows=2, footer={"A": "sum"}
+    ) as s:
+        s.extend({"a": i, "b": "x"} for i in range(3))
+        s.append({"a": 10, "b": "y"})
+        assert s.count == 2
+    data = out.getvalue()
+    first, second = sheet_xml(data, 1), sheet_xml(data, 2)
+    assert "xl/worksheets/sheet3.xml" not in parts(data)
+    for xml in (first, second):
+        assert '<mergeCell ref="A1:B1"/>' in xml
+        assert "<t>A</t>" in xml
+    # Each sheet has its own footer.
+    assert re.search(r'<c r="A5"[^>]*><v>1</v>', first)
+    assert re.search(r'<c r="A5"[^>]*><v>12</v>', second)
@@ -0,0 +1,27 @@
+from datetime import date, time
+
+from poi import Sheet, Table
+
+from .helpers import part, sheet_xml
+
+RECORDS = [
+    {"name": "apple", "price": 1.5, "day": date(2024, 1, 2), "at": time(9)},
+    {"name": None, "price": 2.0, "day": date(2024, 1, 3), "at": None},
+]
+COLUMNS = [
+    ("name", "Name"),
+    {"attr": "price", "title": "Price", "format": {"num_format": "0.00"}},
+    ("day", "Day"),
+    ("at", "At"),
+]
+
+
+def _xml(table):
+    data = Sheet(root=table).write_to_bytes_io().read()
+    return [sheet_xml(data), part(data, "xl/styles.xml")]
+
+
+def test_formats_resolved_once_per_column_match_per_cell_formats():
+    # A condition that never matches takes the per-cell path.
+    per_cell = Table(RECORDS, COLUMNS, cell_style={"bold: true": lambda r: False})
+    assert _xml(Table(RECORDS, COLUMNS)) == _xml(per_cell)